@@ -0,0 +1,127 @@
+#!/usr/bin/python
+
+import getopt
+import os
+import sys
+
+from simplesmtscheduler.benchmark import BENCHMARK_SCHEDULERS, measure_startup, run_benchmark, \
+    write_benchmark_results
+from simplesmtscheduler.generator import gen_task_set, write_csv_taskset
+
+outputFileName = "benchmark.json"
+schedulers = list(BENCHMARK_SCHEDULERS)
+task_counts = [4, 8, 16]
+hyper_periods = [1000, 10000]
+utilizations = [0.3, 0.6]
+core_counts = [1]
+seeds = [0]
+distribution = "loguniform"
+period_min = 10
+jitter_ratio = 0.0
+offset_ratio = 0.0
+wcet_gap = 0
+timeout = 60
+generateFileName = ""
+startup = False
+startup_limit = 1.0
+
+
+def parse_list(arg, cast):
+    return [cast(v) for v in arg.split(",") if v.strip()]
+
+
+if __name__ == "__main__":
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], "ho:s:t:H:u:c:r:d:m:j:f:w:g:",
+                                   ["help", "output=", "schedulers=", "tasks=", "hyperperiods=", "utilizations=",
+                                    "cores=", "seeds=", "distribution=", "period-min=", "jitter=", "offset=",
+                                    "wcet=", "timeout=", "generate=", "startup", "startup-limit="])
+    except getopt.GetoptError:
+        print("Try : Benchmark.py -o results.json -s cyclic,rm,mapping -t 4,8,16 -H 1000,10000 -u 0.3,0.6")
+        print("Or : Benchmark.py --help")
+        sys.exit(2)
+    for opt, arg in opts:
+        if opt in ("-h", "--help"):
+            print("Benchmark.py -o <results.json|results.csv> -s <schedulers> -t <tasks> -H <hyperperiods> "
+                  "-u <utilizations> -c <cores> -r <seeds> -d <loguniform|harmonic> -m <period> -j <jitter> "
+                  "-f <offset> -w <wcet> --timeout <seconds> -g <taskset.csv> --startup --startup-limit <seconds>")
+            print("-h\t--help")
+            print("-o\t--output")
+            print("-s\t--schedulers")
+            print("-t\t--tasks")
+            print("-H\t--hyperperiods")
+            print("-u\t--utilizations")
+            print("-c\t--cores")
+            print("-r\t--seeds")
+            print("-d\t--distribution")
+            print("-m\t--period-min")
+            print("-j\t--jitter")
+            print("-f\t--offset")
+            print("-w\t--wcet")
+            print("-g\t--generate")
+            print("\t--timeout")
+            print("\t--startup")
+            print("\t--startup-limit")
+            sys.exit()
+        elif opt in ("-o", "--output"):
+            outputFileName = arg
+        elif opt in ("-s", "--schedulers"):
+            schedulers = parse_list(arg, str)
+        elif opt in ("-t", "--tasks"):
+            task_counts = parse_list(arg, int)
+        elif opt in ("-H", "--hyperperiods"):
+            hyper_periods = parse_list(arg, int)
+        elif opt in ("-u", "--utilizations"):
+            utilizations = parse_list(arg, float)
+        elif opt in ("-c", "--cores"):
+            core_counts = parse_list(arg, int)
+        elif opt in ("-r", "--seeds"):
+            seeds = parse_list(arg, int)
+        elif opt in ("-d", "--distribution"):
+            distribution = arg
+        elif opt in ("-m", "--period-min"):
+            period_min = int(arg)
+        elif opt in ("-j", "--jitter"):
+            jitter_ratio = float(arg)
+        elif opt in ("-f", "--offset"):
+            offset_ratio = float(arg)
+        elif opt in ("-w", "--wcet"):
+            wcet_gap = int(arg)
+        elif opt in ("-g", "--generate"):
+            generateFileName = arg
+        elif opt == "--timeout":
+            timeout = float(arg)
+        elif opt == "--startup":
+            startup = True
+        elif opt == "--startup-limit":
+            startup_limit = float(arg)
+
+    if startup:
+        # Guards the import cost of the command line paths that neither plot nor solve, e.g. cached schedules
+        result = measure_startup(os.path.join(os.path.dirname(os.path.abspath(__file__)), "SimpleSMTScheduler.py"))
+        print("Interpreter startup = %s ms" % round(result['interpreter_time'] * 1000, 1))
+        print("SimpleSMTScheduler.py startup = %s ms" % round(result['startup_time'] * 1000, 1))
+        if result['heavy_modules']:
+            sys.exit("Modules imported at startup that should be imported lazily: %s" % result['heavy_modules'])
+        if result['overhead'] > startup_limit:
+            sys.exit("Startup overhead of %s s exceeds the limit of %s s" % (round(result['overhead'], 3),
+                                                                             startup_limit))
+        sys.exit()
+
+    if generateFileName:
+        # Only write the first task set of the sweep, e.g. to inspect it with SimpleSMTScheduler.py
+        write_csv_taskset(generateFileName, gen_task_set(task_counts[0], utilizations[0], core_counts[0],
+                                                         hyper_periods[0], period_min, distribution, jitter_ratio,
+                                                         offset_ratio, seeds[0]))
+        print("Task set written to %s" % generateFileName)
+        sys.exit()
+
+    unknown = [s for s in schedulers if s not in BENCHMARK_SCHEDULERS]
+    if unknown:
+        sys.exit("Unknown schedulers %s, expected some of %s" % (unknown, list(BENCHMARK_SCHEDULERS)))
+
+    results = run_benchmark(schedulers, task_counts, hyper_periods, utilizations, core_counts, seeds, distribution,
+                            timeout, True, period_min=period_min, jitter_ratio=jitter_ratio,
+                            offset_ratio=offset_ratio, wcet_gap=wcet_gap)
+    write_benchmark_results(results, outputFileName)
+    print("\nResults of %s cases written to %s" % (len(results), outputFileName))
@@ -5,6 +5,10 @@ import sys
 import os
 from statistics import stdev
 
+from simplesmtscheduler.batch import collect_task_sets, run_batch
+from simplesmtscheduler.cache import ScheduleCache
+from simplesmtscheduler.metrics import write_metrics
+from simplesmtscheduler.portfolio import DEFAULT_PORTFOLIO
 from simplesmtscheduler.schedulers import *
 from simplesmtscheduler.utilities import *
 
@@ -17,19 +21,58 @@ verbose = True
 interactive = False
 optimize = False
 split = False
+legacy = False
+jobs = 1
+use_cache = True
+clear_cache = False
+heuristic = False
+granularity = None
+map_cores = 0
+map_bound = 1.0
+portfolio = None
+budget = 60
+objective = "max"
+metricsFileName = ""
+batchSource = ""
+batchFileName = ""
+batch_plot = False
+plotDpi = MY_DPI
+dispatch = None
+exportFileName = ""
+loadFileName = ""
+scheduleExport = None
+advise = False
+harmonizeTolerance = None
+rolling = None
+verifyFileName = ""
+verify_wrap = False
+serveAddress = ""
+chainsFileName = ""
+chains = []
 
 if __name__ == "__main__":
-    print("Welcome to this simple SMT scheduler (SSMTS)...\n")
-
+    opts = []
     if len(sys.argv) > 1:
         try:
-            opts, args = getopt.getopt(sys.argv[1:], "hi:w:p:n:ovcs",
+            opts, args = getopt.getopt(sys.argv[1:], "hi:w:p:n:ovcslj:fg:b:",
                                        ["help", "itasks=", "wcet=", "plot=", "nperiods=", "optimize", "verbose",
-                                        "code", "split"])
+                                        "code", "split", "legacy", "jobs=", "no-cache", "clear-cache",
+                                        "fast", "granularity=", "map-cores=", "map-bound=",
+                                        "portfolio", "budget=", "objective=", "metrics=", "batch=",
+                                        "batch-output=", "batch-plot", "dpi=", "dispatch=", "export=", "load=",
+                                        "advise", "harmonize=", "rolling=", "verify=", "verify-wrap", "serve=",
+                                        "chains="])
         except getopt.GetoptError:
+            print("Welcome to this simple SMT scheduler (SSMTS)...\n")
             print('Try : SimpleSMTScheduler.py -i <inputtasks> -w 35713 -p <outputplot> -n <plotperiods> -v -c')
             print("Or : SimpleSMTScheduler.py --help")
             sys.exit(2)
+    # Batch mode streams JSON lines on stdout, which the welcome message would corrupt. The parsed options also catch
+    # the forms -bdir and grouped short options such as -vb dir.
+    if not [opt for opt, _ in opts if opt in ("-b", "--batch")]:
+        print("Welcome to this simple SMT scheduler (SSMTS)...\n")
+
+    if len(sys.argv) > 1:
         plot = False
         verbose = False
         code = False
@@ -38,7 +81,15 @@ if __name__ == "__main__":
         jitter = 0
         for opt, arg in opts:
             if opt in ("-h", "--help"):
-                print('SimpleSMTScheduler.py -i <inputtasks> -w 35713 -p <outputplot> -n <plotperiods> -o -v -c -s')
+                print('SimpleSMTScheduler.py -i <inputtasks> -w 35713 -p <outputplot> -n <plotperiods> -o -v -c -s '
+                      '-l -j <jobs> -f -g <granularity> '
+                      '--no-cache --clear-cache --map-cores <cores> --map-bound <utilization> --portfolio '
+                      '--budget <seconds> --objective <max|sum> --metrics <metrics.json> -b <directory|glob|manifest> '
+                      '--batch-output <results.jsonl> --batch-plot --dpi <dpi> '
+                      '--dispatch <table|delta> --export <schedule.bin|schedule.json> '
+                      '--load <schedule.bin|schedule.json> --advise --harmonize <lower[,upper]> '
+                      '--rolling <instances> --verify <schedule.h> --verify-wrap --serve <socket|host:port> '
+                      '--chains <chains/*.csv>')
                 print("-h\t--help")
                 print("-i\t--itasks")
                 print("-w\t--wcet")
@@ -48,6 +99,32 @@ if __name__ == "__main__":
                 print("-v\t--verbose")
                 print("-c\t--code")
                 print("-s\t--split")
+                print("-l\t--legacy")
+                print("-j\t--jobs")
+                print("-f\t--fast")
+                print("-g\t--granularity")
+                print("-b\t--batch")
+                print("\t--no-cache")
+                print("\t--clear-cache")
+                print("\t--map-cores")
+                print("\t--map-bound")
+                print("\t--portfolio")
+                print("\t--budget")
+                print("\t--objective")
+                print("\t--metrics")
+                print("\t--batch-output")
+                print("\t--batch-plot")
+                print("\t--dpi")
+                print("\t--dispatch")
+                print("\t--export")
+                print("\t--load")
+                print("\t--advise")
+                print("\t--harmonize")
+                print("\t--rolling")
+                print("\t--verify")
+                print("\t--verify-wrap")
+                print("\t--serve")
+                print("\t--chains")
                 sys.exit()
             elif opt in ("-i", "--itasks"):
                 tasksFileName = arg
@@ -66,6 +143,61 @@ if __name__ == "__main__":
                 code = True
             elif opt in ("-s", "--split"):
                 split = True
+            elif opt in ("-l", "--legacy"):
+                legacy = True
+            elif opt in ("-j", "--jobs"):
+                jobs = int(arg)
+            elif opt in ("-f", "--fast"):
+                heuristic = True
+            elif opt in ("-g", "--granularity"):
+                granularity = int(arg)
+            elif opt == "--no-cache":
+                use_cache = False
+            elif opt == "--clear-cache":
+                clear_cache = True
+            elif opt == "--map-cores":
+                map_cores = int(arg)
+            elif opt == "--map-bound":
+                map_bound = float(arg)
+            elif opt == "--portfolio":
+                portfolio = DEFAULT_PORTFOLIO
+            elif opt == "--budget":
+                budget = float(arg)
+            elif opt == "--objective":
+                if arg not in OBJECTIVES:
+                    print("Unknown objective %s, expected one of %s" % (arg, ", ".join(OBJECTIVES)))
+                    sys.exit(2)
+                objective = arg
+            elif opt == "--metrics":
+                metricsFileName = arg
+            elif opt in ("-b", "--batch"):
+                batchSource = arg
+            elif opt == "--batch-output":
+                batchFileName = arg
+            elif opt == "--batch-plot":
+                batch_plot = True
+            elif opt == "--dpi":
+                plotDpi = int(arg)
+            elif opt == "--dispatch":
+                dispatch = arg
+            elif opt == "--export":
+                exportFileName = arg
+            elif opt == "--load":
+                loadFileName = arg
+            elif opt == "--advise":
+                advise = True
+            elif opt == "--harmonize":
+                harmonizeTolerance = [float(v) for v in arg.split(",")]
+            elif opt == "--rolling":
+                rolling = int(arg)
+            elif opt == "--verify":
+                verifyFileName = arg
+            elif opt == "--verify-wrap":
+                verify_wrap = True
+            elif opt == "--serve":
+                serveAddress = arg
+            elif opt == "--chains":
+                chainsFileName = arg
     else:
         code = False
         interactive = True
@@ -81,20 +213,132 @@ if __name__ == "__main__":
         optimize = input("Enable optimization (Yes/No)? ").lower() == "Yes".lower()
         verbose = input("Enable verbose mode (Yes/No)? ").lower() == "Yes".lower()
 
-    print("Importing task set from file source...\n")
-    parse_csv_taskset(tasksFileName, taskSet)
+    scheduleCache = ScheduleCache() if use_cache else None
+    if clear_cache:
+        ScheduleCache().clear()
+        if not batchSource:
+            print("Schedule cache cleared\n")
+        if not tasksFileName and not batchSource:
+            sys.exit()
+
+    if serveAddress:
+        # Keeps the worker processes and their imports alive between requests until interrupted
+        from simplesmtscheduler.service import serve
+        serve(serveAddress, jobs, cache=scheduleCache)
+        sys.exit()
+
+    if batchSource:
+        # One JSON line per task set and core, the exit status tells whether every task set was scheduled
+        batchFiles = collect_task_sets(batchSource)
+        if not batchFiles:
+            sys.exit("No task sets found in %s" % batchSource)
+        batchOutput = open(batchFileName, 'w') if batchFileName else None
+        failed = run_batch(batchFiles, batchOutput, jobs, wcet_gap=wcet_offset, optimize=optimize,
+                           legacy_encoding=legacy, cache=scheduleCache, heuristic=heuristic, granularity=granularity,
+                           portfolio=portfolio, budget=budget, objective=objective, rolling=rolling, code=code,
+                           plot=batch_plot, plot_dpi=plotDpi, dispatch=dispatch)
+        if batchOutput is not None:
+            batchOutput.close()
+        sys.exit(1 if failed else 0)
+
+    if loadFileName:
+        # A previous export replaces the solver, its schedule is checked against the exported task set
+        from simplesmtscheduler.export import load_schedule
+        from simplesmtscheduler.verifier import print_violations, verify_core_activations
+        print("Importing schedule from %s...\n" % loadFileName)
+        scheduleExport = load_schedule(loadFileName)
+        taskSet = scheduleExport.tasks()
+        wcet_offset = scheduleExport.wcet_gap
+        tasksFileName = scheduleExport.tasks_file or os.path.splitext(loadFileName)[0] + ".csv"
+    else:
+        print("Importing task set from file source...\n")
+        parse_csv_taskset(tasksFileName, taskSet)
     baseFileName = os.path.basename(tasksFileName)
 
-    if [t for t in taskSet if t.execution > t.deadline]:
-        sys.exit("\nTask set is not valid.\nExecution time violate period and deadline constraints for tasks: " + str(
-            [t.name for t in taskSet if t.execution > t.deadline]))
-    elif [t for t in taskSet if t.deadline > t.period]:
-        sys.exit("\nTask set is not valid.\nDeadline times violate period constraints")
-    elif [t for t in taskSet if t.offset > t.period]:
-        sys.exit("\nTask set is not valid.\nOffset times violate period constraints")
+    taskSetError = check_task_set(taskSet)
+    if taskSetError is None and verifyFileName:
+        # A generated schedule header is checked against the task set without solving, the exit status tells CI
+        from simplesmtscheduler.verifier import apply_schedule_header, print_violations, verify_schedule
+        print("Verifying schedule %s..." % verifyFileName)
+        missingTasks = apply_schedule_header(verifyFileName, taskSet)
+        if missingTasks:
+            sys.exit("\nTasks %s have no activation instances in %s" % (missingTasks, verifyFileName))
+        violations = verify_schedule(taskSet, wcet_offset, verify_wrap)
+        for core_id, core_violations in violations.items():
+            print_violations(core_id, core_violations)
+        sys.exit(1 if any(violations.values()) else 0)
+    if taskSetError is None and (advise or harmonizeTolerance is not None):
+        # Model size per core before solving, optionally with harmonized periods that shrink the hyper period
+        from simplesmtscheduler.advisor import advise_core, apply_period, print_advice
+        for core_id in sorted(set(t.coreid for t in taskSet)):
+            core_tasks = [t for t in taskSet if t.coreid == core_id]
+            advice = advise_core(core_tasks, wcet_offset, harmonizeTolerance)
+            print_advice(core_id, advice)
+            if not advise and advice['periods'] is not None:
+                for t in core_tasks:
+                    apply_period(t, advice['periods'][t.name])
+        if advise:
+            sys.exit()
+        print("\nScheduling with the harmonized periods")
+        taskSetError = check_task_set(taskSet)
+    if taskSetError is None and chainsFileName:
+        from simplesmtscheduler.chains import check_chains, parse_chains_csv, print_chain_latencies
+        try:
+            chains = parse_chains_csv(chainsFileName)
+        except ValueError as e:
+            sys.exit("\nPrecedence chains are not valid.\n" + str(e))
+        chainsError = check_chains(chains, taskSet)
+        if chainsError is None and map_cores > 0:
+            chainsError = "Precedence chains need the CPU IDs of the task set, they cannot be combined with --map-cores"
+        if chainsError is not None:
+            sys.exit("\nPrecedence chains are not valid.\n" + chainsError)
+    if taskSetError is not None:
+        sys.exit("\nTask set is not valid.\n" + taskSetError)
     else:
+        # Cores are independent problems, solve them concurrently and report them in core order
+        pool = None
+        if jobs > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            pool = ProcessPoolExecutor(max_workers=jobs)
+        core_results = None
+        core_metrics = []
+        scheduled = True
+        if map_cores > 0:
+            print(f"\nMapping tasks onto {map_cores} cores started...")
+            try:
+                core_results = map_and_schedule(taskSet, map_cores, wcet_offset, optimize, verbose, legacy,
+                                                scheduleCache, heuristic, granularity, map_bound, pool,
+                                                portfolio, budget, objective, rolling)
+            except ValueError as e:
+                sys.exit("\nTask set is not valid.\n" + str(e))
+            if core_results is None:
+                sys.exit(f"\nNo mapping of the task set onto {map_cores} cores could be scheduled")
+        if scheduleExport is not None:
+            core_results = dict()
+            for core_id in sorted(set(t.coreid for t in taskSet)):
+                core_tasks = [t for t in taskSet if t.coreid == core_id]
+                activations = [t.getStartPIT() for t in core_tasks]
+                violations = verify_core_activations(core_tasks, activations, wcet_offset, wrap_around=False)
+                if violations:
+                    print_violations(core_id, violations)
+                    sys.exit(f"\nThe schedule of CPU ID {core_id} in {loadFileName} is not valid for its task set")
+                metrics = SolverMetrics('export')
+                metrics.result = 'sat'
+                metrics.collect_instances(core_tasks, find_lcm([t.period for t in core_tasks]))
+                core_results[core_id] = (activations, sum(t.execution / t.period for t in core_tasks) * 100,
+                                         metrics.hyper_period, 0, metrics)
+        if chains and scheduleExport is None:
+            # The cores the chains pass are solved jointly up front, with -o minimizing their end to end latency
+            print("\nScheduling precedence chains %s started..." % ", ".join(chain.name for chain in chains))
+            core_results = solve_chain_schedule(taskSet, chains, wcet_offset, optimize, verbose, budget, objective)
         nr_cores = [t.coreid for t in taskSet]
-        for core_id in range(min(nr_cores), max(nr_cores) + 1):
+        core_ids = range(min(nr_cores), max(nr_cores) + 1)
+        if pool is not None:
+            core_futures = {core_id: pool.submit(solve_core_schedule, [t for t in taskSet if t.coreid == core_id],
+                                                 wcet_offset, optimize, verbose, legacy, scheduleCache,
+                                                 heuristic, granularity, portfolio, budget, objective, rolling)
+                            for core_id in core_ids if core_results is None or core_id not in core_results}
+        for core_id in core_ids:
             core_tasks = [t for t in taskSet if t.coreid == core_id]
             hyper_period = find_lcm([t.period for t in core_tasks])
             utilization = sum(t.execution / t.period for t in core_tasks) * 100
@@ -103,13 +347,27 @@ if __name__ == "__main__":
             print("\t- Schedule hyper period = %s" % str(hyper_period))
             print("\t- Using optimization is", str(optimize))
             print("\t- Allocated WCET RTS =", str(wcet_offset))
+            print("\t- Using legacy encoding is", str(legacy))
+            print("\t- Using heuristic fast path is", str(heuristic))
+            print("\t- Using solver portfolio is", str(portfolio is not None))
+            print("\t- Using rolling horizon is", str(rolling is not None))
 
-            schedule, utilization, hyperPeriod, elapsedTime = gen_cyclic_schedule_model(core_tasks, wcet_offset,
-                                                                                        optimize,
-                                                                                        verbose)
+            try:
+                if core_results is not None and core_id in core_results:
+                    activations, utilization, hyperPeriod, elapsedTime, metrics = core_results[core_id]
+                elif pool is not None:
+                    activations, utilization, hyperPeriod, elapsedTime, metrics = core_futures[core_id].result()
+                else:
+                    activations, utilization, hyperPeriod, elapsedTime, metrics = solve_core_schedule(
+                        core_tasks, wcet_offset, optimize, verbose, legacy, scheduleCache, heuristic, granularity,
+                        portfolio, budget, objective, rolling)
+            except ValueError as e:
+                sys.exit("\nTask set is not valid.\n" + str(e))
             print("\n\t- Solver completed in %s ms" % (elapsedTime * SEC_TO_MS))
-            if schedule is not None:
-                gen_schedule_activations(schedule, core_tasks)
+            core_metrics.append(dict(metrics.as_dict(), core_id=core_id, tasks_file=tasksFileName))
+            if activations is not None:
+                for task, task_activations in zip(core_tasks, activations):
+                    task.activation_instances = task_activations
 
                 print("\n\t- Activation Instances:")
                 for i in range(len(core_tasks)):
@@ -128,27 +386,46 @@ if __name__ == "__main__":
                     print("\n\t\t\t" + str(tasks_jitter[t.name]))
             else:
                 print(f"\tA schedule for CPU ID {core_id} could not be generated")
+                scheduled = False
+        if chains and scheduled:
+            print_chain_latencies(chains, taskSet)
+        if metricsFileName:
+            write_metrics(metricsFileName, core_metrics)
+            print("\nSolver metrics written to %s" % metricsFileName)
+        if exportFileName and scheduled:
+            from simplesmtscheduler.export import write_schedule
+            write_schedule(exportFileName, taskSet, wcet_offset, tasksFileName)
+            print("\nSchedule exported to %s" % exportFileName)
 
         if interactive:
             schedulePlot = plot_cyclic_schedule(taskSet, hyperPeriod,
                                                 schedulePlotPeriods, os.path.splitext(baseFileName)[0])
             schedulePlot.show()
         elif plot:
+            # The format follows the extension of the plot file, e.g. png, svg or pdf
             if split:
-                numberOfCores = max(t.coreid for t in taskSet) + 1
-                for i in range(numberOfCores):
+                plotBaseName, plotExtension = os.path.splitext(plotFileName)
+                corePlots = []
+                for i in sorted(set(t.coreid for t in taskSet)):
                     coreIdTasks = ([t for t in taskSet if t.coreid == i])
                     coreHyperperiod = find_lcm([o.period for o in coreIdTasks])
-                    plot_cyclic_schedule(coreIdTasks, coreHyperperiod,
-                                         schedulePlotPeriods, os.path.splitext(baseFileName)[0]).savefig(
-                        plotFileName.replace(".png", "_" + str(i) + ".png"), dpi=MY_DPI)
+                    plotArgs = (plotBaseName + "_" + str(i) + plotExtension, coreIdTasks, coreHyperperiod,
+                                schedulePlotPeriods, os.path.splitext(baseFileName)[0], plotDpi)
+                    # The cores are rendered by the worker processes when there are any
+                    if pool is not None:
+                        corePlots.append(pool.submit(save_cyclic_schedule_plot, *plotArgs))
+                    else:
+                        save_cyclic_schedule_plot(*plotArgs)
+                for corePlot in corePlots:
+                    corePlot.result()
             else:
-                schedulePlot = plot_cyclic_schedule(taskSet, hyperPeriod,
-                                                    schedulePlotPeriods, os.path.splitext(baseFileName)[0])
-                schedulePlot.savefig(plotFileName, dpi=MY_DPI)
+                save_cyclic_schedule_plot(plotFileName, taskSet, hyperPeriod, schedulePlotPeriods,
+                                          os.path.splitext(baseFileName)[0], plotDpi)
+        if pool is not None:
+            pool.shutdown()
 
         if code:
             gen_schedule_code(tasksFileName.replace(".csv", "_schedule.h"), tasksFileName, taskSet,
                               hyperPeriod,
-                              utilization, True)
+                              utilization, True, dispatch)
             sys.exit()
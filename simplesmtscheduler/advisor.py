@@ -0,0 +1,132 @@
+from bisect import bisect_left, bisect_right
+from math import ceil, floor, gcd
+
+from simplesmtscheduler.schedulers import calc_release_windows, overlapping_release_pairs
+from simplesmtscheduler.utilities import find_lcm
+
+# Harmonized hyperperiods are searched among the multiples of the time base whose other factors are these primes
+HARMONIC_PRIMES = (2, 3, 5, 7)
+# Counting the pruned disjunctions walks every colliding instance pair, larger models only report the upper bound
+MAX_COUNTED_INSTANCES = 200000
+
+
+def estimate_model_size(core_tasks, wcet_gap):
+    # Size of the cyclic model of one core without building it: one Int per release instance, release constraints
+    # per instance and the non-overlap disjunctions, both for all instance pairs and for the window pruned encoding
+    hyper_period = find_lcm([t.period for t in core_tasks])
+    instances = {t.name: hyper_period // t.period for t in core_tasks}
+    nr_instances = sum(instances.values())
+    all_pairs = sum(instances[a.name] * instances[b.name]
+                    for ii, a in enumerate(core_tasks) for b in core_tasks[ii + 1:])
+    disjunctions = None
+    if nr_instances <= MAX_COUNTED_INSTANCES:
+        windows = {t.name: calc_release_windows(t, hyper_period, wcet_gap) for t in core_tasks}
+        disjunctions = 0
+        for ii, task in enumerate(core_tasks):
+            for other_task in core_tasks[ii + 1:]:
+                disjunctions = disjunctions + sum(1 for _ in overlapping_release_pairs(
+                    *windows[task.name], task.execution + wcet_gap,
+                    *windows[other_task.name], other_task.execution + wcet_gap))
+    return dict(hyper_period=hyper_period, tasks=len(core_tasks), instances=instances, variables=nr_instances,
+                all_pair_disjunctions=all_pairs, disjunctions=disjunctions)
+
+
+def smooth_multiples(time_unit, lowest, highest):
+    # Sorted multiples of the time unit in [lowest, highest] whose other prime factors are HARMONIC_PRIMES
+    multiples = [1]
+    for prime in HARMONIC_PRIMES:
+        extended = []
+        for m in multiples:
+            while m * time_unit <= highest:
+                extended.append(m)
+                m = m * prime
+        multiples = extended
+    return sorted(m * time_unit for m in multiples if m * time_unit >= lowest)
+
+
+def multiple_divisors(time_unit, value):
+    # Sorted divisors of value that are multiples of the time unit, value / time_unit being HARMONIC_PRIMES smooth
+    divisors = [time_unit]
+    rest = value // time_unit
+    for prime in HARMONIC_PRIMES:
+        power = 0
+        while rest % prime == 0:
+            rest = rest // prime
+            power = power + 1
+        divisors = [d * prime ** k for d in divisors for k in range(power + 1)]
+    return sorted(divisors)
+
+
+def harmonize_periods(core_tasks, lower_tolerance, upper_tolerance=0.0):
+    # Proposes periods within [T * (1 - lower_tolerance), T * (1 + upper_tolerance)] of every task whose hyperperiod
+    # is the smallest one found, or None when no band allows a shorter hyperperiod than the current one. The periods
+    # stay multiples of the GCD of the original ones and at least the execution time of their task. Within the band
+    # the proposal keeps every period as close to the original as possible.
+    hyper_period = find_lcm([t.period for t in core_tasks])
+    time_unit = 0
+    for t in core_tasks:
+        time_unit = gcd(time_unit, t.period)
+    bands = []
+    for t in core_tasks:
+        lowest = max(t.execution, ceil(t.period * (1 - lower_tolerance)))
+        highest = floor(t.period * (1 + upper_tolerance))
+        bands.append((lowest, highest, t))
+    longest = max(lowest for lowest, _, _ in bands)
+    for candidate in smooth_multiples(time_unit, longest, hyper_period - 1):
+        divisors = multiple_divisors(time_unit, candidate)
+        periods = dict()
+        for lowest, highest, t in bands:
+            first = bisect_left(divisors, lowest)
+            last = bisect_right(divisors, highest)
+            if first == last:
+                break
+            periods[t.name] = min(divisors[first:last], key=lambda d: (abs(d - t.period), -d))
+        else:
+            return periods
+    return None
+
+
+def advise_core(core_tasks, wcet_gap, tolerance=None):
+    # Model size of one core and, given (lower, upper) tolerances, the harmonized periods with their model size
+    advice = dict(current=estimate_model_size(core_tasks, wcet_gap), periods=None, harmonized=None)
+    if tolerance is not None:
+        periods = harmonize_periods(core_tasks, *tolerance)
+        if periods is not None:
+            advice['periods'] = periods
+            advice['harmonized'] = estimate_model_size(harmonized_tasks(core_tasks, periods), wcet_gap)
+    return advice
+
+
+def harmonized_tasks(core_tasks, periods):
+    # Detached copies of the tasks running at the given periods
+    tasks = []
+    for t in core_tasks:
+        task = t.detached()
+        apply_period(task, periods[t.name])
+        tasks.append(task)
+    return tasks
+
+
+def apply_period(task, period):
+    # A deadline may not exceed a shortened period
+    task.deadline = min(task.deadline, period) if period < task.period else task.deadline
+    task.period = period
+
+
+def print_advice(core_id, advice):
+    current = advice['current']
+    print(f"\nCPU ID {core_id}:")
+    print("\t- Hyper period = %s" % current['hyper_period'])
+    print("\t- Release instances = %s (%s)" % (current['variables'], ", ".join(
+        "%s: %s" % (name, count) for name, count in current['instances'].items())))
+    print("\t- Non-overlap disjunctions = %s (all pairs = %s)" % (
+        current['disjunctions'] if current['disjunctions'] is not None else "not counted",
+        current['all_pair_disjunctions']))
+    if advice['periods'] is None:
+        return
+    harmonized = advice['harmonized']
+    print("\t- Harmonized hyper period = %s (%s release instances, %s disjunctions)" % (
+        harmonized['hyper_period'], harmonized['variables'],
+        harmonized['disjunctions'] if harmonized['disjunctions'] is not None else "not counted"))
+    for name, period in advice['periods'].items():
+        print("\t\t%s: T = %s" % (name, period))
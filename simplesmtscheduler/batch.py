@@ -0,0 +1,111 @@
+import contextlib
+import glob
+import io
+import json
+import os
+import sys
+from time import time
+
+from simplesmtscheduler.schedulers import solve_core_schedule
+from simplesmtscheduler.utilities import *
+
+
+def collect_task_sets(source):
+    # Task set CSVs of a directory, a glob pattern, a single CSV or a manifest listing one path per line (relative to
+    # the manifest, # for comments)
+    if os.path.isdir(source):
+        return sorted(glob.glob(os.path.join(source, "*.csv")))
+    if os.path.isfile(source) and not source.endswith(".csv"):
+        manifest_dir = os.path.dirname(source)
+        with open(source, 'r') as f:
+            lines = [line.strip() for line in f]
+        return [os.path.join(manifest_dir, line) for line in lines if line and not line.startswith("#")]
+    return sorted(glob.glob(source))
+
+
+def schedule_task_set(tasks_file_name, wcet_gap=0, optimize=False, legacy_encoding=False, cache=None,
+                      heuristic=False, granularity=None, portfolio=None, budget=60, objective='max', rolling=None,
+                      code=False, plot=False, plot_dpi=MY_DPI, dispatch=None):
+    # Schedules every core of one task set file and returns one result dict per core, or a single one without core
+    # when the file cannot be scheduled at all. Output files are written next to the CSV like the CLI does.
+    start_time = time()
+    record = dict(file=tasks_file_name, core_id=None)
+    task_set = []
+    try:
+        # Reports of the schedulers would only interleave with the JSON lines
+        with contextlib.redirect_stdout(io.StringIO()):
+            parse_csv_taskset(tasks_file_name, task_set, verbose=False)
+            error = check_task_set(task_set)
+            if error is not None:
+                return [dict(record, status='invalid', error=error, elapsed=time() - start_time)]
+            core_ids = sorted(set(t.coreid for t in task_set))
+            results = []
+            for core_id in core_ids:
+                core_tasks = [t for t in task_set if t.coreid == core_id]
+                activations, utilization, hyper_period, elapsed_time, metrics = solve_core_schedule(
+                    core_tasks, wcet_gap, optimize, False, legacy_encoding, cache, heuristic, granularity, portfolio,
+                    budget, objective, rolling)
+                results.append(dict(record, core_id=core_id, status='sat' if activations is not None else 'unsat',
+                                    scheduler=metrics.scheduler, tasks=len(core_tasks), utilization=utilization,
+                                    hyper_period=hyper_period, elapsed=elapsed_time, build_time=metrics.build_time,
+                                    solve_time=metrics.solve_time))
+                if metrics.reason is not None:
+                    results[-1]['reason'] = metrics.reason
+                if metrics.configuration is not None:
+                    results[-1]['configuration'] = metrics.configuration
+            if results and all(r['status'] == 'sat' for r in results):
+                write_task_set_outputs(tasks_file_name, task_set, results, code, plot, plot_dpi, dispatch)
+            return results
+    except Exception as e:
+        return [dict(record, status='error', error="%s: %s" % (type(e).__name__, e), elapsed=time() - start_time)]
+
+
+def write_task_set_outputs(tasks_file_name, task_set, results, code=False, plot=False, plot_dpi=MY_DPI,
+                           dispatch=None):
+    # Header and plot of a scheduled task set, a failure is reported with the core results instead of replacing them
+    hyper_period = find_lcm([t.period for t in task_set])
+    utilization = sum(t.execution / t.period for t in task_set) * 100
+    try:
+        if code:
+            header_file_name = tasks_file_name.replace(".csv", "_schedule.h")
+            gen_schedule_code(header_file_name, tasks_file_name, task_set, hyper_period, utilization, True,
+                              dispatch)
+            for r in results:
+                r['header'] = header_file_name
+        if plot:
+            plot_file_name = tasks_file_name.replace(".csv", "_schedule.png")
+            save_cyclic_schedule_plot(plot_file_name, task_set, hyper_period, 1,
+                                      os.path.splitext(os.path.basename(tasks_file_name))[0], plot_dpi)
+            for r in results:
+                r['plot'] = plot_file_name
+    except Exception as e:
+        for r in results:
+            r['error'] = "%s: %s" % (type(e).__name__, e)
+
+
+def run_batch(tasks_file_names, output=None, jobs=1, **options):
+    # Streams one JSON line per task set and core to output (stdout by default) as the task sets complete.
+    # With more than one job the task sets are spread over a process pool whose workers keep their imports.
+    output = sys.stdout if output is None else output
+    if jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(schedule_task_set, file_name, **options) for file_name in tasks_file_names]
+            completed = (f.result() for f in as_completed(futures))
+            nr_failed = write_batch_results(completed, output)
+    else:
+        completed = (schedule_task_set(file_name, **options) for file_name in tasks_file_names)
+        nr_failed = write_batch_results(completed, output)
+    return nr_failed
+
+
+def write_batch_results(completed, output):
+    # Writes the results of every completed task set and returns the number of task sets that were not scheduled
+    nr_failed = 0
+    for results in completed:
+        for result in results:
+            output.write(json.dumps(result) + "\n")
+        output.flush()
+        if any(r['status'] != 'sat' or 'error' in r for r in results):
+            nr_failed = nr_failed + 1
+    return nr_failed
@@ -0,0 +1,130 @@
+import contextlib
+import csv
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import resource
+import subprocess
+import sys
+from time import time
+
+from simplesmtscheduler.generator import gen_task_set
+from simplesmtscheduler.metrics import SolverMetrics
+from simplesmtscheduler.simulator import deadline_misses, simulate_schedule
+from simplesmtscheduler.smtmodels import distributed_task_mapping, gen_cyclic_schedule_model
+from simplesmtscheduler.utilities import find_lcm
+
+BENCHMARK_SCHEDULERS = ('cyclic', 'rm', 'edf', 'mapping')
+BENCHMARK_FIELDS = ['scheduler', 'nr_tasks', 'nr_cores', 'hyper_period', 'utilization', 'distribution', 'seed',
+                    'instances', 'result', 'build_time', 'solve_time', 'extraction_time', 'variables', 'assertions',
+                    'disjunctions', 'peak_rss_kb', 'model_rss_kb']
+# Modules the command line must not import before they are needed, plotting and the solver back-end
+STARTUP_HEAVY_MODULES = ('z3', 'matplotlib', 'numpy')
+
+
+def run_benchmark_case(case):
+    # Generates the task set of a case and runs its scheduler, returns the case extended with the measurements.
+    # Memory is the peak resident set of the process, meant to be measured in a fresh worker per case.
+    start_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    task_set = gen_task_set(case['nr_tasks'], case['utilization'], case['nr_cores'], case['hyper_period'],
+                            case.get('period_min', 10), case['distribution'], case.get('jitter_ratio', 0.0),
+                            case.get('offset_ratio', 0.0), case['seed'])
+    wcet_gap = case.get('wcet_gap', 0)
+    metrics = SolverMetrics(case['scheduler'])
+    # The schedulers report on stdout, which would only interleave with the benchmark output
+    with contextlib.redirect_stdout(io.StringIO()):
+        if case['scheduler'] == 'cyclic':
+            gen_cyclic_schedule_model(task_set, wcet_gap, metrics=metrics)
+        elif case['scheduler'] == 'mapping':
+            distributed_task_mapping(task_set, case['nr_cores'], wcet_gap,
+                                     utilization_bound=case.get('utilization_bound', 1.0), metrics=metrics)
+            metrics.collect_instances(task_set, find_lcm([t.period for t in task_set]))
+        else:
+            # The simulated policies have no notion of cores, every core is simulated on its own
+            solve_time = 0
+            misses = 0
+            for core in range(case['nr_cores']):
+                trace, _, _, elapsed_time = simulate_schedule([t for t in task_set if t.coreid == core], wcet_gap,
+                                                              case['scheduler'], case.get('preemptive', True))
+                solve_time += elapsed_time
+                misses += len(deadline_misses(trace))
+            metrics.result = 'unsat' if misses else 'sat'
+            metrics.solve_time = solve_time
+            metrics.collect_instances(task_set, find_lcm([t.period for t in task_set]))
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return dict(case, hyper_period=metrics.hyper_period, instances=sum(metrics.instances.values()),
+                result=metrics.result, build_time=metrics.build_time, solve_time=metrics.solve_time,
+                extraction_time=metrics.extraction_time, variables=metrics.variables, assertions=metrics.assertions,
+                disjunctions=metrics.disjunctions, peak_rss_kb=peak_rss, model_rss_kb=peak_rss - start_rss)
+
+
+def benchmark_worker(results, case):
+    results.put(run_benchmark_case(case))
+
+
+def run_benchmark(schedulers=BENCHMARK_SCHEDULERS, task_counts=(4, 8, 16), hyper_periods=(1000, 10000),
+                  utilizations=(0.3, 0.6), core_counts=(1,), seeds=(0,), distribution='loguniform', timeout=60,
+                  verbose=False, **case_options):
+    # Runs the cartesian product of the parameters, one process per case so that a timeout can kill the solver and
+    # the peak memory of one case does not carry over to the next. Remaining keywords are passed on to every case.
+    results = []
+    for scheduler, nr_tasks, hyper_period, utilization, nr_cores, seed in itertools.product(
+            schedulers, task_counts, hyper_periods, utilizations, core_counts, seeds):
+        case = dict(case_options, scheduler=scheduler, nr_tasks=nr_tasks, nr_cores=nr_cores,
+                    hyper_period=hyper_period, utilization=utilization, distribution=distribution, seed=seed)
+        case_results = multiprocessing.Queue()
+        worker = multiprocessing.Process(target=benchmark_worker, args=(case_results, case), daemon=True)
+        start_time = time()
+        worker.start()
+        try:
+            result = case_results.get(timeout=timeout)
+        except queue.Empty:
+            result = dict(case, result='timeout', solve_time=time() - start_time)
+        finally:
+            if worker.is_alive():
+                worker.kill()
+            worker.join()
+        if verbose:
+            print("%s tasks=%s cores=%s H=%s U=%s seed=%s: %s in %s s" % (
+                scheduler, nr_tasks, nr_cores, result.get('hyper_period'), utilization, seed, result['result'],
+                round(result.get('build_time', 0) + result['solve_time'], 3)))
+        results.append(result)
+    return results
+
+
+def write_benchmark_results(results, file_name):
+    # JSON keeps every field of the cases, CSV only the common ones
+    with open(file_name, 'w', newline='') as f:
+        if file_name.endswith('.csv'):
+            writer = csv.DictWriter(f, fieldnames=BENCHMARK_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(results)
+        else:
+            json.dump(results, f, indent=2)
+
+
+def measure_startup(script, repetitions=5):
+    # Import cost every invocation of a command line script pays: the best wall clock of the script printing its
+    # help against the one of a bare interpreter, and the heavy modules importing the script pulls in
+    script_dir = os.path.dirname(os.path.abspath(script))
+
+    def best_time(args):
+        times = []
+        for _ in range(repetitions):
+            start_time = time()
+            subprocess.run([sys.executable] + args, cwd=script_dir, stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL, check=True)
+            times.append(time() - start_time)
+        return min(times)
+
+    probe = "import sys\nimport %s\nprint(','.join(m for m in %r if m in sys.modules))" % (
+        os.path.splitext(os.path.basename(script))[0], STARTUP_HEAVY_MODULES)
+    loaded = subprocess.run([sys.executable, '-c', probe], cwd=script_dir, capture_output=True, text=True,
+                            check=True).stdout.strip()
+    interpreter_time = best_time(['-c', 'pass'])
+    startup_time = best_time([os.path.abspath(script), '-h'])
+    return dict(script=script, interpreter_time=interpreter_time, startup_time=startup_time,
+                overhead=startup_time - interpreter_time, heavy_modules=[m for m in loaded.split(',') if m])
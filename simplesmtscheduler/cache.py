@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import tempfile
+
+from simplesmtscheduler import __version__
+from simplesmtscheduler.verifier import verify_core_activations
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "simplesmtscheduler")
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def taskset_fingerprint(core_tasks, wcet_gap, optimize=False, legacy_encoding=False, options=None):
+    # Canonical hash of everything that determines a schedule, independent of the task order in the CSV. options
+    # holds the other solve shaping options as JSON values (heuristic, granularity, budget, objective, rolling...).
+    tasks = sorted([t.name, t.period, t.execution, t.deadline, t.offset, t.jitter, t.coreid,
+                    int(t.fixed_pit) if hasattr(t, 'fixed_pit') else None] for t in core_tasks)
+    canonical = json.dumps({"tasks": tasks, "wcet_gap": wcet_gap, "optimize": bool(optimize),
+                            "legacy_encoding": bool(legacy_encoding), "options": options or {},
+                            "version": __version__}, sort_keys=True)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def verify_cached_activations(core_tasks, activations, wcet_gap):
+    # Checks a cached schedule against the constraints of the cyclic model for the current task set
+    return not verify_core_activations(core_tasks, activations, wcet_gap, wrap_around=False)
+
+
+class ScheduleCache:
+    # On-disk cache of per core activation instances with a size bounded least recently used eviction
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def entry_path(self, key):
+        return os.path.join(self.cache_dir, key + ".json")
+
+    def load(self, key, core_tasks, wcet_gap):
+        path = self.entry_path(key)
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+            activations = [entry["activations"][t.name] for t in core_tasks]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        valid = verify_cached_activations(core_tasks, activations, wcet_gap)
+        try:
+            if valid:
+                # Refresh the access time used by the eviction policy
+                os.utime(path)
+            else:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+        return activations if valid else None
+
+    def store(self, key, core_tasks, activations):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry = {"version": __version__,
+                 "activations": {t.name: list(a) for t, a in zip(core_tasks, activations)}}
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, self.entry_path(key))
+        self.evict()
+
+    def evict(self):
+        # Workers of -j and batch mode evict the same directory concurrently, an entry may vanish at any point
+        entries = []
+        for file_name in os.listdir(self.cache_dir):
+            if file_name.endswith(".json"):
+                try:
+                    stat = os.stat(os.path.join(self.cache_dir, file_name))
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, file_name))
+        total_bytes = sum(e[1] for e in entries)
+        for mtime, size, file_name in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, file_name))
+            except FileNotFoundError:
+                pass
+            total_bytes = total_bytes - size
+
+    def clear(self):
+        if os.path.isdir(self.cache_dir):
+            for file_name in os.listdir(self.cache_dir):
+                if file_name.endswith(".json") or file_name.endswith(".tmp"):
+                    try:
+                        os.remove(os.path.join(self.cache_dir, file_name))
+                    except FileNotFoundError:
+                        continue
@@ -0,0 +1,106 @@
+import csv
+from collections import OrderedDict, namedtuple
+
+from simplesmtscheduler.utilities import find_lcm
+
+# A precedence chain through tasks that may run on different CPU IDs, delays[ii] is the communication delay between
+# the end of tasks[ii] and the start of tasks[ii + 1]
+PrecedenceChain = namedtuple('PrecedenceChain', ['name', 'tasks', 'delays'])
+
+
+def parse_chains_csv(csv_file):
+    # Precedence chains of a CSV with one row per hop: Chain, Producer, Consumer and optionally Delay. The hops of a
+    # chain are listed in order, the producer of every hop being the consumer of the previous one. Rows starting with
+    # # are comments.
+    with open(csv_file, 'r') as f:
+        rows = [[value.strip() for value in row] for row in csv.reader(f)]
+    hops = OrderedDict()
+    for row in rows[1:]:
+        if not row or not row[0] or row[0].startswith("#"):
+            continue
+        name, producer, consumer = row[:3]
+        delay = int(row[3]) if len(row) > 3 and row[3] else 0
+        hops.setdefault(name, []).append((producer, consumer, delay))
+    chains = []
+    for name, chain_hops in hops.items():
+        tasks = [chain_hops[0][0]]
+        for producer, consumer, delay in chain_hops:
+            if producer != tasks[-1]:
+                raise ValueError("Hop %s -> %s of chain %s does not continue from %s" % (producer, consumer, name,
+                                                                                        tasks[-1]))
+            tasks.append(consumer)
+        chains.append(PrecedenceChain(name, tuple(tasks), tuple(delay for _, _, delay in chain_hops)))
+    return chains
+
+
+def check_chains(chains, task_set):
+    # Reason why the chains cannot be scheduled with the task set, None when they are valid
+    names = set(t.name for t in task_set)
+    for chain in chains:
+        unknown = [name for name in chain.tasks if name not in names]
+        if unknown:
+            return "Chain %s refers to unknown tasks %s" % (chain.name, unknown)
+        if len(set(chain.tasks)) != len(chain.tasks):
+            return "Chain %s passes a task more than once" % chain.name
+        if [delay for delay in chain.delays if delay < 0]:
+            return "Chain %s has a negative delay" % chain.name
+    return None
+
+
+def core_hyper_periods(task_set):
+    return {core_id: find_lcm([t.period for t in task_set if t.coreid == core_id])
+            for core_id in set(t.coreid for t in task_set)}
+
+
+def chain_instances(chain, tasks_by_name, hyper_periods):
+    # Release indices of the chain tasks for every release of the last task within the hyper period of the chain,
+    # the LCM of the hyper periods of the CPU IDs it passes. Release k of a consumer follows the release of its
+    # producer whose nominal period contains the nominal release of the consumer, release k for equal periods.
+    # Indices may exceed the releases of a task in the hyper period of its CPU ID, see release_start.
+    tasks = [tasks_by_name[name] for name in chain.tasks]
+    hyper_period = find_lcm([hyper_periods[t.coreid] for t in tasks])
+    instances = []
+    for kk in range(hyper_period // tasks[-1].period):
+        indices = [kk]
+        for producer, consumer in zip(tasks[-2::-1], tasks[:0:-1]):
+            indices.insert(0, indices[0] * consumer.period // producer.period)
+        instances.append(indices)
+    return instances
+
+
+def release_start(release_instances, nn, hyper_period):
+    # Start of release nn of a task repeating its release instances every hyper period of its CPU ID, the release
+    # instances may be PITs or solver terms
+    count = len(release_instances)
+    return release_instances[nn % count] + (nn // count) * hyper_period
+
+
+def chain_hops(chain, tasks_by_name, hyper_periods, release_instances):
+    # For every chain instance the starts of its releases along the chain, release_instances maps the task names
+    # to their activation instances or solver terms
+    tasks = [tasks_by_name[name] for name in chain.tasks]
+    return [[release_start(release_instances[t.name], nn, hyper_periods[t.coreid]) for t, nn in zip(tasks, indices)]
+            for indices in chain_instances(chain, tasks_by_name, hyper_periods)]
+
+
+def chain_latencies(chain, task_set):
+    # End to end latency of every instance of a chain, from the start of its first task to the end of its last one,
+    # given the activation instances of the tasks
+    tasks_by_name = {t.name: t for t in task_set}
+    last = tasks_by_name[chain.tasks[-1]]
+    release_instances = {name: tasks_by_name[name].getStartPIT() for name in chain.tasks}
+    return [starts[-1] + last.execution - starts[0]
+            for starts in chain_hops(chain, tasks_by_name, core_hyper_periods(task_set), release_instances)]
+
+
+def min_chain_latency(chain, tasks_by_name):
+    # Lower bound of the latency of a chain, its executions and delays back to back
+    return sum(tasks_by_name[name].execution for name in chain.tasks) + sum(chain.delays)
+
+
+def print_chain_latencies(chains, task_set):
+    print("\nPrecedence chain latencies:")
+    for chain in chains:
+        latencies = chain_latencies(chain, task_set)
+        print("\t%s (%s): worst = %s, best = %s over %s instances" % (
+            chain.name, " -> ".join(chain.tasks), max(latencies), min(latencies), len(latencies)))
@@ -0,0 +1,146 @@
+import json
+import struct
+
+import numpy as np
+
+from simplesmtscheduler import __version__
+from simplesmtscheduler.taskdefs import TaskTable
+from simplesmtscheduler.utilities import find_lcm
+
+# File header: magic, format version, metadata length and offset of the activation arrays
+EXPORT_MAGIC = b'SSMTSCHD'
+EXPORT_FORMAT_VERSION = 1
+EXPORT_HEADER = struct.Struct('<8sIIQ')
+# Activation PITs as contiguous little-endian 64 bit integers, every task array starts at an 8 byte boundary
+EXPORT_DTYPE = np.dtype('<i8')
+
+
+def schedule_metadata(task_set, wcet_gap=0, tasks_file_name=None):
+    # Per core and per task description of a scheduled task set, the task entries locate the activations of the task
+    # as an element offset and count into the activation arrays (activations_offset, activations_count)
+    core_ids = sorted(set(t.coreid for t in task_set))
+    cores = []
+    for core_id in core_ids:
+        core_tasks = [t for t in task_set if t.coreid == core_id]
+        cores.append(dict(core_id=core_id, hyper_period=find_lcm([t.period for t in core_tasks]),
+                          utilization=sum(t.execution / t.period for t in core_tasks) * 100, tasks=len(core_tasks)))
+    tasks = []
+    offset = 0
+    for t in task_set:
+        count = len(t.getStartPIT())
+        tasks.append(dict(t.toActualDict(), activations_offset=offset, activations_count=count))
+        del tasks[-1]['activation_instances']
+        offset = offset + count
+    return dict(format_version=EXPORT_FORMAT_VERSION, version=__version__, tasks_file=tasks_file_name,
+                wcet_gap=wcet_gap, cores=cores, tasks=tasks)
+
+
+def write_schedule_binary(file_name, task_set, wcet_gap=0, tasks_file_name=None):
+    metadata = json.dumps(schedule_metadata(task_set, wcet_gap, tasks_file_name)).encode()
+    data_offset = EXPORT_HEADER.size + len(metadata)
+    data_offset = data_offset + (-data_offset % EXPORT_DTYPE.itemsize)
+    with open(file_name, 'wb') as f:
+        f.write(EXPORT_HEADER.pack(EXPORT_MAGIC, EXPORT_FORMAT_VERSION, len(metadata), data_offset))
+        f.write(metadata)
+        f.write(b'\0' * (data_offset - f.tell()))
+        for t in task_set:
+            f.write(np.asarray(t.getStartPIT(), dtype=EXPORT_DTYPE).tobytes())
+    return file_name
+
+
+def write_schedule_json(file_name, task_set, wcet_gap=0, tasks_file_name=None):
+    # Same metadata as the binary export with the activations inline, meant for small task sets and inspection
+    metadata = schedule_metadata(task_set, wcet_gap, tasks_file_name)
+    for task, entry in zip(task_set, metadata['tasks']):
+        entry['activation_instances'] = [int(pit) for pit in task.getStartPIT()]
+    with open(file_name, 'w') as f:
+        json.dump(metadata, f, indent=2)
+    return file_name
+
+
+def write_schedule(file_name, task_set, wcet_gap=0, tasks_file_name=None):
+    # The format follows the extension, JSON for .json and the binary format otherwise
+    if file_name.endswith(".json"):
+        return write_schedule_json(file_name, task_set, wcet_gap, tasks_file_name)
+    return write_schedule_binary(file_name, task_set, wcet_gap, tasks_file_name)
+
+
+class ScheduleExport:
+    # A loaded schedule export. The activations of a binary export are views into a read only memory map of the file,
+    # nothing is copied until tasks() turns them into activation instances.
+
+    def __init__(self, metadata, activations):
+        self.metadata = metadata
+        self.activations = activations
+        self.task_entries = {entry['name']: entry for entry in metadata['tasks']}
+
+    @classmethod
+    def load(cls, file_name):
+        with open(file_name, 'rb') as f:
+            header = f.read(EXPORT_HEADER.size)
+            if header[:len(EXPORT_MAGIC)] != EXPORT_MAGIC:
+                f.seek(0)
+                return cls.load_json(f)
+            magic, format_version, metadata_length, data_offset = EXPORT_HEADER.unpack(header)
+            if format_version > EXPORT_FORMAT_VERSION:
+                raise ValueError("Schedule export %s has format version %s, this version reads up to %s" % (
+                    file_name, format_version, EXPORT_FORMAT_VERSION))
+            metadata = json.loads(f.read(metadata_length).decode())
+        nr_activations = sum(entry['activations_count'] for entry in metadata['tasks'])
+        if nr_activations == 0:
+            return cls(metadata, np.zeros(0, dtype=EXPORT_DTYPE))
+        return cls(metadata, np.memmap(file_name, dtype=EXPORT_DTYPE, mode='r', offset=data_offset,
+                                       shape=(nr_activations,)))
+
+    @classmethod
+    def load_json(cls, f):
+        metadata = json.load(f)
+        if metadata.get('format_version', 0) > EXPORT_FORMAT_VERSION:
+            raise ValueError("Schedule export has format version %s, this version reads up to %s" % (
+                metadata['format_version'], EXPORT_FORMAT_VERSION))
+        activations = np.array([pit for entry in metadata['tasks'] for pit in entry.pop('activation_instances')],
+                               dtype=EXPORT_DTYPE)
+        return cls(metadata, activations)
+
+    @property
+    def wcet_gap(self):
+        return self.metadata['wcet_gap']
+
+    @property
+    def tasks_file(self):
+        return self.metadata.get('tasks_file')
+
+    def task_names(self):
+        return [entry['name'] for entry in self.metadata['tasks']]
+
+    def entry_activations(self, entry):
+        start = entry['activations_offset']
+        return self.activations[start:start + entry['activations_count']]
+
+    def task_activations(self, name):
+        # View of the activation PITs of one task
+        if name not in self.task_entries:
+            raise KeyError("Task %s is not part of the schedule export" % name)
+        return self.entry_activations(self.task_entries[name])
+
+    def core_activations(self, core_id):
+        # Activation views of the tasks of one core by task name
+        return {entry['name']: self.entry_activations(entry)
+                for entry in self.metadata['tasks'] if entry['coreid'] == core_id}
+
+    def tasks(self):
+        # The exported task set as silent task views carrying their activation instances
+        table = TaskTable()
+        task_set = []
+        for entry in self.metadata['tasks']:
+            index = table.append(entry['period'], entry['execution'], entry['deadline'], entry['offset'],
+                                 entry['jitter'], entry['coreid'], entry['fixed_pit'], entry['name'], entry['cfunc'])
+            task = table.task(index)
+            task.mapped_coreid = entry.get('mapped_coreid')
+            task.activation_instances = self.entry_activations(entry).tolist()
+            task_set.append(task)
+        return task_set
+
+
+def load_schedule(file_name):
+    return ScheduleExport.load(file_name)
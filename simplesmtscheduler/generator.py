@@ -0,0 +1,74 @@
+import csv
+import random
+from math import *
+
+from simplesmtscheduler.taskdefs import TaskTable
+
+PERIOD_DISTRIBUTIONS = ('loguniform', 'harmonic')
+
+
+def uunifast(nr_tasks, total_utilization, rng=random):
+    # UUniFast (Bini and Buttazzo), utilizations uniformly distributed over the simplex summing to the total
+    utilizations = []
+    remaining = total_utilization
+    for ii in range(1, nr_tasks):
+        next_remaining = remaining * rng.random() ** (1 / (nr_tasks - ii))
+        utilizations.append(remaining - next_remaining)
+        remaining = next_remaining
+    utilizations.append(remaining)
+    return utilizations
+
+
+def gen_periods(nr_tasks, hyper_period, period_min=1, distribution='loguniform', rng=random):
+    # Periods are drawn among the divisors of the hyperperiod so that it stays bounded by the given one.
+    # 'loguniform' snaps a log-uniform draw in [period_min, hyper_period] to the closest divisor,
+    # 'harmonic' picks hyper_period / 2^k so every period divides all longer ones.
+    if distribution not in PERIOD_DISTRIBUTIONS:
+        raise ValueError("Unknown period distribution %s" % distribution)
+    if distribution == 'harmonic':
+        candidates = []
+        period = hyper_period
+        while period >= period_min and period == int(period):
+            candidates.append(int(period))
+            period = period / 2
+        return [rng.choice(candidates) for _ in range(nr_tasks)]
+    candidates = [d for d in range(max(1, ceil(period_min)), hyper_period + 1) if hyper_period % d == 0]
+    if not candidates:
+        raise ValueError("No divisor of %s is above %s" % (hyper_period, period_min))
+    log_min = log(candidates[0])
+    log_max = log(candidates[-1])
+    periods = []
+    for _ in range(nr_tasks):
+        log_period = rng.uniform(log_min, log_max)
+        periods.append(min(candidates, key=lambda d: abs(log(d) - log_period)))
+    return periods
+
+
+def gen_task_set(nr_tasks, utilization, nr_cores=1, hyper_period=1000, period_min=10, distribution='loguniform',
+                 jitter_ratio=0.0, offset_ratio=0.0, seed=None):
+    # Random task set with nr_tasks per core and the given utilization (fraction, not %) on each core.
+    # Jitter and offsets are fractions of the period, deadlines are implicit.
+    rng = random.Random(seed)
+    table = TaskTable()
+    for core in range(nr_cores):
+        periods = gen_periods(nr_tasks, hyper_period, period_min, distribution, rng)
+        for ii, task_utilization in enumerate(uunifast(nr_tasks, utilization, rng)):
+            period = periods[ii]
+            execution = max(1, round(task_utilization * period))
+            jitter = floor(jitter_ratio * period)
+            # The offset is bounded so that the last instance still fits within its period
+            offset = rng.randint(0, max(0, floor(offset_ratio * (period - execution))))
+            table.append(period, execution, period, offset, jitter, core, None, "T%s_%s" % (core, ii),
+                         "&task_%s_%s" % (core, ii))
+    return table.tasks()
+
+
+def write_csv_taskset(csv_file, task_set):
+    # Same columns as the examples so that generated sets can be fed to the command line
+    with open(csv_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Period", "Execution", "Deadline", "Offset", "Jitter", "CPU ID", "Fixed Start", "Name",
+                         "Function"])
+        for t in task_set:
+            writer.writerow([t.period, t.execution, t.deadline, t.offset, t.jitter, t.coreid,
+                             getattr(t, 'fixed_pit', "None"), t.name, t.cfunc])
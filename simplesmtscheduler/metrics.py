@@ -0,0 +1,42 @@
+import json
+
+
+class SolverMetrics:
+    # Measurements of one scheduler run as plain data, so that it can travel back from a worker process and be
+    # dumped as JSON. Times are in seconds, the solver statistics are the ones Z3 reports after the last check.
+    # The hyper period is expressed in the time unit of the solved model, see normalize_time_base. A task set
+    # rejected by the pre-check has no solver statistics but the reason it cannot be scheduled. The configuration is
+    # the one that won a solver portfolio race.
+
+    def __init__(self, scheduler=None, time_unit=1):
+        self.scheduler = scheduler
+        self.time_unit = time_unit
+        self.result = None
+        self.reason = None
+        self.configuration = None
+        self.build_time = 0.0
+        self.solve_time = 0.0
+        self.extraction_time = 0.0
+        self.variables = 0
+        self.assertions = 0
+        self.disjunctions = 0
+        self.hyper_period = None
+        self.instances = dict()
+        self.statistics = dict()
+
+    def collect_instances(self, task_set, hyper_period):
+        self.hyper_period = hyper_period
+        self.instances = {t.name: int(hyper_period // t.period) for t in task_set}
+
+    def collect_solver(self, smt):
+        self.assertions = len(smt.assertions())
+        self.statistics = {k: v for k, v in smt.statistics()}
+
+    def as_dict(self):
+        return dict(self.__dict__)
+
+
+def write_metrics(file_name, metrics):
+    # A list of metrics dicts, e.g. one per core, in a file that can be diffed across task set revisions
+    with open(file_name, 'w') as f:
+        json.dump(metrics, f, indent=2, default=str)
@@ -0,0 +1,91 @@
+import multiprocessing
+import os
+import queue
+from time import time
+
+from simplesmtscheduler.utilities import find_lcm
+
+# Solver configurations raced against each other, the first one is the default of gen_cyclic_schedule_model
+DEFAULT_PORTFOLIO = [
+    {'name': 'int-arith3', 'params': {'arith.solver': 3, 'arith.auto_config_simplex': True}},
+    {'name': 'int-arith6', 'params': {'arith.solver': 6}},
+    {'name': 'int-arith2', 'params': {'arith.solver': 2}},
+    {'name': 'int-qflia', 'tactic': 'qflia'},
+    {'name': 'bv-qfbv', 'logic': 'QF_BV', 'encoding': 'bv'},
+    {'name': 'int-arith6-seed7', 'params': {'arith.solver': 6, 'random_seed': 7}},
+]
+# Seconds between checks of the racing workers for an answer or an exit without one
+PORTFOLIO_POLL_INTERVAL = 0.1
+
+
+def portfolio_worker(results, solver_config, core_tasks, wcet_gap, legacy_encoding):
+    # Reports (name, status, activations, elapsed time), the status being sat, unsat, unknown or error. A model of an
+    # unknown answer is not a schedule and is never reported as one.
+    from simplesmtscheduler.metrics import SolverMetrics
+    from simplesmtscheduler.smtmodels import gen_cyclic_schedule_model, gen_schedule_activations
+    metrics = SolverMetrics()
+    try:
+        schedule, _, _, elapsed_time = gen_cyclic_schedule_model(core_tasks, wcet_gap, False, False, legacy_encoding,
+                                                                 solver_config=solver_config, metrics=metrics)
+    except Exception as e:
+        results.put((solver_config['name'], 'error', "%s: %s" % (type(e).__name__, e), 0))
+        return
+    if metrics.result != 'sat':
+        results.put((solver_config['name'], metrics.result, None, elapsed_time))
+        return
+    for task in core_tasks:
+        task.activation_instances = []
+    gen_schedule_activations(schedule, core_tasks)
+    results.put((solver_config['name'], 'sat', [list(t.getStartPIT()) for t in core_tasks], elapsed_time))
+
+
+def solve_portfolio(core_tasks, wcet_gap, legacy_encoding=False, solver_configs=None, timeout=None, max_workers=None,
+                    metrics=None):
+    # Runs every configuration in its own process, keeps the first conclusive answer and kills the others.
+    # Only as many configurations as there are CPUs are raced, in the order given. The status returned last is sat,
+    # unsat or unknown, the latter when every worker failed, crashed or the timeout (s) expired. The name of the
+    # winning configuration is recorded in the given SolverMetrics.
+    solver_configs = DEFAULT_PORTFOLIO if solver_configs is None else solver_configs
+    solver_configs = solver_configs[:max(1, max_workers or os.cpu_count() or 1)]
+    hyper_period = find_lcm([t.period for t in core_tasks])
+    utilization = sum(t.execution / t.period for t in core_tasks) * 100
+    start_time = time()
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=portfolio_worker,
+                                       args=(results, solver_config, core_tasks, wcet_gap, legacy_encoding),
+                                       daemon=True)
+               for solver_config in solver_configs]
+    for worker in workers:
+        worker.start()
+    winner = None
+    status = 'unknown'
+    activations = None
+    answers = 0
+    try:
+        while answers < len(workers) and (timeout is None or time() - start_time < timeout):
+            # Workers are polled so that one dying without an answer (crash, out of memory) cannot block the race
+            try:
+                name, worker_status, worker_result, _ = results.get(timeout=PORTFOLIO_POLL_INTERVAL)
+            except queue.Empty:
+                if all(worker.exitcode is not None for worker in workers) and results.empty():
+                    break
+                continue
+            answers = answers + 1
+            if worker_status in ('sat', 'unsat'):
+                winner, status, activations = name, worker_status, worker_result
+                break
+            if worker_status == 'error':
+                print("\t- Portfolio configuration %s failed: %s" % (name, worker_result))
+    finally:
+        for worker in workers:
+            if worker.is_alive():
+                worker.kill()
+            worker.join()
+    elapsed_time = time() - start_time
+    if metrics is not None:
+        metrics.configuration = winner
+    if winner is not None:
+        print("\t- Portfolio winner: %s (%s) in %s ms" % (winner, status, elapsed_time * 1000))
+    else:
+        print("\t- Portfolio found no conclusive answer")
+    return activations, utilization, hyper_period, elapsed_time, status
@@ -0,0 +1,99 @@
+import numpy as np
+
+from simplesmtscheduler.schedulers import calc_release_windows
+from simplesmtscheduler.utilities import find_lcm
+
+# Interval starts tried by the processor demand check, larger sets are sampled which keeps the check necessary
+MAX_DEMAND_POINTS = 2000
+MAX_TIGHTENING_PASSES = 10
+
+
+def propagate_period_chain(lo, hi, period, jitter):
+    # Consecutive releases are separated by period +/- jitter, vectorized form of the loops in calc_release_windows
+    step = (period - jitter) * np.arange(len(lo), dtype=np.int64)
+    lo = np.maximum.accumulate(lo - step) + step
+    hi = np.minimum.accumulate((hi - step)[::-1])[::-1] + step
+    return lo, hi
+
+
+def exclude_fixed_releases(lo, hi, busy, fixed_starts, fixed_ends):
+    # A release may not start within (start - busy, end) of a release of another task that cannot move. With the
+    # fixed releases sorted by start a single lookup per bound finds the interval it falls in, every move is checked
+    # against that interval so the bounds stay valid even where the lookup misses one.
+    if len(fixed_starts) == 0:
+        return lo, hi
+    jj = np.searchsorted(fixed_starts, lo + busy, side='left') - 1
+    inside = (jj >= 0) & (fixed_ends[np.maximum(jj, 0)] > lo)
+    lo = np.where(inside, fixed_ends[np.maximum(jj, 0)], lo)
+    jj = np.minimum(np.searchsorted(fixed_ends, hi, side='right'), len(fixed_starts) - 1)
+    inside = (fixed_ends[jj] > hi) & (fixed_starts[jj] < hi + busy)
+    hi = np.where(inside, fixed_starts[jj] - busy, hi)
+    return lo, hi
+
+
+def check_schedulability(task_set, wcet_gap, time_unit=1):
+    # Necessary conditions of the cyclic model checked over the per core task arrays before any solver is involved.
+    # Returns the reason the task set cannot be scheduled, or None, together with the release bounds of every task
+    # instance (task name to lo and hi lists) that the SMT models can assert and prune their disjunctions with.
+    # Times in the reasons are multiplied by time_unit to report them in the units of the task set file.
+    hyper_period = find_lcm([t.period for t in task_set])
+    busy = {t.name: t.execution + wcet_gap for t in task_set}
+    windows = dict()
+    for t in task_set:
+        lo, hi = calc_release_windows(t, hyper_period, wcet_gap)
+        windows[t.name] = (np.array(lo, dtype=np.int64), np.array(hi, dtype=np.int64))
+    # Instances of one task are not kept apart by the model, their demand only counts when they cannot overlap
+    disjoint = [t for t in task_set if t.period - t.jitter >= busy[t.name]]
+
+    utilization = sum(busy[t.name] / t.period for t in disjoint)
+    if utilization > 1:
+        return "Utilization including the WCET gap is %s %%" % round(utilization * 100, 2), None
+
+    # Releases that cannot move must not collide, the windows of the other tasks are then tightened against them
+    # until nothing moves, which may in turn pin more releases
+    for _ in range(MAX_TIGHTENING_PASSES):
+        fixed = sorted((int(lo[nn]), busy[t.name], t.name, int(nn)) for t in task_set for lo, hi in [windows[t.name]]
+                       for nn in np.flatnonzero(lo == hi))
+        for (start, length, name, nn), (next_start, _, next_name, next_nn) in zip(fixed, fixed[1:]):
+            if name != next_name and next_start < start + length:
+                return "Fixed releases %s#%s at %s and %s#%s at %s collide" % (
+                    name, nn, start * time_unit, next_name, next_nn, next_start * time_unit), None
+        changed = False
+        for t in task_set:
+            others = [(start, start + length) for start, length, name, _ in fixed if name != t.name]
+            fixed_starts = np.array([start for start, _ in others], dtype=np.int64)
+            fixed_ends = np.array([end for _, end in others], dtype=np.int64)
+            lo, hi = windows[t.name]
+            new_lo, new_hi = exclude_fixed_releases(lo, hi, busy[t.name], fixed_starts, fixed_ends)
+            new_lo, new_hi = propagate_period_chain(new_lo, new_hi, t.period, t.jitter)
+            empty = np.flatnonzero(new_lo > new_hi)
+            if len(empty) > 0:
+                nn = int(empty[0])
+                return "Release %s#%s has no feasible start PIT (latest %s is before earliest %s)" % (
+                    t.name, nn, int(new_hi[nn]) * time_unit, int(new_lo[nn]) * time_unit), None
+            if not (np.array_equal(new_lo, lo) and np.array_equal(new_hi, hi)):
+                windows[t.name] = (new_lo, new_hi)
+                changed = True
+        if not changed:
+            break
+
+    # Processor demand: the instances whose whole execution window lies in [a, b] must fit in it
+    if disjoint:
+        starts = np.concatenate([windows[t.name][0] for t in disjoint])
+        ends = np.concatenate([windows[t.name][1] + busy[t.name] for t in disjoint])
+        lengths = np.concatenate([np.full(len(windows[t.name][0]), busy[t.name], dtype=np.int64) for t in disjoint])
+        order = np.argsort(ends, kind='stable')
+        starts, ends, lengths = starts[order], ends[order], lengths[order]
+        candidates = np.unique(starts)
+        if len(candidates) > MAX_DEMAND_POINTS:
+            candidates = candidates[np.linspace(0, len(candidates) - 1, MAX_DEMAND_POINTS).astype(np.int64)]
+        for a in candidates:
+            demand = np.cumsum(np.where(starts >= a, lengths, 0))
+            overload = np.flatnonzero((starts >= a) & (demand > ends - a))
+            if len(overload) > 0:
+                kk = overload[0]
+                return "Processor demand of %s in [%s, %s] exceeds the interval length %s" % (
+                    int(demand[kk]) * time_unit, int(a) * time_unit, int(ends[kk]) * time_unit,
+                    int(ends[kk] - a) * time_unit), None
+
+    return None, {name: (lo.tolist(), hi.tolist()) for name, (lo, hi) in windows.items()}
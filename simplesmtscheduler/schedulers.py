@@ -1,182 +1,368 @@
+from bisect import bisect_left, bisect_right
 from time import *
 
+from simplesmtscheduler.cache import taskset_fingerprint
+from simplesmtscheduler.metrics import SolverMetrics
+from simplesmtscheduler.simulator import deadline_misses, simulate_schedule
 from simplesmtscheduler.utilities import *
+from simplesmtscheduler.verifier import verify_core_activations
 
+# The SMT models live in smtmodels so that Z3 is only imported once one of them is used, they remain importable
+# from here for existing scripts
+SMT_MODEL_NAMES = ('UTILIZATION_SCALE', 'distributed_task_mapping', 'gen_release_constraints',
+                   'gen_release_bound_constraints', 'gen_nonoverlap_constraints', 'gen_solver',
+                   'gen_cyclic_schedule_model', 'bisect_objective', 'gen_anytime_schedule_model',
+                   'gen_chain_schedule_model', 'solve_horizon_window',
+                   'gen_rolling_horizon_schedule', 'gen_schedule_activations', 'IncrementalCyclicScheduler')
+
+
+def __getattr__(name):
+    if name in SMT_MODEL_NAMES:
+        from simplesmtscheduler import smtmodels
+        return getattr(smtmodels, name)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
 
-def distributed_task_mapping(task_set, nr_cores, wcet_gap=0, optimize=False, verbose=False):
-    core_ids_mapping = []
-    # Define solver
-    if optimize:
-        smt = Optimize()
-        smt.set('priority', 'pareto')
-    else:
-        smt = Solver()
-        smt.set('arith.solver', 3)
-        smt.set('arith.auto_config_simplex', True)
-
-    # Define constraints
-    opt_bounds = []
-    task_alloc = [
-        [Int(task_set[t].name + "@" + str(c)) for t in range(len(task_set))] for c in range(nr_cores)
-    ]
-
-    # Each variable holds a true/false numeric value 0/1
-    for c in range(nr_cores):
-        for t in range(len(task_set)):
-            smt.add(And(task_alloc[c][t] >= 0, task_alloc[c][t] <= 1))
-
-    # At most each service can be active in one core
-    for t in range(len(task_set)):
-        smt.add(sum(task_alloc[c][t] for c in range(nr_cores)) == 1)
-
-    # Each core assigned at least one task
-    for c in range(nr_cores):
-        smt.add(sum(task_alloc[c][t] for t in range(len(task_set))) >= 1)
-
-    # Constraint utilization per core
-    for c in range(nr_cores):
-        smt.add(
-            sum(task_alloc[c][t] * (task_set[t].execution / task_set[t].period) for t in
-                range(len(task_set))) <= 0.5
-        )
-
-    # Try to solve
-    start_time = time()
-    if smt.check() in (sat, unknown):
-        solution_model = smt.model()
-        elapsed_time = time() - start_time
-        print("Model success!")
-    else:
-        solution_model = None
-        elapsed_time = time() - start_time
-        print("Model failure!")
 
+def gen_rate_monotonic_schedule(task_set, wcet_gap, optimize=False, verbose=False, metrics=None):
+    # Non-preemptive rate monotonic schedule of one hyper period simulated by simulate_schedule, the start PIT of
+    # every job becomes an activation instance of its task so that the schedule can be plotted and exported
+    trace, utilization, hyper_period, elapsed_time = simulate_schedule(task_set, wcet_gap, 'rm', preemptive=False)
+    activations = {task.name: [] for task in task_set}
+    for job in sorted(trace, key=lambda j: j.start):
+        activations[job.name].append(job.start)
+    for task in task_set:
+        task.activation_instances = activations[task.name]
+    misses = deadline_misses(trace)
     if verbose:
-        print("\nAsserted constraints...")
-        for c in smt.assertions():
-            print(c)
-        if optimize:
-            print("\nOptimization bounds:")
-            for o_bound in opt_bounds:
-                print(f"\t{o_bound[0]}: (lower = {o_bound[1].lower()}, upper = {o_bound[1].upper()})")
-        print("\nZ3 statistics...")
-        for k, v in smt.statistics():
-            print("%s : %s" % (k, v))
+        for job in misses:
+            print("\t- %s#%s misses its deadline %s (finish = %s)" % (job.name, job.index, job.deadline, job.finish))
+    if metrics is not None:
+        metrics.scheduler = metrics.scheduler or 'rm'
+        metrics.result = 'unsat' if misses else 'sat'
+        metrics.solve_time = elapsed_time
+        metrics.collect_instances(task_set, hyper_period)
+    return utilization, hyper_period, elapsed_time
+
+
+def calc_release_windows(task, hyper_period, wcet_gap):
+    # Lowest and highest feasible start PIT of every release instance, derived from the same offset, fixed start,
+    # deadline, jitter and hyperperiod constraints that the cyclic model asserts
+    nr_instances = hyper_period // task.period
+    lo = []
+    hi = []
+    for nn in range(nr_instances):
+        if hasattr(task, 'fixed_pit'):
+            lo.append(nn * task.period + int(task.fixed_pit) - task.jitter)
+            hi.append(min(nn * task.period + int(task.fixed_pit) + task.jitter,
+                          nn * task.period + task.deadline + task.jitter - task.execution - wcet_gap,
+                          hyper_period - wcet_gap - task.execution))
+        else:
+            lo.append(nn * task.period + task.offset)
+            hi.append(min(nn * task.period + task.deadline + task.jitter - task.execution - wcet_gap,
+                          hyper_period - wcet_gap - task.execution))
+    # Consecutive releases are separated by period +/- jitter
+    for nn in range(1, nr_instances):
+        lo[nn] = max(lo[nn], lo[nn - 1] + task.period - task.jitter)
+    for nn in range(nr_instances - 2, -1, -1):
+        hi[nn] = min(hi[nn], hi[nn + 1] - task.period + task.jitter)
+    return lo, hi
+
+
+def overlapping_release_pairs(lo, hi, busy, other_lo, other_hi, other_busy):
+    # Yields the instance index pairs whose busy intervals [start, start + busy) may overlap given their windows
+    # Monotone relaxations of the other task's windows allow a bisection per instance
+    relaxed_lo = list(other_lo)
+    for jj in range(len(relaxed_lo) - 2, -1, -1):
+        relaxed_lo[jj] = min(relaxed_lo[jj], relaxed_lo[jj + 1])
+    relaxed_hi = list(other_hi)
+    for jj in range(1, len(relaxed_hi)):
+        relaxed_hi[jj] = max(relaxed_hi[jj], relaxed_hi[jj - 1])
+    for nn in range(len(lo)):
+        first = bisect_right(relaxed_hi, lo[nn] - other_busy)
+        last = bisect_left(relaxed_lo, hi[nn] + busy)
+        for jj in range(first, last):
+            if other_lo[jj] < hi[nn] + busy and lo[nn] < other_hi[jj] + other_busy:
+                yield nn, jj
+
+
+def fit_release_instance(pit, latest, length, busy_starts, busy_ends):
+    # Earliest start in [pit, latest] whose busy interval [start, start + length) avoids the merged busy intervals
+    while pit <= latest:
+        ii = bisect_left(busy_starts, pit + length) - 1
+        if ii >= 0 and busy_ends[ii] > pit:
+            pit = busy_ends[ii]
+        else:
+            return pit
+    return None
 
-    return solution_model, elapsed_time
 
+def insert_busy_interval(start, end, busy_starts, busy_ends):
+    # Keeps the busy intervals sorted and disjoint by merging touching neighbours
+    ii = bisect_left(busy_starts, start)
+    if ii > 0 and busy_ends[ii - 1] >= start:
+        ii = ii - 1
+        start = busy_starts[ii]
+    jj = ii
+    while jj < len(busy_starts) and busy_starts[jj] <= end:
+        end = max(end, busy_ends[jj])
+        jj = jj + 1
+    busy_starts[ii:jj] = [start]
+    busy_ends[ii:jj] = [end]
 
-def gen_rate_monotonic_schedule(task_set, wcet_gap, optimize=False, verbose=False):
+
+def gen_heuristic_schedule(task_set, wcet_gap, metrics=None):
+    # Constructive offset assignment: fixed start tasks first, then by rate monotonic order, every task tries the
+    # candidate first releases left by already placed tasks and fits the following instances earliest first
     start_time = time()
-    # Sorted copy
-    task_set_sorted = sorted(task_set, key=lambda x: x.period, reverse=False)
-    # Find hyper period
-    hyper_period = find_lcm([o.period for o in task_set_sorted])
-    utilization = sum(t.execution / t.period for t in task_set_sorted) * 100
-    # Start scheduling
-    sched_time = 0.0
-    while sched_time <= hyper_period:
-        for task in task_set_sorted:
-            if len(task.activation_instances) > 0:
-                act_pit = task.activation_instances.pop()
-                if sched_time >= act_pit:
-                    task.activation_instances.append(sched_time)
-                    task.activation_instances.append(sched_time + task.period)
-                else:
-                    task.activation_instances.append(act_pit)
-            else:
-                task.activation_instances.append(sched_time)
-                task.activation_instances.append(sched_time + task.period)
-            sched_time = sched_time + task.execution + wcet_gap
+    hyper_period = find_lcm([o.period for o in task_set])
+    utilization = sum(t.execution / t.period for t in task_set) * 100
+    gap = ceil(wcet_gap)
+    placements = dict()
+    complete = True
+    busy = dict()
+    for task in sorted(task_set, key=lambda x: (not hasattr(x, 'fixed_pit'), x.period, x.deadline)):
+        busy_starts, busy_ends = busy.setdefault(task.coreid, ([], []))
+        lo, hi = calc_release_windows(task, hyper_period, gap)
+        length = task.execution + gap
+        candidates = [max(lo[0], 0)] + busy_ends[bisect_left(busy_ends, lo[0]):bisect_right(busy_ends, hi[0])]
+        best_fit = []
+        tried = set()
+        for candidate in candidates:
+            pit = fit_release_instance(candidate, hi[0], length, busy_starts, busy_ends)
+            if pit is None or pit in tried:
+                continue
+            tried.add(pit)
+            task_fit = [pit]
+            for nn in range(1, len(lo)):
+                pit = fit_release_instance(max(lo[nn], task_fit[-1] + task.period - task.jitter),
+                                           min(hi[nn], task_fit[-1] + task.period + task.jitter), length,
+                                           busy_starts, busy_ends)
+                if pit is None:
+                    break
+                task_fit.append(pit)
+            if len(task_fit) > len(best_fit):
+                best_fit = task_fit
+            if len(task_fit) == len(lo):
+                break
+        placements[task.name] = best_fit
+        if len(best_fit) == len(lo):
+            for pit in best_fit:
+                insert_busy_interval(pit, pit + length, busy_starts, busy_ends)
+        else:
+            complete = False
 
     elapsed_time = time() - start_time
-    return utilization, hyper_period, elapsed_time
+    if metrics is not None:
+        metrics.scheduler = metrics.scheduler or 'heuristic'
+        metrics.result = 'sat' if complete else 'incomplete'
+        metrics.solve_time = elapsed_time
+        metrics.collect_instances(task_set, hyper_period)
+    return placements, complete, utilization, hyper_period, elapsed_time
+
 
+def achieved_release_jitter(core_tasks, objective='max'):
+    # Jitter objective of gen_anytime_schedule_model for the activation instances of the tasks
+    deviations = [abs(deviation) for t in core_tasks if t.jitter > 0 for deviation in calc_jitter_pertask([t])[t.name]]
+    if objective == 'max':
+        return max(deviations, default=0)
+    return sum(deviations)
 
-def gen_cyclic_schedule_model(task_set, wcet_gap, optimize=False, verbose=False):
-    # Sort by EDF
-    task_set_sorted = sorted(task_set, key=lambda x: x.offset, reverse=False)
-    # Find the hyper period
-    hyper_period = find_lcm([o.period for o in task_set_sorted])
-    utilization = sum(t.execution / t.period for t in task_set_sorted) * 100
-    # Define solver
-    if optimize:
-        smt = Optimize()
-        smt.set('priority', 'pareto')
-    else:
-        smt = Solver()
-        smt.set('arith.solver', 3)
-        smt.set('arith.auto_config_simplex', True)
-    # Define constraints
-    opt_bounds = []
-    for task in task_set_sorted:
-        for nn in range(int(floor(hyper_period / task.period))):
-            task.release_instances.append(Int(task.name + "_" + "inst_" + str(nn)))
-        task.releas_itr = iter(task.release_instances)
-    # Search for task specific
-    for task in task_set_sorted:
-        prev_test_release_inst = None
-        for nn in range(len(task.release_instances)):
-            test_release_inst = next(task.releas_itr)
-            # We only check release instances that fit within a hyperperiod
-            smt.add(test_release_inst + task.execution <= hyper_period - wcet_gap)
-            # If a task has a user fixed start PIT define it otherwise use offset
-            if hasattr(task, 'fixed_pit'):
-                smt.add(And(
-                    test_release_inst <= nn * task.period + int(task.fixed_pit) + task.jitter,
-                    test_release_inst >= nn * task.period + int(task.fixed_pit) - task.jitter
-                ))
-            else:
-                smt.add(test_release_inst >= nn * task.period + task.offset)
-            # Period constraint including jitter
-            if prev_test_release_inst is not None:
-                smt.add(And(
-                    test_release_inst - prev_test_release_inst >= task.period - task.jitter,
-                    test_release_inst - prev_test_release_inst <= task.period + task.jitter
-                ))
-                if optimize:
-                    opt_bounds.append(
-                        (test_release_inst, smt.minimize(test_release_inst - prev_test_release_inst - task.period)))
-            # Each task should finish within the deadline with jitter
-            smt.add(test_release_inst + task.execution + wcet_gap <= nn * task.period + task.deadline + task.jitter)
-            # The start PIT should not fall within the execution of another task including a BAG
-            for other_task in [o for o in task_set_sorted if o.name != task.name and o.coreid == task.coreid]:
-                for other_release_inst in other_task.release_instances:
-                    smt.add(Or(
-                        test_release_inst + task.execution + wcet_gap <= other_release_inst,
-                        test_release_inst >= other_release_inst + other_task.execution + wcet_gap
-                    ))
-            prev_test_release_inst = test_release_inst
-        # if optimize:
-        #     opt_bounds.append((test_task, smt.minimize(Sum(test_task.release_instances))))
-
-    # Try to solve
+
+def solve_core_schedule(core_tasks, wcet_gap, optimize=False, verbose=False, legacy_encoding=False, cache=None,
+                        heuristic=False, granularity=None, portfolio=None, budget=60, objective='max', rolling=None):
+    # Self-contained per core solve that only returns plain data, so it can run in a worker process.
+    # The SolverMetrics returned last describe the scheduler that produced the activations.
+    # A rolling number of release instances per window solves long hyper periods by gen_rolling_horizon_schedule.
     start_time = time()
-    if smt.check() in (sat, unknown):
-        solution_model = smt.model()
-        elapsed_time = time() - start_time
-    else:
-        solution_model = None
-        elapsed_time = time() - start_time
+    hyper_period = find_lcm([t.period for t in core_tasks])
+    utilization = sum(t.execution / t.period for t in core_tasks) * 100
+    metrics = SolverMetrics()
+    if cache is not None:
+        # Budget and objective only shape the schedule of the anytime optimization
+        options = dict(heuristic=bool(heuristic), granularity=granularity, portfolio=portfolio is not None,
+                       rolling=rolling, budget=budget if optimize else None, objective=objective if optimize else None)
+        cache_key = taskset_fingerprint(core_tasks, wcet_gap, optimize, legacy_encoding, options)
+        activations = cache.load(cache_key, core_tasks, wcet_gap)
+        if activations is not None:
+            for task, task_activations in zip(core_tasks, activations):
+                task.activation_instances = list(task_activations)
+            if optimize:
+                print("\t- Achieved %s release jitter = %s (cached)" % (objective,
+                                                                      achieved_release_jitter(core_tasks, objective)))
+            metrics.scheduler = 'cache'
+            metrics.result = 'sat'
+            metrics.solve_time = time() - start_time
+            metrics.collect_instances(core_tasks, hyper_period)
+            return activations, utilization, hyper_period, time() - start_time, metrics
+    # Solve in the coarsest time base the task set allows and scale the activation instances back
+    scaled_tasks, scaled_wcet_gap, time_unit = normalize_time_base(core_tasks, wcet_gap, granularity)
+    metrics.time_unit = time_unit
+    # Reject task sets that violate a necessary condition of the model before any solver is involved
+    from simplesmtscheduler.precheck import check_schedulability
+    reason, release_bounds = check_schedulability(scaled_tasks, scaled_wcet_gap, time_unit)
+    if reason is not None:
+        print("\t- Pre-check: %s" % reason)
+        metrics.scheduler = 'precheck'
+        metrics.result = 'unsat'
+        metrics.reason = reason
+        metrics.solve_time = time() - start_time
+        metrics.collect_instances(scaled_tasks, hyper_period // time_unit)
+        return None, utilization, hyper_period, time() - start_time, metrics
+    activations = None
+    initial_values = None
+    elapsed_time = 0
+    if heuristic:
+        placements, complete, _, _, elapsed_time = gen_heuristic_schedule(scaled_tasks, scaled_wcet_gap, metrics)
+        if complete and not optimize:
+            activations = [placements[task.name] for task in scaled_tasks]
+            # The fast path is only trusted once the placements pass the same checks as any other schedule
+            violations = verify_core_activations(scaled_tasks, activations, scaled_wcet_gap, wrap_around=False)
+            if violations:
+                print("\t- Heuristic schedule rejected: %s" % violations[0].detail)
+                activations = None
+        if activations is None:
+            initial_values = placements
+            metrics = SolverMetrics(time_unit=time_unit)
+    if activations is None and portfolio is not None and not optimize:
+        from simplesmtscheduler.portfolio import solve_portfolio
+        # The race gets the budget, without a conclusive answer the core is solved sequentially
+        activations, _, _, solve_time, status = solve_portfolio(scaled_tasks, scaled_wcet_gap, legacy_encoding,
+                                                                portfolio, budget, metrics=metrics)
+        elapsed_time = elapsed_time + solve_time
+        if status == 'unknown':
+            print("\t- Falling back to the sequential solver")
+            metrics = SolverMetrics(time_unit=time_unit)
+        else:
+            metrics.scheduler = 'portfolio'
+            metrics.result = status
+            metrics.solve_time = solve_time
+            metrics.collect_instances(scaled_tasks, hyper_period // time_unit)
+            if activations is None:
+                return None, utilization, hyper_period, elapsed_time, metrics
+    if activations is None and optimize:
+        from simplesmtscheduler.smtmodels import gen_anytime_schedule_model, gen_schedule_activations
+        schedule, _, _, solve_time, jitter, optimal = gen_anytime_schedule_model(scaled_tasks, scaled_wcet_gap, budget,
+                                                                                 objective, verbose, initial_values,
+                                                                                 metrics, release_bounds)
+        elapsed_time = elapsed_time + solve_time
+        if schedule is None:
+            return None, utilization, hyper_period, elapsed_time, metrics
+        print("\t- Achieved %s release jitter = %s (%s)" % (objective, jitter * time_unit,
+                                                           "optimal" if optimal else "budget expired"))
+        extraction_start_time = time()
+        gen_schedule_activations(schedule, scaled_tasks)
+        activations = [list(task.getStartPIT()) for task in scaled_tasks]
+        metrics.extraction_time = metrics.extraction_time + time() - extraction_start_time
+    elif activations is None and rolling is not None:
+        from simplesmtscheduler.smtmodels import gen_rolling_horizon_schedule
+        activations, _, _, solve_time = gen_rolling_horizon_schedule(scaled_tasks, scaled_wcet_gap, rolling,
+                                                                     verbose=verbose, metrics=metrics,
+                                                                     release_bounds=release_bounds)
+        elapsed_time = elapsed_time + solve_time
+        if activations is None:
+            print("\t- Rolling horizon is inconclusive, the core may still be schedulable without --rolling")
+            return None, utilization, hyper_period, elapsed_time, metrics
+    elif activations is None:
+        from simplesmtscheduler.smtmodels import gen_cyclic_schedule_model, gen_schedule_activations
+        schedule, _, _, solve_time = gen_cyclic_schedule_model(scaled_tasks, scaled_wcet_gap, optimize, verbose,
+                                                               legacy_encoding, initial_values, metrics=metrics,
+                                                               release_bounds=release_bounds)
+        elapsed_time = elapsed_time + solve_time
+        if schedule is None:
+            return None, utilization, hyper_period, elapsed_time, metrics
+        extraction_start_time = time()
+        gen_schedule_activations(schedule, scaled_tasks)
+        activations = [list(task.getStartPIT()) for task in scaled_tasks]
+        metrics.extraction_time = metrics.extraction_time + time() - extraction_start_time
+    activations = [[pit * time_unit for pit in task_activations] for task_activations in activations]
+    for task, task_activations in zip(core_tasks, activations):
+        task.activation_instances = list(task_activations)
+    if cache is not None:
+        cache.store(cache_key, core_tasks, activations)
+    return activations, utilization, hyper_period, elapsed_time, metrics
 
-    if verbose:
-        print("\nAsserted constraints...")
-        for c in smt.assertions():
-            print(c)
-        print("\nModel Solution:")
-        print(solution_model)
-        if optimize:
-            print("\nOptimization bounds:")
-            for o_bound in opt_bounds:
-                print(f"\t{o_bound[0]}: (lower = {o_bound[1].lower()}, upper = {o_bound[1].upper()})")
-        print("\nZ3 statistics...")
-        for k, v in smt.statistics():
-            print("%s : %s" % (k, v))
-
-    return solution_model, utilization, hyper_period, elapsed_time
-
-
-def gen_schedule_activations(schedule, task_set):
-    for task in task_set:
-        for pit in task.release_instances:
-            task.addStartPIT(schedule[pit].as_long())
+
+def map_and_schedule(task_set, nr_cores, wcet_gap, optimize=False, verbose=False, legacy_encoding=False, cache=None,
+                     heuristic=False, granularity=None, utilization_bound=1.0, executor=None, portfolio=None,
+                     budget=60, objective='max', rolling=None):
+    # Maps the tasks onto cores and schedules every core, a core that turns out unschedulable blocks its task group
+    # and the mapping is repeated until all cores are scheduled or no mapping is left
+    from simplesmtscheduler.smtmodels import IncrementalCyclicScheduler, distributed_task_mapping
+    blocked_groups = []
+    while True:
+        mapping, _ = distributed_task_mapping(task_set, nr_cores, wcet_gap, False, verbose, utilization_bound,
+                                              blocked_groups)
+        if mapping is None:
+            return None
+        # Copies carry the mapped core as CPU ID, tasks of different CSV CPU IDs would otherwise never be kept apart
+        cores_tasks = [[t.detached() for t in task_set if t.mapped_coreid == c] for c in range(nr_cores)]
+        for c in range(nr_cores):
+            for task in cores_tasks[c]:
+                task.coreid = c
+        solve_args = (wcet_gap, optimize, verbose, legacy_encoding, cache, heuristic, granularity, portfolio, budget,
+                      objective, rolling)
+        if executor is not None:
+            futures = [executor.submit(solve_core_schedule, core_tasks, *solve_args) for core_tasks in cores_tasks]
+            core_results = [f.result() for f in futures]
+        else:
+            core_results = [solve_core_schedule(core_tasks, *solve_args) for core_tasks in cores_tasks]
+        unschedulable = [cores_tasks[c] for c in range(nr_cores) if core_results[c][0] is None]
+        if not unschedulable:
+            for c in range(nr_cores):
+                mapped_tasks = [t for t in task_set if t.mapped_coreid == c]
+                for task, task_activations in zip(mapped_tasks, core_results[c][0]):
+                    task.coreid = c
+                    task.activation_instances = list(task_activations)
+            return dict(enumerate(core_results))
+        for core_tasks in unschedulable:
+            # Blocking a minimal conflicting group instead of the whole core also rules out every other group
+            # containing it, assuming that adding tasks never makes a core schedulable again. The core is known to
+            # be unsat, only subsets of it are solved while shrinking.
+            group = IncrementalCyclicScheduler(core_tasks, wcet_gap).shrink_conflict()
+            print("\tTasks %s cannot be scheduled on one core, re-mapping..." % group)
+            blocked_groups.append(group)
+
+
+def solve_chain_schedule(task_set, chains, wcet_gap, optimize=False, verbose=False, budget=60, objective='max'):
+    # Schedules the CPU IDs the precedence chains pass jointly by gen_chain_schedule_model and returns the result of
+    # every one of them like solve_core_schedule does, keyed by CPU ID. The cores share the metrics of the joint model.
+    # Each core is pre-checked on its own first, the joint model is solved in the time base of the task set.
+    start_time = time()
+    tasks_by_name = {t.name: t for t in task_set}
+    core_ids = sorted(set(tasks_by_name[name].coreid for chain in chains for name in chain.tasks))
+    joint_tasks = [t.detached() for t in task_set if t.coreid in core_ids]
+    for task in joint_tasks:
+        task.activation_instances = []
+    cores_tasks = {core_id: [t for t in joint_tasks if t.coreid == core_id] for core_id in core_ids}
+    metrics = SolverMetrics()
+    release_bounds = dict()
+    from simplesmtscheduler.precheck import check_schedulability
+    for core_id, core_tasks in cores_tasks.items():
+        reason, bounds = check_schedulability(core_tasks, wcet_gap)
+        if reason is not None:
+            print("\t- Pre-check of CPU ID %s: %s" % (core_id, reason))
+            metrics.scheduler = 'precheck'
+            metrics.result = 'unsat'
+            metrics.reason = reason
+            break
+        release_bounds.update(bounds)
+    schedule = None
+    if metrics.reason is None:
+        from simplesmtscheduler.smtmodels import gen_chain_schedule_model, gen_schedule_activations
+        schedule, _, _, _, latency, optimal = gen_chain_schedule_model(joint_tasks, chains, wcet_gap, optimize, budget,
+                                                                       objective, verbose, metrics, release_bounds)
+        if schedule is not None:
+            if optimize:
+                print("\t- Achieved %s chain latency = %s (%s)" % (objective, latency,
+                                                                  "optimal" if optimal else "budget expired"))
+            extraction_start_time = time()
+            gen_schedule_activations(schedule, joint_tasks)
+            metrics.extraction_time = time() - extraction_start_time
+    elapsed_time = time() - start_time
+    results = dict()
+    for core_id, core_tasks in cores_tasks.items():
+        hyper_period = find_lcm([t.period for t in core_tasks])
+        utilization = sum(t.execution / t.period for t in core_tasks) * 100
+        activations = [list(t.getStartPIT()) for t in core_tasks] if schedule is not None else None
+        results[core_id] = (activations, utilization, hyper_period, elapsed_time, metrics)
+    return results
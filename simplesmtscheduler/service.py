@@ -0,0 +1,449 @@
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import socket
+from collections import OrderedDict
+from time import time
+
+from simplesmtscheduler.cache import taskset_fingerprint
+from simplesmtscheduler.schedulers import solve_core_schedule
+from simplesmtscheduler.taskdefs import TaskTable
+from simplesmtscheduler.utilities import check_task_set, load_csv_tasktable
+
+# Solver options a request may set, with their defaults
+SERVICE_OPTIONS = dict(optimize=False, legacy_encoding=False, heuristic=False, granularity=None, budget=60,
+                       objective='max', rolling=None)
+DEFAULT_QUEUE_SIZE = 64
+DEFAULT_JOB_TIMEOUT = 300
+# Longest request line in bytes and seconds allowed to parse the task set of a submit, off the event loop
+MAX_REQUEST_BYTES = 16 * 1024 * 1024
+PARSE_TIMEOUT = 10
+# Finished jobs whose results can still be fetched, the oldest are forgotten first
+FINISHED_JOBS = 256
+JOB_STATES = ('queued', 'running', 'sat', 'unsat', 'error', 'timeout', 'cancelled')
+
+
+def service_worker(conn, cache):
+    # Worker process loop solving the cores it receives until the pipe is closed. Z3 is imported once up front so
+    # that no job pays for it, the reports of the schedulers are dropped.
+    from simplesmtscheduler import smtmodels
+    while True:
+        try:
+            core_tasks, wcet_gap, options = conn.recv()
+        except EOFError:
+            return
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                reply = ('ok', solve_core_schedule(core_tasks, wcet_gap, options['optimize'], False,
+                                                   options['legacy_encoding'], cache, options['heuristic'],
+                                                   options['granularity'], None, options['budget'],
+                                                   options['objective'], options['rolling']))
+        except Exception as e:
+            reply = ('error', "%s: %s" % (type(e).__name__, e))
+        conn.send(reply)
+
+
+class ServiceWorker:
+    # One worker process and the pipe to it. A solve that is cancelled or times out cannot be interrupted inside
+    # Z3, the process is terminated and replaced instead. Workers are spawned rather than forked, so that they do not
+    # inherit the event loop nor the pipes of the other workers.
+
+    def __init__(self, cache=None):
+        self.cache = cache
+        self.process = None
+        self.conn = None
+        self.start()
+
+    def start(self):
+        context = multiprocessing.get_context('spawn')
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=service_worker, args=(child_conn, self.cache), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def stop(self):
+        self.conn.close()
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+
+    def restart(self):
+        self.process.terminate()
+        self.process.join()
+        self.conn.close()
+        self.start()
+
+    async def solve(self, core_tasks, wcet_gap, options):
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        self.conn.send((core_tasks, wcet_gap, options))
+        fileno = self.conn.fileno()
+        loop.add_reader(fileno, lambda: ready.done() or ready.set_result(None))
+        try:
+            await ready
+        except asyncio.CancelledError:
+            loop.remove_reader(fileno)
+            self.restart()
+            raise
+        loop.remove_reader(fileno)
+        try:
+            return self.conn.recv()
+        except EOFError:
+            # The worker died, e.g. killed by the OS for running out of memory
+            self.restart()
+            return 'error', "Worker process exited with code %s" % self.process.exitcode
+
+
+def task_set_from_request(message):
+    # Task set of a submit request, either CSV text as in a task set file or a list of task objects with the keys of
+    # the CSV columns (period, execution, deadline, offset, jitter, coreid, fixed_pit, name, cfunc)
+    if 'csv' in message:
+        return load_csv_tasktable(io.StringIO(message['csv'])).tasks()
+    table = TaskTable()
+    for nn, task in enumerate(message.get('tasks', [])):
+        table.append(task['period'], task['execution'], task.get('deadline', task['period']), task.get('offset', 0),
+                     task.get('jitter', 0), task.get('coreid', 0), task.get('fixed_pit'),
+                     task.get('name', "Task %s" % nn), task.get('cfunc', "void"))
+    return table.tasks()
+
+
+def checked_task_set_from_request(message):
+    # Task set of a submit request and the reason it is not valid, None when it is. Runs in an executor thread.
+    try:
+        task_set = task_set_from_request(message)
+    except (KeyError, TypeError, ValueError, OverflowError) as e:
+        return None, "%s: %s" % (type(e).__name__, e)
+    return task_set, check_task_set(task_set)
+
+
+def request_key(task_set, wcet_gap, options):
+    # Identical requests map to one key regardless of the task order, the key of the schedule cache
+    return taskset_fingerprint(task_set, wcet_gap, options['optimize'], options['legacy_encoding'], options)
+
+
+class ServiceJob:
+    # One submitted task set. Clients waiting for it receive its events through their own queue.
+
+    def __init__(self, job_id, key, task_set, wcet_gap, options, timeout):
+        self.id = job_id
+        self.key = key
+        self.task_set = task_set
+        self.wcet_gap = wcet_gap
+        self.options = options
+        self.timeout = timeout
+        self.status = 'queued'
+        self.error = None
+        self.core_ids = sorted(set(t.coreid for t in task_set))
+        self.cores = []
+        self.activations = dict()
+        self.submitted = time()
+        self.started = None
+        self.finished = None
+        self.runner = None
+        self.listeners = []
+
+    @property
+    def done(self):
+        return self.finished is not None
+
+    def describe(self):
+        return dict(job=self.id, status=self.status, cores_done=len(self.cores), cores=len(self.core_ids),
+                    queued=round((self.started or self.finished or time()) - self.submitted, 6),
+                    elapsed=round((self.finished or time()) - self.started, 6) if self.started else None,
+                    error=self.error)
+
+    def result(self):
+        return dict(self.describe(), core_results=self.cores,
+                    activations=self.activations if self.status == 'sat' else None)
+
+    def publish(self, event):
+        for listener in self.listeners:
+            listener.put_nowait(event)
+
+
+class ScheduleService:
+    # Local scheduling service: submitted task sets wait in a bounded queue for one of the worker processes, which
+    # solves their cores one by one with solve_core_schedule. Identical requests in flight share one job. Every job
+    # has a timeout and can be cancelled, queued or running.
+
+    def __init__(self, jobs=1, queue_size=DEFAULT_QUEUE_SIZE, timeout=DEFAULT_JOB_TIMEOUT, cache=None):
+        self.nr_workers = max(1, jobs)
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.cache = cache
+        self.queue = None
+        self.workers = []
+        self.dispatchers = []
+        self.jobs = OrderedDict()
+        self.in_flight = dict()
+        self.job_ids = itertools.count(1)
+        self.counters = dict(submitted=0, deduplicated=0, rejected=0)
+        self.solve_time = 0.0
+
+    async def start(self):
+        self.queue = asyncio.Queue(self.queue_size)
+        self.workers = [ServiceWorker(self.cache) for _ in range(self.nr_workers)]
+        self.dispatchers = [asyncio.ensure_future(self.dispatch(worker)) for worker in self.workers]
+
+    async def stop(self):
+        for dispatcher in self.dispatchers:
+            dispatcher.cancel()
+        await asyncio.gather(*self.dispatchers, return_exceptions=True)
+        for worker in self.workers:
+            worker.stop()
+
+    def submit(self, task_set, wcet_gap=0, options=None, timeout=None):
+        # Queues a task set, or joins the identical job in flight. Returns the job and whether it was joined, raises
+        # asyncio.QueueFull when the queue is full.
+        options = dict(SERVICE_OPTIONS, **(options or {}))
+        key = request_key(task_set, wcet_gap, options)
+        job = self.in_flight.get(key)
+        if job is not None:
+            self.counters['deduplicated'] = self.counters['deduplicated'] + 1
+            return job, True
+        job = ServiceJob(next(self.job_ids), key, task_set, wcet_gap, options,
+                         self.timeout if timeout is None else timeout)
+        try:
+            self.queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.counters['rejected'] = self.counters['rejected'] + 1
+            raise
+        self.counters['submitted'] = self.counters['submitted'] + 1
+        self.in_flight[key] = job
+        self.jobs[job.id] = job
+        return job, False
+
+    def cancel(self, job):
+        if job.done:
+            return False
+        if job.runner is not None:
+            # The dispatcher finishes the job once the worker is replaced
+            job.status = 'cancelled'
+            job.runner.cancel()
+        else:
+            self.finish(job, 'cancelled')
+        return True
+
+    def finish(self, job, status, error=None):
+        job.status = status
+        job.error = error
+        job.finished = time()
+        job.runner = None
+        self.in_flight.pop(job.key, None)
+        job.publish(dict(job.result(), event='finished'))
+        # Forget the oldest finished jobs beyond FINISHED_JOBS
+        finished = [job_id for job_id, other in self.jobs.items() if other.done]
+        for job_id in finished[:max(0, len(finished) - FINISHED_JOBS)]:
+            del self.jobs[job_id]
+
+    async def dispatch(self, worker):
+        while True:
+            job = await self.queue.get()
+            if job.done:
+                continue
+            job.status = 'running'
+            job.started = time()
+            job.publish(dict(job.describe(), event='started'))
+            job.runner = asyncio.ensure_future(self.run_job(job, worker))
+            try:
+                status = await asyncio.wait_for(job.runner, job.timeout)
+                self.finish(job, status)
+            except asyncio.TimeoutError:
+                self.finish(job, 'timeout', "Job exceeded its timeout of %s s" % job.timeout)
+            except asyncio.CancelledError:
+                if job.status != 'cancelled':
+                    raise
+                self.finish(job, 'cancelled')
+            except Exception as e:
+                self.finish(job, 'error', "%s: %s" % (type(e).__name__, e))
+            self.solve_time = self.solve_time + job.finished - job.started
+
+    async def run_job(self, job, worker):
+        # Solves the cores of a job one after the other and reports every core as it completes
+        scheduled = True
+        for core_id in job.core_ids:
+            core_tasks = [t for t in job.task_set if t.coreid == core_id]
+            reply, result = await worker.solve(core_tasks, job.wcet_gap, job.options)
+            if reply == 'error':
+                raise RuntimeError(result)
+            activations, utilization, hyper_period, elapsed_time, metrics = result
+            job.cores.append(dict(core_id=core_id, status='sat' if activations is not None else 'unsat',
+                                  scheduler=metrics.scheduler, tasks=len(core_tasks), utilization=utilization,
+                                  hyper_period=hyper_period, elapsed=elapsed_time, metrics=metrics.as_dict()))
+            if activations is None:
+                scheduled = False
+            else:
+                for task, task_activations in zip(core_tasks, activations):
+                    job.activations[task.name] = [int(pit) for pit in task_activations]
+            job.publish(dict(job.describe(), event='progress', core=job.cores[-1]))
+        return 'sat' if scheduled else 'unsat'
+
+    def stats(self):
+        states = dict.fromkeys(JOB_STATES, 0)
+        for job in self.jobs.values():
+            states[job.status] = states[job.status] + 1
+        finished = sum(1 for job in self.jobs.values() if job.done and job.started)
+        return dict(self.counters, workers=self.nr_workers, queued=self.queue.qsize(), queue_size=self.queue_size,
+                    in_flight=len(self.in_flight), jobs=states, solve_time=self.solve_time,
+                    mean_job_time=self.solve_time / finished if finished else None)
+
+    async def handle_request(self, message, reply):
+        # Handles one request, replying with one or more JSON objects. The last reply has final set.
+        if not isinstance(message, dict):
+            await reply(dict(error="Invalid request: expected a JSON object", final=True))
+            return
+        op = message.get('op')
+        job_id = message.get('job')
+        if job_id is not None and (not isinstance(job_id, (str, int)) or isinstance(job_id, bool)):
+            await reply(dict(error="Invalid job %s" % json.dumps(job_id), final=True))
+            return
+        if not isinstance(message.get('options', {}), dict):
+            await reply(dict(error="Invalid options: expected a JSON object", final=True))
+            return
+        job = self.jobs.get(job_id)
+        if op in ('status', 'result', 'cancel') and job is None:
+            await reply(dict(error="Unknown job %s" % message.get('job'), final=True))
+        elif op == 'submit':
+            # A large CSV would stall every other client while it is parsed on the event loop
+            loop = asyncio.get_running_loop()
+            try:
+                task_set, error = await asyncio.wait_for(
+                    loop.run_in_executor(None, checked_task_set_from_request, message), PARSE_TIMEOUT)
+            except asyncio.TimeoutError:
+                await reply(dict(error="Invalid task set: not parsed within %s s" % PARSE_TIMEOUT, final=True))
+                return
+            if error is not None:
+                await reply(dict(error="Invalid task set: %s" % error, final=True))
+                return
+            unknown = set(message.get('options', {})) - set(SERVICE_OPTIONS)
+            if unknown:
+                await reply(dict(error="Unknown options %s" % sorted(unknown), final=True))
+                return
+            try:
+                job, joined = self.submit(task_set, message.get('wcet_gap', 0), message.get('options'),
+                                          message.get('timeout'))
+            except asyncio.QueueFull:
+                await reply(dict(error="Queue is full (%s jobs)" % self.queue_size, final=True))
+                return
+            if not message.get('wait', True):
+                await reply(dict(job.describe(), event='queued', deduplicated=joined, final=True))
+                return
+            await reply(dict(job.describe(), event='queued', deduplicated=joined))
+            await self.follow(job, reply, progress=True)
+        elif op == 'status':
+            await reply(dict(job.describe(), core_results=job.cores, final=True))
+        elif op == 'result':
+            await self.follow(job, reply, progress=False)
+        elif op == 'cancel':
+            cancelled = self.cancel(job)
+            await reply(dict(job.describe(), cancelled=cancelled, final=True))
+        elif op == 'stats':
+            await reply(dict(self.stats(), final=True))
+        else:
+            await reply(dict(error="Unknown op %s" % op, final=True))
+
+    async def follow(self, job, reply, progress):
+        # Forwards the events of a job until it finishes, the finished event carries the result
+        if job.done:
+            await reply(dict(job.result(), event='finished', final=True))
+            return
+        events = asyncio.Queue()
+        job.listeners.append(events)
+        try:
+            while True:
+                event = await events.get()
+                if event['event'] == 'finished':
+                    await reply(dict(event, final=True))
+                    return
+                if progress:
+                    await reply(event)
+        finally:
+            job.listeners.remove(events)
+
+    async def handle_connection(self, reader, writer):
+        # Newline delimited JSON, one request per line, requests of one connection are handled in order
+        async def reply(response):
+            writer.write(json.dumps(response, default=str).encode() + b"\n")
+            await writer.drain()
+
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # The stream discards a line beyond its limit
+                    await reply(dict(error="Request exceeds %s bytes" % MAX_REQUEST_BYTES, final=True))
+                    continue
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError as e:
+                    await reply(dict(error="Invalid request: %s" % e, final=True))
+                    continue
+                await self.handle_request(message, reply)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def parse_service_address(address):
+    # host:port for localhost TCP, anything else is the path of a Unix socket
+    host, separator, port = address.rpartition(":")
+    if separator and port.isdigit():
+        return host or "localhost", int(port)
+    return address
+
+
+async def run_service(address, jobs=1, queue_size=DEFAULT_QUEUE_SIZE, timeout=DEFAULT_JOB_TIMEOUT, cache=None,
+                      started=None):
+    service = ScheduleService(jobs, queue_size, timeout, cache)
+    await service.start()
+    parsed = parse_service_address(address)
+    if isinstance(parsed, tuple):
+        server = await asyncio.start_server(service.handle_connection, *parsed, limit=MAX_REQUEST_BYTES)
+    else:
+        if os.path.exists(parsed):
+            os.remove(parsed)
+        server = await asyncio.start_unix_server(service.handle_connection, parsed, limit=MAX_REQUEST_BYTES)
+    if started is not None:
+        started()
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+        if not isinstance(parsed, tuple) and os.path.exists(parsed):
+            os.remove(parsed)
+
+
+def serve(address, jobs=1, queue_size=DEFAULT_QUEUE_SIZE, timeout=DEFAULT_JOB_TIMEOUT, cache=None):
+    try:
+        asyncio.run(run_service(address, jobs, queue_size, timeout, cache,
+                                lambda: print("Scheduling service listening on %s with %s workers" % (address, jobs))))
+    except KeyboardInterrupt:
+        pass
+
+
+def service_request(address, message):
+    # Blocking client: sends one request and yields every reply up to the final one
+    parsed = parse_service_address(address)
+    if isinstance(parsed, tuple):
+        connection = socket.create_connection(parsed)
+    else:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(parsed)
+    with connection, connection.makefile('rwb') as stream:
+        stream.write(json.dumps(message).encode() + b"\n")
+        stream.flush()
+        for line in stream:
+            response = json.loads(line)
+            yield response
+            if response.get('final'):
+                return
@@ -0,0 +1,91 @@
+import heapq
+from collections import namedtuple
+from time import time
+
+from simplesmtscheduler.utilities import find_lcm
+
+SIMULATION_POLICIES = ('rm', 'dm', 'edf')
+
+# One executed job of a task, segments are the (start, end) intervals it ran in, more than one when preempted
+Job = namedtuple('Job', ['name', 'index', 'release', 'deadline', 'start', 'finish', 'response_time', 'preemptions',
+                         'segments'])
+
+
+def job_priority(policy, task_rank, task, release):
+    # Lower sorts first, ties are broken by the order of the task in the task set
+    if policy == 'rm':
+        return task.period, task_rank
+    if policy == 'dm':
+        return task.deadline, task_rank
+    return release + task.deadline, task_rank
+
+
+def simulate_schedule(task_set, wcet_gap=0, policy='rm', preemptive=True, horizon=None):
+    # Discrete event simulation of one core driven by two heaps: the next release of every task and the released
+    # jobs by priority. Only releases and completions are visited, so the cost is O(jobs log tasks) independent of
+    # the time base. Tasks release at their fixed start PIT or offset every period (jitter is not simulated) until
+    # the horizon, by default the hyper period, and every released job runs to completion. The processor idles for
+    # the WCET gap after every completion. Returns the job trace as a tuple of Job ordered by finish time, together
+    # with the utilization, hyper period and elapsed time. The tasks are not modified.
+    if policy not in SIMULATION_POLICIES:
+        raise ValueError("Unknown simulation policy %s, expected one of %s" % (policy, SIMULATION_POLICIES))
+    start_time = time()
+    hyper_period = find_lcm([t.period for t in task_set])
+    utilization = sum(t.execution / t.period for t in task_set) * 100
+    horizon = hyper_period if horizon is None else horizon
+    releases = []
+    for rank, task in enumerate(task_set):
+        first_release = int(task.fixed_pit) if hasattr(task, 'fixed_pit') else task.offset
+        if first_release < horizon:
+            releases.append((first_release, rank, 0))
+    heapq.heapify(releases)
+    # Released jobs as [priority, rank, index, release, start, remaining, preemptions, segments]
+    ready = []
+
+    def release_jobs(now):
+        while releases and releases[0][0] <= now:
+            release, rank, index = heapq.heappop(releases)
+            task = task_set[rank]
+            heapq.heappush(ready, [job_priority(policy, rank, task, release), rank, index, release, None,
+                                   task.execution, 0, []])
+            if release + task.period < horizon:
+                heapq.heappush(releases, (release + task.period, rank, index + 1))
+
+    trace = []
+    now = 0
+    running = None
+    while releases or ready or running is not None:
+        release_jobs(now)
+        if running is None:
+            if not ready:
+                now = releases[0][0]
+                continue
+            running = heapq.heappop(ready)
+            if running[4] is None:
+                running[4] = now
+            running[7].append((now, None))
+        finish = now + running[5]
+        if preemptive and releases and releases[0][0] < finish:
+            # Run until the next release, a job of higher priority released then takes over
+            next_release = releases[0][0]
+            running[5] = running[5] - (next_release - now)
+            now = next_release
+            release_jobs(now)
+            if ready[0][0] < running[0]:
+                running[6] = running[6] + 1
+                running[7][-1] = (running[7][-1][0], now)
+                heapq.heappush(ready, running)
+                running = None
+            continue
+        _, rank, index, release, start, _, preemptions, segments = running
+        task = task_set[rank]
+        segments[-1] = (segments[-1][0], finish)
+        trace.append(Job(task.name, index, release, release + task.deadline, start, finish, finish - release,
+                         preemptions, tuple(segments)))
+        running = None
+        now = finish + wcet_gap
+    return tuple(trace), utilization, hyper_period, time() - start_time
+
+
+def deadline_misses(trace):
+    return [job for job in trace if job.finish > job.deadline]
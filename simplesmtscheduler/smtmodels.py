@@ -0,0 +1,847 @@
+from bisect import bisect_left, bisect_right
+from time import *
+
+from simplesmtscheduler.chains import chain_hops, core_hyper_periods, min_chain_latency
+from simplesmtscheduler.schedulers import calc_release_windows, overlapping_release_pairs
+from simplesmtscheduler.utilities import *
+from z3 import *
+
+# set_param('parallel.enable', True)
+
+UTILIZATION_SCALE = 1000000
+# Release instances solved per window of the rolling horizon decomposition
+ROLLING_WINDOW_INSTANCES = 2000
+
+
+def distributed_task_mapping(task_set, nr_cores, wcet_gap=0, optimize=False, verbose=False, utilization_bound=0.5,
+                             blocked_groups=None, metrics=None):
+    # Bin packing of tasks onto cores with one Bool per task and core and pseudo-Boolean load constraints.
+    # The utilization bound is either global or a list with one bound per core.
+    # An optional SolverMetrics is filled with the phase timings, model size and solver statistics.
+    build_start_time = time()
+    ctx = Context()
+    if isinstance(utilization_bound, (list, tuple)):
+        core_bounds = list(utilization_bound)
+    else:
+        core_bounds = [utilization_bound] * nr_cores
+    # Define solver
+    if optimize:
+        smt = Optimize(ctx=ctx)
+        smt.set('priority', 'pareto')
+    else:
+        smt = SolverFor('QF_FD', ctx=ctx)
+
+    # Define constraints
+    opt_bounds = []
+    task_alloc = [
+        [Bool(task_set[t].name + "@" + str(c), ctx) for t in range(len(task_set))] for c in range(nr_cores)
+    ]
+    # Utilizations as integer weights, rounded up so the scaled bound stays safe
+    task_weights = [ceil((t.execution + wcet_gap) * UTILIZATION_SCALE / t.period) for t in task_set]
+
+    # Each service is active in exactly one core
+    for t in range(len(task_set)):
+        smt.add(PbEq([(task_alloc[c][t], 1) for c in range(nr_cores)], 1))
+
+    # Each core assigned at least one task
+    for c in range(nr_cores):
+        smt.add(Or(task_alloc[c]))
+
+    # Constraint utilization per core
+    scaled_bounds = [floor(core_bounds[c] * UTILIZATION_SCALE) for c in range(nr_cores)]
+    for c in range(nr_cores):
+        smt.add(PbLe([(task_alloc[c][t], task_weights[t]) for t in range(len(task_set))], scaled_bounds[c]))
+    # The aggregated capacity is a trivial bound the bin packing search would otherwise have to rediscover
+    if sum(task_weights) > sum(scaled_bounds):
+        smt.add(BoolVal(False, ctx))
+
+    # Groups of task names known to be unschedulable together may not share a core, neither may any superset
+    task_index = {task_set[t].name: t for t in range(len(task_set))}
+    for group in blocked_groups or []:
+        for c in range(nr_cores):
+            smt.add(Or([Not(task_alloc[c][task_index[name]]) for name in group]))
+
+    # Cores sharing a bound are interchangeable, such a core may only host task t once the previous one of its kind
+    # hosts a task before t. The prefix flags keep this linear in the number of tasks.
+    prev_core = dict()
+    for c in range(nr_cores):
+        task_prefix = [Bool(task_set[t].name + "@" + str(c) + "_prefix", ctx) for t in range(len(task_set))]
+        for t in range(len(task_set)):
+            smt.add(task_prefix[t] == (Or(task_prefix[t - 1], task_alloc[c][t]) if t > 0 else task_alloc[c][t]))
+        if core_bounds[c] in prev_core:
+            prev_prefix = prev_core[core_bounds[c]]
+            smt.add(Not(task_alloc[c][0]))
+            for t in range(1, len(task_set)):
+                smt.add(Implies(task_alloc[c][t], prev_prefix[t - 1]))
+        prev_core[core_bounds[c]] = task_prefix
+
+    # Try to solve
+    start_time = time()
+    result = smt.check()
+    elapsed_time = time() - start_time
+    if result in (sat, unknown):
+        solution_model = smt.model()
+        for t in range(len(task_set)):
+            for c in range(nr_cores):
+                if is_true(solution_model.eval(task_alloc[c][t], model_completion=True)):
+                    task_set[t].mapped_coreid = c
+        print("Model success!")
+    else:
+        solution_model = None
+        print("Model failure!")
+    if metrics is not None:
+        metrics.scheduler = metrics.scheduler or 'mapping'
+        metrics.result = str(result)
+        metrics.build_time = start_time - build_start_time
+        metrics.solve_time = elapsed_time
+        metrics.extraction_time = time() - start_time - elapsed_time
+        # Allocation and symmetry breaking prefix flags
+        metrics.variables = 2 * nr_cores * len(task_set)
+        metrics.collect_solver(smt)
+
+    if verbose:
+        print("\nAsserted constraints...")
+        for c in smt.assertions():
+            print(c)
+        if optimize:
+            print("\nOptimization bounds:")
+            for o_bound in opt_bounds:
+                print(f"\t{o_bound[0]}: (lower = {o_bound[1].lower()}, upper = {o_bound[1].upper()})")
+        print("\nZ3 statistics...")
+        for k, v in smt.statistics():
+            print("%s : %s" % (k, v))
+
+    return solution_model, elapsed_time
+
+
+def gen_release_constraints(task, nn, hyper_period, wcet_gap):
+    # Constraints of the nn-th release instance of a task, linked to the previous instance by the period
+    test_release_inst = task.release_instances[nn]
+    constraints = []
+    # We only check release instances that fit within a hyperperiod
+    constraints.append(test_release_inst + task.execution <= hyper_period - wcet_gap)
+    # If a task has a user fixed start PIT define it otherwise use offset
+    if hasattr(task, 'fixed_pit'):
+        constraints.append(And(
+            test_release_inst <= nn * task.period + int(task.fixed_pit) + task.jitter,
+            test_release_inst >= nn * task.period + int(task.fixed_pit) - task.jitter
+        ))
+    else:
+        constraints.append(test_release_inst >= nn * task.period + task.offset)
+    # Period constraint including jitter
+    if nn > 0:
+        prev_test_release_inst = task.release_instances[nn - 1]
+        constraints.append(And(
+            test_release_inst - prev_test_release_inst >= task.period - task.jitter,
+            test_release_inst - prev_test_release_inst <= task.period + task.jitter
+        ))
+    # Each task should finish within the deadline with jitter
+    constraints.append(test_release_inst + task.execution + wcet_gap <= nn * task.period + task.deadline + task.jitter)
+    return constraints
+
+
+def gen_release_bound_constraints(task, release_bounds):
+    # Bounds of the release instances found by the schedulability pre-check, see check_schedulability
+    lo, hi = release_bounds[task.name]
+    return [And(lo[nn] <= release_inst, release_inst <= hi[nn])
+            for nn, release_inst in enumerate(task.release_instances)]
+
+
+def gen_nonoverlap_constraints(task, other_task, wcet_gap, windows):
+    # Disjunctions keeping the instances of two tasks apart, only for instance pairs whose release windows collide
+    constraints = []
+    if other_task.name == task.name or other_task.coreid != task.coreid:
+        return constraints
+    task_lo, task_hi = windows[task.name]
+    other_lo, other_hi = windows[other_task.name]
+    for nn, other_nn in overlapping_release_pairs(task_lo, task_hi, task.execution + wcet_gap,
+                                                  other_lo, other_hi, other_task.execution + wcet_gap):
+        constraints.append(Or(
+            task.release_instances[nn] + task.execution + wcet_gap <= other_task.release_instances[other_nn],
+            task.release_instances[nn] >= other_task.release_instances[other_nn] + other_task.execution + wcet_gap
+        ))
+    return constraints
+
+
+def gen_solver(ctx, solver_config):
+    # Solver described by a configuration dict with an optional 'logic' or 'tactic' and the solver 'params'
+    if 'tactic' in solver_config:
+        smt = Tactic(solver_config['tactic'], ctx).solver()
+    elif 'logic' in solver_config:
+        smt = SolverFor(solver_config['logic'], ctx=ctx)
+    else:
+        smt = Solver(ctx=ctx)
+    for k, v in solver_config.get('params', {}).items():
+        smt.set(k, v)
+    return smt
+
+
+def gen_cyclic_schedule_model(task_set, wcet_gap, optimize=False, verbose=False, legacy_encoding=False,
+                              initial_values=None, solver_config=None, metrics=None, release_bounds=None):
+    # An optional SolverMetrics is filled with the phase timings, model size and solver statistics.
+    # Release bounds of the pre-check (task name to lo and hi lists) are asserted and replace the release windows.
+    build_start_time = time()
+    # Sort by EDF
+    task_set_sorted = sorted(task_set, key=lambda x: x.offset, reverse=False)
+    # Find the hyper period
+    hyper_period = find_lcm([o.period for o in task_set_sorted])
+    utilization = sum(t.execution / t.period for t in task_set_sorted) * 100
+    # A fresh context keeps the solution independent of models solved earlier in the same process
+    ctx = Context()
+    # Define solver
+    if optimize:
+        smt = Optimize(ctx=ctx)
+        smt.set('priority', 'pareto')
+    elif solver_config is not None:
+        smt = gen_solver(ctx, solver_config)
+    else:
+        smt = Solver(ctx=ctx)
+        smt.set('arith.solver', 3)
+        smt.set('arith.auto_config_simplex', True)
+    # Define constraints
+    opt_bounds = []
+    disjunctions = 0
+    bv_encoding = solver_config is not None and solver_config.get('encoding') == 'bv'
+    if bv_encoding:
+        # Signed bit-vectors wide enough that no sum or difference of the model can overflow
+        min_release = min([0] + [int(t.fixed_pit) - t.jitter for t in task_set_sorted if hasattr(t, 'fixed_pit')])
+        max_constant = max(t.period + t.deadline + t.jitter + t.execution for t in task_set_sorted) + ceil(wcet_gap)
+        bv_width = (4 * (hyper_period - min_release + max_constant)).bit_length() + 1
+    for task in task_set_sorted:
+        task.release_instances = []
+        for nn in range(hyper_period // task.period):
+            if bv_encoding:
+                release_inst = BitVec(task.name + "_" + "inst_" + str(nn), bv_width, ctx)
+                smt.add(And(release_inst >= min_release, release_inst <= hyper_period))
+            else:
+                release_inst = Int(task.name + "_" + "inst_" + str(nn), ctx)
+            task.release_instances.append(release_inst)
+    # Search for task specific
+    for task in task_set_sorted:
+        prev_test_release_inst = None
+        for nn in range(len(task.release_instances)):
+            test_release_inst = task.release_instances[nn]
+            for constraint in gen_release_constraints(task, nn, hyper_period, wcet_gap):
+                smt.add(constraint)
+            if optimize and prev_test_release_inst is not None:
+                opt_bounds.append(
+                    (test_release_inst, smt.minimize(test_release_inst - prev_test_release_inst - task.period)))
+            # The start PIT should not fall within the execution of another task including a BAG
+            if legacy_encoding:
+                for other_task in [o for o in task_set_sorted if o.name != task.name and o.coreid == task.coreid]:
+                    for other_release_inst in other_task.release_instances:
+                        disjunctions = disjunctions + 1
+                        smt.add(Or(
+                            test_release_inst + task.execution + wcet_gap <= other_release_inst,
+                            test_release_inst >= other_release_inst + other_task.execution + wcet_gap
+                        ))
+            prev_test_release_inst = test_release_inst
+        # if optimize:
+        #     opt_bounds.append((test_task, smt.minimize(Sum(test_task.release_instances))))
+        if release_bounds is not None:
+            for constraint in gen_release_bound_constraints(task, release_bounds):
+                smt.add(constraint)
+    # Emit the non-overlap disjunctions once per unordered pair and only where the release windows can collide
+    if not legacy_encoding:
+        windows = release_bounds
+        if windows is None:
+            windows = {task.name: calc_release_windows(task, hyper_period, wcet_gap) for task in task_set_sorted}
+        for ii in range(len(task_set_sorted)):
+            for other_task in task_set_sorted[ii + 1:]:
+                for constraint in gen_nonoverlap_constraints(task_set_sorted[ii], other_task, wcet_gap, windows):
+                    disjunctions = disjunctions + 1
+                    smt.add(constraint)
+    # Warm start from a (partial) schedule, older Z3 releases only accept it as assumptions that are dropped on unsat
+    hint_literals = []
+    if initial_values is not None:
+        for task in task_set_sorted:
+            task_hints = list(zip(task.release_instances, initial_values.get(task.name, [])))
+            if not task_hints:
+                continue
+            if hasattr(smt, 'set_initial_value'):
+                for release_inst, pit in task_hints:
+                    smt.set_initial_value(release_inst, pit)
+            elif not optimize:
+                hint_literal = Bool(task.name + "_" + "hint", ctx)
+                smt.add(Implies(hint_literal, And([release_inst == pit for release_inst, pit in task_hints])))
+                hint_literals.append(hint_literal)
+
+    # Try to solve
+    start_time = time()
+    result = smt.check(*hint_literals)
+    if hint_literals and result == unsat:
+        result = smt.check()
+    elapsed_time = time() - start_time
+    if result in (sat, unknown):
+        solution_model = smt.model()
+    else:
+        solution_model = None
+    if metrics is not None:
+        metrics.scheduler = metrics.scheduler or 'cyclic'
+        metrics.result = str(result)
+        metrics.build_time = start_time - build_start_time
+        metrics.solve_time = elapsed_time
+        metrics.extraction_time = time() - start_time - elapsed_time
+        metrics.collect_instances(task_set_sorted, hyper_period)
+        metrics.variables = sum(metrics.instances.values()) + len(hint_literals)
+        metrics.disjunctions = disjunctions
+        metrics.collect_solver(smt)
+
+    if verbose:
+        print("\nAsserted constraints...")
+        for c in smt.assertions():
+            print(c)
+        print("\nModel Solution:")
+        print(solution_model)
+        if optimize:
+            print("\nOptimization bounds:")
+            for o_bound in opt_bounds:
+                print(f"\t{o_bound[0]}: (lower = {o_bound[1].lower()}, upper = {o_bound[1].upper()})")
+        print("\nZ3 statistics...")
+        for k, v in smt.statistics():
+            print("%s : %s" % (k, v))
+
+    return solution_model, utilization, hyper_period, elapsed_time
+
+
+def bisect_objective(smt, solution_model, best, achieved, bound_objective, budget, start_time, label, verbose=False,
+                     lower=0):
+    # Bisects a bound on a minimized objective between its proven lower bound and the best value found in the model
+    # of a sat solver, until they meet or the wall clock budget (s) counted from start_time expires. achieved gives the
+    # objective value of a model, bound_objective the constraint bounding it. Returns the best model, its objective
+    # value and the proven lower bound.
+    # The lowest bound worth probing next, a probe that times out is retried looser
+    probe = lower
+    while lower < best and probe < best and time() - start_time < budget:
+        bound = (probe + best) // 2
+        remaining_ms = max(1, int((budget - (time() - start_time)) * SEC_TO_MS))
+        smt.push()
+        smt.add(bound_objective(bound))
+        smt.set('timeout', min(remaining_ms, max(remaining_ms // 4, SEC_TO_MS)))
+        result = smt.check()
+        if result == sat:
+            solution_model = smt.model()
+            best = achieved(solution_model)
+            probe = lower
+        elif result == unsat:
+            lower = bound + 1
+            probe = lower
+        else:
+            probe = bound + 1
+        smt.pop()
+        if verbose:
+            print("\t%s bound in [%s, %s] after %s s" % (label, lower, best, time() - start_time))
+    return solution_model, best, lower
+
+
+def gen_anytime_schedule_model(task_set, wcet_gap, budget=60, objective='max', verbose=False, initial_values=None,
+                               metrics=None, release_bounds=None):
+    # Minimizes one aggregated release jitter objective, either the maximum or the sum of the absolute deviations
+    # from the period, by bisecting a bound on it until it is proven optimal or the wall clock budget (s) expires.
+    # Returns the best schedule found so far with its objective value and whether it is proven optimal.
+    # An optional SolverMetrics is filled as by gen_cyclic_schedule_model, the solve time spans all bisection steps.
+    # Release bounds of the pre-check are used as in gen_cyclic_schedule_model.
+    if objective not in OBJECTIVES:
+        raise ValueError("Unknown objective %s, expected one of %s" % (objective, ", ".join(OBJECTIVES)))
+    start_time = time()
+    task_set_sorted = sorted(task_set, key=lambda x: x.offset, reverse=False)
+    hyper_period = find_lcm([o.period for o in task_set_sorted])
+    utilization = sum(t.execution / t.period for t in task_set_sorted) * 100
+    ctx = Context()
+    smt = Solver(ctx=ctx)
+    smt.set('arith.solver', 3)
+    smt.set('arith.auto_config_simplex', True)
+    for task in task_set_sorted:
+        task.release_instances = []
+        for nn in range(hyper_period // task.period):
+            task.release_instances.append(Int(task.name + "_" + "inst_" + str(nn), ctx))
+    for task in task_set_sorted:
+        for nn in range(len(task.release_instances)):
+            for constraint in gen_release_constraints(task, nn, hyper_period, wcet_gap):
+                smt.add(constraint)
+        if release_bounds is not None:
+            for constraint in gen_release_bound_constraints(task, release_bounds):
+                smt.add(constraint)
+    windows = release_bounds
+    if windows is None:
+        windows = {task.name: calc_release_windows(task, hyper_period, wcet_gap) for task in task_set_sorted}
+    disjunctions = 0
+    for ii in range(len(task_set_sorted)):
+        for other_task in task_set_sorted[ii + 1:]:
+            for constraint in gen_nonoverlap_constraints(task_set_sorted[ii], other_task, wcet_gap, windows):
+                disjunctions = disjunctions + 1
+                smt.add(constraint)
+    if initial_values is not None and hasattr(smt, 'set_initial_value'):
+        for task in task_set_sorted:
+            for release_inst, pit in zip(task.release_instances, initial_values.get(task.name, [])):
+                smt.set_initial_value(release_inst, pit)
+
+    # Only tasks allowed to jitter contribute to the objective
+    deviations = [(task.release_instances[nn] - task.release_instances[nn - 1] - task.period,
+                   task.release_instances[nn], task.release_instances[nn - 1], task.period)
+                  for task in task_set_sorted if task.jitter > 0 for nn in range(1, len(task.release_instances))]
+
+    def achieved_jitter(model):
+        values = [abs(model.eval(inst, model_completion=True).as_long() -
+                      model.eval(prev_inst, model_completion=True).as_long() - period)
+                  for _, inst, prev_inst, period in deviations]
+        if objective == 'max':
+            return max(values, default=0)
+        return sum(values)
+
+    def bound_jitter(bound):
+        # Linear bound constraints, absolute values as If terms slow the arithmetic solver down considerably
+        if objective == 'max':
+            return And([And(deviation[0] <= bound, -deviation[0] <= bound) for deviation in deviations])
+        return Sum(abs_deviations) <= bound
+
+    def remaining_ms():
+        return max(1, int((budget - (time() - start_time)) * SEC_TO_MS))
+
+    def collect_metrics(result):
+        if metrics is not None:
+            metrics.scheduler = metrics.scheduler or 'anytime'
+            metrics.result = str(result)
+            metrics.build_time = solve_start_time - start_time
+            metrics.solve_time = time() - solve_start_time
+            metrics.collect_instances(task_set_sorted, hyper_period)
+            metrics.variables = sum(metrics.instances.values()) + (len(deviations) if objective != 'max' else 0)
+            metrics.disjunctions = disjunctions
+            metrics.collect_solver(smt)
+
+    solve_start_time = time()
+    smt.set('timeout', remaining_ms())
+    result = smt.check()
+    if result != sat:
+        collect_metrics(result)
+        return None, utilization, hyper_period, time() - start_time, None, False
+    solution_model = smt.model()
+    best = achieved_jitter(solution_model)
+    if objective != 'max':
+        abs_deviations = [Int("abs_deviation_" + str(ii), ctx) for ii in range(len(deviations))]
+        for abs_deviation, deviation in zip(abs_deviations, deviations):
+            smt.add(abs_deviation >= deviation[0], abs_deviation >= -deviation[0])
+    solution_model, best, lower = bisect_objective(smt, solution_model, best, achieved_jitter, bound_jitter, budget,
+                                                   start_time, "Jitter %s" % objective, verbose)
+
+    collect_metrics(sat)
+    if verbose:
+        print("\nZ3 statistics...")
+        for k, v in smt.statistics():
+            print("%s : %s" % (k, v))
+
+    return solution_model, utilization, hyper_period, time() - start_time, best, lower >= best
+
+
+def gen_chain_schedule_model(task_set, chains, wcet_gap, optimize=False, budget=60, objective='max', verbose=False,
+                             metrics=None, release_bounds=None):
+    # Schedules the CPU IDs of a task set jointly in one model, so that the releases of precedence chains spanning
+    # them follow each other (see simplesmtscheduler.chains). Every CPU ID keeps its own hyper period, releases past
+    # it repeat its release instances. With optimize the worst case end to end latency of the chains, the largest one
+    # (max) or their sum (sum), is minimized by bisect_objective within the budget (s).
+    # Returns the schedule, the utilization, the hyper period of the chains, the elapsed time, the objective value
+    # and whether it is proven optimal. Release bounds of the pre-check are used as in gen_cyclic_schedule_model.
+    if objective not in OBJECTIVES:
+        raise ValueError("Unknown objective %s, expected one of %s" % (objective, ", ".join(OBJECTIVES)))
+    start_time = time()
+    tasks_by_name = {t.name: t for t in task_set}
+    hyper_periods = core_hyper_periods(task_set)
+    utilization = sum(t.execution / t.period for t in task_set) * 100
+    ctx = Context()
+    smt = Solver(ctx=ctx)
+    smt.set('arith.solver', 3)
+    smt.set('arith.auto_config_simplex', True)
+    disjunctions = 0
+    for core_id, hyper_period in hyper_periods.items():
+        core_tasks = sorted([t for t in task_set if t.coreid == core_id], key=lambda x: x.offset)
+        for task in core_tasks:
+            task.release_instances = [Int(task.name + "_" + "inst_" + str(nn), ctx)
+                                      for nn in range(hyper_period // task.period)]
+            for nn in range(len(task.release_instances)):
+                for constraint in gen_release_constraints(task, nn, hyper_period, wcet_gap):
+                    smt.add(constraint)
+            if release_bounds is not None:
+                for constraint in gen_release_bound_constraints(task, release_bounds):
+                    smt.add(constraint)
+        windows = release_bounds
+        if windows is None:
+            windows = {task.name: calc_release_windows(task, hyper_period, wcet_gap) for task in core_tasks}
+        for ii in range(len(core_tasks)):
+            for other_task in core_tasks[ii + 1:]:
+                for constraint in gen_nonoverlap_constraints(core_tasks[ii], other_task, wcet_gap, windows):
+                    disjunctions = disjunctions + 1
+                    smt.add(constraint)
+    # Precedence of every hop of every chain instance and the latency terms of the instances per chain
+    release_instances = {t.name: t.release_instances for t in task_set}
+    latencies = []
+    for chain in chains:
+        chain_latencies = []
+        for starts in chain_hops(chain, tasks_by_name, hyper_periods, release_instances):
+            for name, delay, start, next_start in zip(chain.tasks, chain.delays, starts, starts[1:]):
+                smt.add(start + tasks_by_name[name].execution + delay <= next_start)
+            chain_latencies.append(starts[-1] + tasks_by_name[chain.tasks[-1]].execution - starts[0])
+        latencies.append(chain_latencies)
+    chains_hyper_period = find_lcm(list(hyper_periods.values()))
+
+    def achieved_latency(model):
+        worst = [max(model.eval(latency, model_completion=True).as_long() for latency in chain_latencies)
+                 for chain_latencies in latencies]
+        if objective == 'max':
+            return max(worst)
+        return sum(worst)
+
+    def bound_latency(bound):
+        if objective == 'max':
+            return And([latency <= bound for chain_latencies in latencies for latency in chain_latencies])
+        return Sum(worst_latencies) <= bound
+
+    def collect_metrics(result):
+        if metrics is not None:
+            metrics.scheduler = metrics.scheduler or 'chains'
+            metrics.result = str(result)
+            metrics.build_time = solve_start_time - start_time
+            metrics.solve_time = time() - solve_start_time
+            metrics.hyper_period = chains_hyper_period
+            metrics.instances = {t.name: hyper_periods[t.coreid] // t.period for t in task_set}
+            metrics.variables = sum(metrics.instances.values()) + (len(chains) if objective != 'max' else 0)
+            metrics.disjunctions = disjunctions
+            metrics.collect_solver(smt)
+
+    solve_start_time = time()
+    if optimize:
+        smt.set('timeout', max(1, int(budget * SEC_TO_MS)))
+    result = smt.check()
+    if result != sat:
+        collect_metrics(result)
+        return None, utilization, chains_hyper_period, time() - start_time, None, False
+    solution_model = smt.model()
+    best = achieved_latency(solution_model)
+    lower = best
+    if optimize:
+        if objective != 'max':
+            worst_latencies = [Int("worst_latency_" + str(ii), ctx) for ii in range(len(chains))]
+            for worst_latency, chain_latencies in zip(worst_latencies, latencies):
+                for latency in chain_latencies:
+                    smt.add(worst_latency >= latency)
+        # A chain takes at least its executions and delays back to back
+        lowest = [min_chain_latency(chain, tasks_by_name) for chain in chains]
+        solution_model, best, lower = bisect_objective(smt, solution_model, best, achieved_latency, bound_latency,
+                                                       budget, start_time, "Chain latency %s" % objective, verbose,
+                                                       max(lowest) if objective == 'max' else sum(lowest))
+
+    collect_metrics(sat)
+    if verbose:
+        print("\nZ3 statistics...")
+        for k, v in smt.statistics():
+            print("%s : %s" % (k, v))
+
+    return solution_model, utilization, chains_hyper_period, time() - start_time, best, lower >= best
+
+
+def solve_horizon_window(task_set, hyper_period, wcet_gap, windows, relaxed_hi, values, ends, start_pit,
+                         wrap_around):
+    # One window of the rolling horizon: the release instances of every task from the end of its decided values up
+    # to its end index are solver variables, the decided values before them are constants. The variables of tasks
+    # whose releases are in order (jitter below the period) start at start_pit or later. Returns the values of the
+    # variables per task, None when the window is unsat, and the number of disjunctions. The first window keeps the
+    # releases before 0 that a fixed start PIT below the jitter allows.
+    ctx = Context()
+    smt = Solver(ctx=ctx)
+    smt.set('arith.solver', 3)
+    smt.set('arith.auto_config_simplex', True)
+    bounds = dict()
+    span_lo = start_pit
+    for task in task_set:
+        decided = len(values[task.name])
+        task.release_instances = list(values[task.name]) + [
+            Int(task.name + "_" + "inst_" + str(nn), ctx) for nn in range(decided, ends[task.name])]
+        lo, hi = windows[task.name]
+        if task.period > task.jitter and start_pit > 0:
+            lo = list(lo[:decided]) + [max(pit, start_pit) for pit in lo[decided:ends[task.name]]]
+        bounds[task.name] = (lo, hi)
+        if ends[task.name] > decided:
+            span_lo = min(span_lo, lo[decided])
+        for nn in range(decided, ends[task.name]):
+            for constraint in gen_release_constraints(task, nn, hyper_period, wcet_gap):
+                smt.add(constraint)
+            smt.add(And(lo[nn] <= task.release_instances[nn], task.release_instances[nn] <= hi[nn]))
+        if wrap_around and task.jitter > 0 and len(task.release_instances) > 1:
+            # The first release of the next hyper period follows the last one by the period and jitter
+            wrap = task.release_instances[0] + hyper_period - task.release_instances[-1]
+            if is_expr(wrap):
+                smt.add(And(wrap >= task.period - task.jitter, wrap <= task.period + task.jitter))
+            elif abs(wrap - task.period) > task.jitter:
+                smt.add(BoolVal(False, ctx))
+    # Only instances whose busy interval can reach into the span of the variables take part in the disjunctions
+    firsts = {t.name: bisect_right(relaxed_hi[t.name], span_lo - t.execution - wcet_gap) for t in task_set}
+    disjunctions = 0
+    for ii, task in enumerate(task_set):
+        lo, hi = bounds[task.name]
+        first, end = firsts[task.name], ends[task.name]
+        for other_task in task_set[ii + 1:]:
+            other_lo, other_hi = bounds[other_task.name]
+            other_first, other_end = firsts[other_task.name], ends[other_task.name]
+            for nn, other_nn in overlapping_release_pairs(lo[first:end], hi[first:end], task.execution + wcet_gap,
+                                                          other_lo[other_first:other_end],
+                                                          other_hi[other_first:other_end],
+                                                          other_task.execution + wcet_gap):
+                nn, other_nn = nn + first, other_nn + other_first
+                if nn < len(values[task.name]) and other_nn < len(values[other_task.name]):
+                    continue
+                disjunctions = disjunctions + 1
+                smt.add(Or(
+                    task.release_instances[nn] + task.execution + wcet_gap <= other_task.release_instances[other_nn],
+                    task.release_instances[nn] >= other_task.release_instances[other_nn] + other_task.execution +
+                    wcet_gap
+                ))
+    result = smt.check()
+    window_values = None
+    if result == sat:
+        model = smt.model()
+        window_values = {t.name: [model.eval(inst, model_completion=True).as_long()
+                                  for inst in t.release_instances[len(values[t.name]):]] for t in task_set}
+    for task in task_set:
+        task.release_instances = []
+    return window_values, disjunctions
+
+
+def placed_before(pits, boundary):
+    # Length of the leading run of release PITs before the boundary, releases are out of order when jitter >= period
+    for nn, pit in enumerate(pits):
+        if pit >= boundary:
+            return nn
+    return len(pits)
+
+
+def gen_rolling_horizon_schedule(task_set, wcet_gap, window_instances=ROLLING_WINDOW_INSTANCES, overlap=None,
+                                 max_backtrack=2, verbose=False, metrics=None, release_bounds=None):
+    # Solves the cyclic model of one core in consecutive time windows of about window_instances release instances
+    # each. Every window solves the undecided instances that can be released before its end plus overlap (a quarter
+    # window by default), decides those placed before its end and carries the decided instances as constants, the
+    # others start in a later window. An unsat window is merged with up to max_backtrack preceding windows, whose
+    # decisions are revoked. The last window enforces the period and jitter across the end of the hyper period.
+    # Memory is bounded by the window size and the time grows about linearly with the hyper period.
+    # Returns the activation instances per task (in task set order), or None, with utilization, hyper period and
+    # the elapsed time. No schedule is inconclusive (unknown), the windows constrain the releases beyond the cyclic
+    # model, even a merged window reaching back to the start of the hyper period does not prove it unsat.
+    start_time = time()
+    hyper_period = find_lcm([t.period for t in task_set])
+    utilization = sum(t.execution / t.period for t in task_set) * 100
+    windows = release_bounds
+    if windows is None:
+        windows = {t.name: calc_release_windows(t, hyper_period, wcet_gap) for t in task_set}
+    relaxed_hi = dict()
+    for t in task_set:
+        # Prefix maxima of the latest busy starts, so that the instances ending before a PIT are a prefix
+        relaxed = list(windows[t.name][1])
+        for nn in range(1, len(relaxed)):
+            relaxed[nn] = max(relaxed[nn], relaxed[nn - 1])
+        relaxed_hi[t.name] = relaxed
+    nr_instances = sum(hyper_period // t.period for t in task_set)
+    nr_windows = max(1, ceil(nr_instances / window_instances))
+    window_length = ceil(hyper_period / nr_windows)
+    overlap = window_length // 4 if overlap is None else overlap
+
+    def window_ends(end_pit):
+        return {t.name: bisect_left(windows[t.name][0], end_pit) for t in task_set}
+
+    values = {t.name: [] for t in task_set}
+    # Number of decided instances per task after every window
+    decided = []
+    backtracks = 0
+    disjunctions = 0
+    solve_time = 0
+    result = sat
+    kk = 0
+    while kk < nr_windows:
+        depth = 0
+        while True:
+            first_window = kk - depth
+            for t in task_set:
+                del values[t.name][decided[first_window - 1][t.name] if first_window > 0 else 0:]
+            last = kk == nr_windows - 1
+            ends = window_ends(hyper_period + 1 if last else (kk + 1) * window_length + overlap)
+            window_start_time = time()
+            window_values, window_disjunctions = solve_horizon_window(task_set, hyper_period, wcet_gap, windows,
+                                                                      relaxed_hi, values, ends,
+                                                                      first_window * window_length, last)
+            solve_time = solve_time + time() - window_start_time
+            disjunctions = disjunctions + window_disjunctions
+            if verbose:
+                print("\tWindow %s-%s of %s: %s instances, %s" % (
+                    first_window, kk, nr_windows, sum(ends[t.name] - len(values[t.name]) for t in task_set),
+                    "sat" if window_values is not None else "unsat"))
+            if window_values is not None:
+                break
+            if first_window == 0 or depth >= max_backtrack:
+                result = unknown
+                break
+            depth = depth + 1
+            backtracks = backtracks + 1
+        if result != sat:
+            break
+        # Decide the instances placed within the solved windows, the later ones are solved again with the next window
+        del decided[first_window:]
+        for window in range(first_window, kk + 1):
+            boundary = hyper_period + 1 if window == nr_windows - 1 else (window + 1) * window_length
+            decided.append({t.name: len(values[t.name]) + placed_before(window_values[t.name], boundary)
+                            for t in task_set})
+        for t in task_set:
+            values[t.name].extend(window_values[t.name][:decided[kk][t.name] - len(values[t.name])])
+        kk = kk + 1
+
+    elapsed_time = time() - start_time
+    if metrics is not None:
+        metrics.scheduler = metrics.scheduler or 'rolling'
+        metrics.result = str(result)
+        metrics.build_time = elapsed_time - solve_time
+        metrics.solve_time = solve_time
+        metrics.collect_instances(task_set, hyper_period)
+        metrics.variables = nr_instances
+        metrics.disjunctions = disjunctions
+        metrics.statistics = dict(windows=nr_windows, window_length=window_length, overlap=overlap,
+                                  backtracks=backtracks)
+    if result != sat:
+        return None, utilization, hyper_period, elapsed_time
+    return [values[t.name] for t in task_set], utilization, hyper_period, elapsed_time
+
+
+def gen_schedule_activations(schedule, task_set):
+    for task in task_set:
+        for pit in task.release_instances:
+            pit_value = schedule.eval(pit, model_completion=True)
+            task.addStartPIT(pit_value.as_signed_long() if is_bv_value(pit_value) else pit_value.as_long())
+
+
+class IncrementalCyclicScheduler:
+    # Keeps one solver alive across what-if edits of a task set. The constraints of every task are guarded by an
+    # assumption literal, so removing or modifying a task retires its literal instead of rebuilding the model.
+    # A change of the hyper period alters the release instances of every task and triggers a full rebuild.
+    # The solver terms live on detached copies of the tasks, so the caller's tasks can still be passed to other models
+    # while the scheduler is alive. check only writes the activation instances back to the caller's tasks.
+
+    def __init__(self, task_set=(), wcet_gap=0, verbose=False):
+        self.wcet_gap = wcet_gap
+        self.verbose = verbose
+        self.tasks = {}
+        self.model_tasks = {}
+        self.task_literals = {}
+        self.windows = {}
+        self.conflicting_tasks = []
+        self.hyper_period = None
+        self.nr_literals = 0
+        self.ctx = None
+        self.smt = None
+        for task in task_set:
+            self.tasks[task.name] = task
+            self.model_tasks[task.name] = task.detached()
+        self.rebuild()
+
+    def rebuild(self):
+        self.ctx = Context()
+        self.smt = Solver(ctx=self.ctx)
+        self.smt.set('arith.solver', 3)
+        self.smt.set('arith.auto_config_simplex', True)
+        self.task_literals = {}
+        self.windows = {}
+        self.hyper_period = find_lcm([t.period for t in self.tasks.values()]) if self.tasks else None
+        for task in self.model_tasks.values():
+            self.assert_task(task)
+
+    def assert_task(self, task):
+        task.release_instances = []
+        for nn in range(self.hyper_period // task.period):
+            task.release_instances.append(Int(task.name + "_" + "inst_" + str(nn), self.ctx))
+        task_literal = Bool(task.name + "_" + "active_" + str(self.nr_literals), self.ctx)
+        self.nr_literals = self.nr_literals + 1
+        self.windows[task.name] = calc_release_windows(task, self.hyper_period, self.wcet_gap)
+        for nn in range(len(task.release_instances)):
+            for constraint in gen_release_constraints(task, nn, self.hyper_period, self.wcet_gap):
+                self.smt.add(Implies(task_literal, constraint))
+        for other_name, other_literal in self.task_literals.items():
+            for constraint in gen_nonoverlap_constraints(task, self.model_tasks[other_name], self.wcet_gap,
+                                                         self.windows):
+                self.smt.add(Implies(And(task_literal, other_literal), constraint))
+        self.task_literals[task.name] = task_literal
+
+    def retire_task(self, name):
+        # A retired literal is asserted false for good, which turns all of its guarded constraints into tautologies
+        self.smt.add(Not(self.task_literals.pop(name)))
+        del self.windows[name]
+
+    def update_hyper_period(self):
+        hyper_period = find_lcm([t.period for t in self.tasks.values()]) if self.tasks else None
+        if hyper_period != self.hyper_period:
+            self.rebuild()
+            return True
+        return False
+
+    def add_task(self, task):
+        if task.name in self.tasks:
+            raise ValueError("Task %s is already part of the task set" % task.name)
+        self.tasks[task.name] = task
+        self.model_tasks[task.name] = task.detached()
+        if not self.update_hyper_period():
+            self.assert_task(self.model_tasks[task.name])
+        return self.check()
+
+    def remove_task(self, name):
+        del self.tasks[name]
+        del self.model_tasks[name]
+        self.retire_task(name)
+        self.update_hyper_period()
+        return self.check()
+
+    def update_task(self, task):
+        if task.name not in self.tasks:
+            raise ValueError("Task %s is not part of the task set" % task.name)
+        self.retire_task(task.name)
+        self.tasks[task.name] = task
+        self.model_tasks[task.name] = task.detached()
+        if not self.update_hyper_period():
+            self.assert_task(self.model_tasks[task.name])
+        return self.check()
+
+    def shrink_conflict(self, names=None):
+        # Deletion based shrinking of a group of tasks that cannot be scheduled together, by default all tasks. The
+        # group is taken to be unsat without checking it again. A task whose removal leaves the rest unsat is dropped
+        # together with every task outside the unsat core of the rest, one that leaves it sat (or unknown) is kept.
+        conflict = list(self.task_literals) if names is None else list(names)
+        ii = 0
+        while ii < len(conflict):
+            rest = conflict[:ii] + conflict[ii + 1:]
+            if self.smt.check(*[self.task_literals[name] for name in rest]) == unsat:
+                # Every task kept so far is part of any unsat subset, so the core keeps them and their order
+                core_literals = [str(literal) for literal in self.smt.unsat_core()]
+                conflict = [name for name in rest if str(self.task_literals[name]) in core_literals]
+            else:
+                ii = ii + 1
+        self.conflicting_tasks = conflict
+        return conflict
+
+    def check(self):
+        task_set = list(self.tasks.values())
+        utilization = sum(t.execution / t.period for t in task_set) * 100
+        self.conflicting_tasks = []
+        start_time = time()
+        result = self.smt.check(*self.task_literals.values())
+        if result in (sat, unknown):
+            solution_model = self.smt.model()
+            elapsed_time = time() - start_time
+            for task in task_set:
+                task.activation_instances = [solution_model.eval(pit, model_completion=True).as_long() for pit in
+                                             self.model_tasks[task.name].release_instances]
+        else:
+            solution_model = None
+            elapsed_time = time() - start_time
+            # The unsat core names the tasks that cannot be scheduled together
+            core_literals = [str(literal) for literal in self.smt.unsat_core()]
+            self.conflicting_tasks = [name for name, literal in self.task_literals.items() if
+                                      str(literal) in core_literals]
+
+        if self.verbose:
+            print("\nZ3 statistics...")
+            for k, v in self.smt.statistics():
+                print("%s : %s" % (k, v))
+
+        return solution_model, utilization, self.hyper_period, elapsed_time
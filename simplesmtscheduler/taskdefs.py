@@ -1,39 +1,158 @@
+from array import array
 from math import ceil
 
+# Marks a missing CPU ID or fixed start PIT in the integer columns of a TaskTable
+NO_VALUE = -2 ** 63
+TIMING_COLUMNS = ('period', 'execution', 'deadline', 'offset', 'jitter')
+
+
+class TaskTable:
+    # Column oriented task set, the timing parameters are kept in compact integer arrays and rows are appended
+    # without any output. PeriodicTask objects obtained from task() are views over one row of the table.
+    __slots__ = ('period', 'execution', 'deadline', 'offset', 'jitter', 'coreid', 'fixed_pit', 'name', 'cfunc')
+
+    def __init__(self):
+        for column in TIMING_COLUMNS + ('coreid', 'fixed_pit'):
+            setattr(self, column, array('q'))
+        self.name = []
+        self.cfunc = []
+
+    def __len__(self):
+        return len(self.name)
+
+    def append(self, period, execution, deadline, offset, jitter, coreid=0, fixed_pit=None, name="a_task",
+               cfunc="void"):
+        self.period.append(ceil(period))
+        self.execution.append(ceil(execution))
+        self.deadline.append(ceil(deadline))
+        self.offset.append(ceil(offset))
+        self.jitter.append(ceil(jitter))
+        self.coreid.append(NO_VALUE if coreid is None else int(coreid))
+        self.fixed_pit.append(NO_VALUE if fixed_pit is None else int(fixed_pit))
+        self.name.append(name)
+        self.cfunc.append(cfunc)
+        return len(self.name) - 1
+
+    def row(self, index):
+        # Constructor arguments of a row, missing values as None
+        coreid = self.coreid[index]
+        fixed_pit = self.fixed_pit[index]
+        return (self.period[index], self.execution[index], self.deadline[index], self.offset[index],
+                self.jitter[index], None if coreid == NO_VALUE else coreid,
+                None if fixed_pit == NO_VALUE else fixed_pit, self.name[index], self.cfunc[index])
+
+    def task(self, index):
+        return PeriodicTask.view(self, index)
+
+    def tasks(self):
+        return [PeriodicTask.view(self, index) for index in range(len(self))]
+
+
+def table_column(column):
+    # Property reading and writing one column of the row a PeriodicTask views, timing parameters are rounded up to
+    # integers as by TaskTable.append
+    def get_value(self):
+        return getattr(self.table, column)[self.index]
+
+    def set_value(self, value):
+        getattr(self.table, column)[self.index] = ceil(value) if column in TIMING_COLUMNS else value
+
+    return property(get_value, set_value)
+
 
 class PeriodicTask:
+    # A task is a view over one row of a TaskTable plus its per task solver state. Constructing one directly creates
+    # a private single row table and reports the task on stdout, views created by TaskTable.task() are silent.
+    __slots__ = ('table', 'index', 'mapped_coreid', 'release_instances', 'activation_instances')
 
     def __init__(self, period: float, execution: float, deadline: float, offset: float,
                  jitter: float, coreid: int = 0, fixed_pit: int = None, name: str = "a_task",
                  cfunc: str = "void"):
+        table = TaskTable()
+        table.append(period, execution, deadline, offset, jitter, coreid, fixed_pit, name, cfunc)
+        self.attach(table, 0)
+        print(self.describe())
 
-        self.name = name
-        self.period = ceil(period)
-        self.deadline = ceil(deadline)
-        self.execution = ceil(execution)
-        self.offset = ceil(offset)
-        self.jitter = ceil(jitter)
-        self.coreid = coreid
+    @classmethod
+    def view(cls, table, index):
+        task = cls.__new__(cls)
+        task.attach(table, index)
+        return task
+
+    def attach(self, table, index):
+        self.table = table
+        self.index = index
         self.mapped_coreid = None
         self.release_instances = []  # constraint
-        self.releas_itr = None
-        self.cfunc = cfunc
-        self.active_itr = None
         self.activation_instances = []  # result
 
+    period = table_column('period')
+    execution = table_column('execution')
+    deadline = table_column('deadline')
+    offset = table_column('offset')
+    jitter = table_column('jitter')
+    name = table_column('name')
+    cfunc = table_column('cfunc')
+
+    @property
+    def coreid(self):
+        coreid = self.table.coreid[self.index]
+        return None if coreid == NO_VALUE else coreid
+
+    @coreid.setter
+    def coreid(self, coreid):
+        self.table.coreid[self.index] = NO_VALUE if coreid is None else int(coreid)
+
+    @property
+    def fixed_pit(self):
+        # Tasks without a fixed start PIT have no such attribute, as hasattr(task, 'fixed_pit') is the check used
+        fixed_pit = self.table.fixed_pit[self.index]
+        if fixed_pit == NO_VALUE:
+            raise AttributeError("Task %s has no fixed start PIT" % self.name)
+        return fixed_pit
+
+    @fixed_pit.setter
+    def fixed_pit(self, fixed_pit):
+        self.table.fixed_pit[self.index] = NO_VALUE if fixed_pit is None else int(fixed_pit)
+
+    @fixed_pit.deleter
+    def fixed_pit(self):
+        self.table.fixed_pit[self.index] = NO_VALUE
+
+    def describe(self):
+        period, execution, deadline, offset, jitter, coreid, fixed_pit, name, _ = self.table.row(self.index)
+        lines = [name + " {", "  CORE/NODE=%s," % coreid, "  T=%s," % period, "  C=%s," % execution,
+                 "  D=%s," % deadline, "  O=%s," % offset, "  J=%s," % jitter]
         if fixed_pit is not None:
-            self.fixed_pit = fixed_pit
-
-        print(name + " {")
-        print("  CORE/NODE=%s," % coreid)
-        print("  T=%s," % period)
-        print("  C=%s," % execution)
-        print("  D=%s," % deadline)
-        print("  O=%s," % offset)
-        print("  J=%s," % jitter)
-        if fixed_pit is not None:
-            print("  S=%s" % fixed_pit)
-        print("};")
+            lines.append("  S=%s" % fixed_pit)
+        lines.append("};")
+        return "\n".join(lines)
+
+    def detached(self):
+        # Copy of the row in a private table, so that the copy can be modified without touching the original
+        table = TaskTable()
+        table.append(*self.table.row(self.index))
+        task = PeriodicTask.view(table, 0)
+        task.mapped_coreid = self.mapped_coreid
+        task.activation_instances = list(self.activation_instances)
+        return task
+
+    def __copy__(self):
+        task = self.detached()
+        task.release_instances = list(self.release_instances)
+        return task
+
+    def __getstate__(self):
+        # Only the row is sent to a worker, solver variables belong to a Z3 context of this process
+        return self.table.row(self.index), self.mapped_coreid, list(self.activation_instances)
+
+    def __setstate__(self, state):
+        row, mapped_coreid, activation_instances = state
+        table = TaskTable()
+        table.append(*row)
+        self.attach(table, 0)
+        self.mapped_coreid = mapped_coreid
+        self.activation_instances = activation_instances
 
     def addStartPIT(self, pit: float):
         self.activation_instances.append(pit)
@@ -45,4 +164,5 @@ class PeriodicTask:
         return self.activation_instances
 
     def toActualDict(self):
-        return {k: v for k, v in self.__dict__ if not k.contains('release_instances')}
+        return dict(zip(TIMING_COLUMNS + ('coreid', 'fixed_pit', 'name', 'cfunc'), self.table.row(self.index)),
+                    mapped_coreid=self.mapped_coreid, activation_instances=self.activation_instances)
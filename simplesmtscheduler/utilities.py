@@ -1,88 +1,202 @@
 import csv
 import ast
+import operator
 import shutil
+import copy
 from io import StringIO
 from math import *
 
-import matplotlib.pyplot as plt
-from z3 import *
-
 from simplesmtscheduler.taskdefs import *
 
-# set_param('parallel.enable', True)
-
 MY_DPI = 480
 SEC_TO_MS = 1000
 US_TO_MS = 0.001
 NS_TO_US = 1 / 1000
+# Aggregations of the minimized objective of -o, the largest value or the sum over all terms
+OBJECTIVES = ('max', 'sum')
+
+# Operators allowed in the numeric cells of a task set, e.g. "16000000+79275"
+CELL_OPERATORS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod, ast.Pow: operator.pow,
+    ast.USub: operator.neg, ast.UAdd: operator.pos
+}
+# Largest magnitude of any value within a cell, bounding the work a crafted cell can cause (e.g. 9**9**9**9). Every
+# value has to fit the signed 64 bit columns of a TaskTable.
+MAX_CELL_BITS = 63
 
 
 def find_lcm(numbers):
-    lcm = numbers[0]
+    # Integer arithmetic only, a float division loses precision once the hyper period exceeds 2^53
+    lcm = int(numbers[0])
     for ii in numbers[1:]:
-        lcm = int(lcm * ii / gcd(lcm, ii))
+        lcm = lcm * int(ii) // gcd(lcm, int(ii))
     return lcm
 
 
+def normalize_time_base(task_set, wcet_gap, granularity=None):
+    # Returns copies of the tasks expressed in a coarser time unit together with the scaled WCET gap and the unit.
+    # Without a granularity the unit is the GCD of all timing parameters and the scaling is exact. A user given
+    # granularity rounds conservatively so any schedule of the copies maps back to a valid schedule of the originals.
+    if granularity is None:
+        time_unit = ceil(wcet_gap)
+        for t in task_set:
+            for value in (t.period, t.execution, t.deadline, t.offset, t.jitter):
+                time_unit = gcd(time_unit, value)
+            if hasattr(t, 'fixed_pit'):
+                time_unit = gcd(time_unit, int(t.fixed_pit))
+        time_unit = max(time_unit, 1)
+    else:
+        time_unit = int(granularity)
+    scaled_task_set = []
+    for t in task_set:
+        if t.period % time_unit != 0:
+            raise ValueError("Period of task %s is not a multiple of the time granularity %s" % (t.name, time_unit))
+        scaled_task = copy.copy(t)
+        scaled_task.release_instances = []
+        scaled_task.activation_instances = []
+        scaled_task.period = t.period // time_unit
+        scaled_task.execution = ceil(t.execution / time_unit)
+        scaled_task.offset = ceil(t.offset / time_unit)
+        jitter = t.jitter
+        if hasattr(t, 'fixed_pit'):
+            # A rounded fixed start consumes part of the allowed jitter
+            fixed_pit = round(int(t.fixed_pit) / time_unit)
+            jitter = jitter - abs(int(t.fixed_pit) - fixed_pit * time_unit)
+            if jitter < 0:
+                raise ValueError(
+                    "Fixed start of task %s is not a multiple of the time granularity %s" % (t.name, time_unit))
+            scaled_task.fixed_pit = fixed_pit
+        scaled_task.jitter = jitter // time_unit
+        scaled_task.deadline = t.deadline // time_unit
+        scaled_task_set.append(scaled_task)
+    return scaled_task_set, ceil(wcet_gap / time_unit), time_unit
+
+
 def z3_abs(x):
+    from z3 import If
     return If(x >= 0, x, -x)
 
 
-def parse_csv_taskset(csv_file, task_set):
-    if isinstance(csv_file, StringIO):
-        f = csv_file
+def check_cell_value(value):
+    if value is not None and abs(value) >= 2 ** MAX_CELL_BITS:
+        raise ValueError("Cell value exceeds %s bits" % MAX_CELL_BITS)
+    return value
+
+
+def eval_cell_node(node):
+    if isinstance(node, ast.Constant) and (node.value is None or isinstance(node.value, (int, float))):
+        return check_cell_value(node.value)
+    if isinstance(node, ast.BinOp) and type(node.op) in CELL_OPERATORS:
+        left = eval_cell_node(node.left)
+        right = eval_cell_node(node.right)
+        # A power is bounded before it is computed, its result could take arbitrarily long otherwise
+        if isinstance(node.op, ast.Pow) and (abs(right) > MAX_CELL_BITS or
+                                             (abs(left) > 1 and log2(abs(left)) * right > MAX_CELL_BITS)):
+            raise ValueError("Power %s ** %s exceeds %s bits" % (left, right, MAX_CELL_BITS))
+        return check_cell_value(CELL_OPERATORS[type(node.op)](left, right))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in CELL_OPERATORS:
+        return check_cell_value(CELL_OPERATORS[type(node.op)](eval_cell_node(node.operand)))
+    raise ValueError("Unsupported expression %s" % ast.dump(node))
+
+
+def eval_cell(cell):
+    # Numeric literal or arithmetic expression of literals, anything else raises ValueError
+    try:
+        value = int(cell)
+    except ValueError:
+        pass
     else:
-        f = open(csv_file, 'r')
-    reader = csv.reader(f)
-    is_first_row = True
-    row_index = 0
-    for row in reader:
-        if is_first_row:
-            is_first_row = False
-        elif not str(row[0]).startswith("#"):
-            try:
-                period = eval(compile(ast.parse(row[0], mode='eval'), '<string>', 'eval'))
-            except ValueError:
-                period = 0
-            try:
-                execution = eval(compile(ast.parse(row[1], mode='eval'), '<string>', 'eval'))
-            except ValueError:
-                execution = 0
-            try:
-                deadline = eval(compile(ast.parse(row[2], mode='eval'), '<string>', 'eval'))
-            except ValueError:
-                deadline = 0
-            try:
-                offset = eval(compile(ast.parse(row[3], mode='eval'), '<string>', 'eval'))
-            except ValueError:
-                offset = 0
-            try:
-                jitter = eval(compile(ast.parse(row[4], mode='eval'), '<string>', 'eval'))
-            except ValueError:
-                jitter = 0
-            try:
-                coreid = int(row[5])
-            except ValueError:
-                coreid = None
-            try:
-                fixed_pit = eval(compile(ast.parse(row[6], mode='eval'), '<string>', 'eval'))
-            except ValueError:
-                fixed_pit = None
-            try:
-                name = str(row[7]).strip()
-            except ValueError:
-                name = "Task %s" % row_index
+        return check_cell_value(value)
+    try:
+        return eval_cell_node(ast.parse(cell.strip(), mode='eval').body)
+    except (SyntaxError, TypeError, ZeroDivisionError, OverflowError) as e:
+        raise ValueError("Invalid cell %r: %s" % (cell, e))
+
+
+def parse_csv_column(cells, default):
+    # Parses a whole column, identical cells are evaluated once and invalid ones get the default
+    values = dict()
+    column = []
+    for cell in cells:
+        if cell not in values:
             try:
-                func = str(row[8])
+                values[cell] = eval_cell(cell)
             except ValueError:
-                func = "void"
-
-            task_set.append(PeriodicTask(period, execution, deadline, offset, jitter, coreid, fixed_pit, name, func))
-            row_index = row_index + 1
-    f.close()
+                values[cell] = default
+        column.append(values[cell])
+    return column
 
 
-def plot_cyclic_schedule(task_set, hyper_period, iterations=1, name=None):
+def load_csv_tasktable(csv_file):
+    # Loads a task set CSV into a TaskTable without any output, the first row is the header and rows starting with #
+    # are comments. Columns: Period, Execution, Deadline, Offset, Jitter, CPU ID, Fixed Start, Name, Function.
+    if isinstance(csv_file, StringIO):
+        rows = list(csv.reader(csv_file))
+    else:
+        with open(csv_file, 'r') as f:
+            rows = list(csv.reader(f))
+    rows = [row + [""] * (9 - len(row)) for row in rows[1:] if row and not str(row[0]).startswith("#")]
+    columns = list(zip(*rows)) if rows else [()] * 9
+    periods = parse_csv_column(columns[0], 0)
+    executions = parse_csv_column(columns[1], 0)
+    deadlines = parse_csv_column(columns[2], 0)
+    offsets = parse_csv_column(columns[3], 0)
+    jitters = parse_csv_column(columns[4], 0)
+    coreids = parse_csv_column(columns[5], None)
+    fixed_pits = parse_csv_column(columns[6], None)
+    table = TaskTable()
+    for ii in range(len(rows)):
+        coreid = coreids[ii]
+        table.append(periods[ii] or 0, executions[ii] or 0, deadlines[ii] or 0, offsets[ii] or 0, jitters[ii] or 0,
+                     int(coreid) if coreid is not None else None, fixed_pits[ii],
+                     columns[7][ii].strip() or "Task %s" % ii, columns[8][ii] or "void")
+    return table
+
+
+def parse_csv_taskset(csv_file, task_set, verbose=True):
+    # Appends the tasks of a CSV to task_set as views over one TaskTable, reporting each of them unless not verbose
+    table = load_csv_tasktable(csv_file)
+    for task in table.tasks():
+        if verbose:
+            print(task.describe())
+        task_set.append(task)
+    return table
+
+
+def check_task_set(task_set):
+    # Reason why a task set cannot be scheduled regardless of the solver, None when it is valid
+    if not task_set:
+        return "No tasks defined"
+    elif [t for t in task_set if t.execution > t.deadline]:
+        return "Execution time violate period and deadline constraints for tasks: " + str(
+            [t.name for t in task_set if t.execution > t.deadline])
+    elif [t for t in task_set if t.deadline > t.period]:
+        return "Deadline times violate period constraints"
+    elif [t for t in task_set if t.offset > t.period]:
+        return "Offset times violate period constraints"
+    return None
+
+
+def merge_execution_bars(starts, widths, resolution):
+    # Bars of one row sorted by start, bars closer than the resolution (time per pixel) are merged into one so the
+    # number of drawn rectangles stays bounded by the image width
+    import numpy as np
+    if len(starts) == 0 or resolution <= 0:
+        return starts, widths
+    ends = starts + widths
+    ends = np.maximum.accumulate(ends)
+    breaks = np.flatnonzero(starts[1:] - ends[:-1] >= resolution) + 1
+    first = np.concatenate(([0], breaks))
+    last = np.concatenate((breaks - 1, [len(starts) - 1]))
+    return starts[first], ends[last] - starts[first]
+
+
+def plot_cyclic_schedule(task_set, hyper_period, iterations=1, name=None, dpi=MY_DPI):
+    # Plotting is the only use of matplotlib, it is imported here to keep it off the startup path
+    import matplotlib.pyplot as plt
+    import numpy as np
+    from matplotlib.collections import PolyCollection
     # Declaring a figure "gnt"
     fig, axis = plt.subplots()
     plt.subplots_adjust(left=0.05, bottom=0.10, right=0.97, top=0.96)
@@ -104,7 +218,7 @@ def plot_cyclic_schedule(task_set, hyper_period, iterations=1, name=None):
     axis.set_xlabel('Schedule Timeline')
     axis.set_ylabel('Tasks')
     # axis.set_xticks(range(0, periods*Sum([t.getStartPIT()+t.execution for t in taskSet]), 5000))
-    axis.set_xticks(range(0, hyper_period * iterations, int(hyper_period * iterations / 10)))
+    axis.set_xticks(range(0, hyper_period * iterations, max(1, int(hyper_period * iterations / 10))))
     # Setting ticks on y-axis
     axis.set_yticks(range(5, len(srt_task_set) * 10 + 5, 10))
     # Labelling tickes of y-axis
@@ -115,18 +229,29 @@ def plot_cyclic_schedule(task_set, hyper_period, iterations=1, name=None):
     plt.minorticks_on()
     plt.grid(visible=True, which='minor', color='#999999', linestyle='-', alpha=0.2)
     # Color map
-    cmap = plt.cm.get_cmap('viridis', len(srt_task_set))
+    cmap = plt.get_cmap('viridis', max(1, len(srt_task_set)))
     print("\nSchedule plotted for %s hyper-periods\n" % iterations)
+    # Time covered by one pixel of the axis at the given DPI
+    resolution = hyper_period * iterations / (axis.get_position().width * fig.get_size_inches()[0] * dpi)
+    offsets = np.arange(iterations, dtype=np.int64) * hyper_period
+    rows = []
     for i in range(len(srt_task_set)):
-        taskExecutionBars = []
-        for hyper_iter in range(0, iterations):
-            for jj in range(len(srt_task_set[i].getStartPIT())):
-                start = hyper_iter * hyper_period + srt_task_set[i].getStartPIT()[jj]
-                end = srt_task_set[i].execution
-                taskExecutionBars.append((start, end))
-        task_label = f"CPU#{srt_task_set[i].coreid}_{srt_task_set[i].name}"
-        axis.broken_barh(taskExecutionBars, (i * 10, 10), label=task_label, facecolors=cmap(i), edgecolor='k',
-                         linestyle='dotted', linewidth=0.2)
+        start_pits = np.asarray(srt_task_set[i].getStartPIT(), dtype=np.int64)
+        starts = np.sort((offsets[:, None] + start_pits[None, :]).ravel())
+        widths = np.full(len(starts), srt_task_set[i].execution, dtype=np.int64)
+        rows.append(merge_execution_bars(starts, widths, resolution))
+    # All bars as a single collection of rectangles
+    nr_bars = sum(len(starts) for starts, _ in rows)
+    verts = np.empty((nr_bars, 4, 2), dtype=np.float64)
+    colors = np.empty((nr_bars, 4), dtype=np.float64)
+    bar = 0
+    for i, (starts, widths) in enumerate(rows):
+        next_bar = bar + len(starts)
+        verts[bar:next_bar, :, 0] = np.stack((starts, starts, starts + widths, starts + widths), axis=1)
+        verts[bar:next_bar, :, 1] = (i * 10, i * 10 + 10, i * 10 + 10, i * 10)
+        colors[bar:next_bar] = cmap(i)
+        bar = next_bar
+    axis.add_collection(PolyCollection(verts, facecolors=colors, edgecolor='k', linestyle='dotted', linewidth=0.2))
 
     # Rotate labels to fit nicely
     fig.autofmt_xdate()
@@ -134,7 +259,56 @@ def plot_cyclic_schedule(task_set, hyper_period, iterations=1, name=None):
     return plt
 
 
-def gen_schedule_code(file_name, tasks_file_name, task_set, hyper_period, utilization, isCli=False):
+def save_cyclic_schedule_plot(file_name, task_set, hyper_period, iterations=1, name=None, dpi=MY_DPI):
+    # Renders and saves one schedule plot, the format follows the extension (e.g. png, svg or pdf). Self-contained
+    # so that the plots of several cores can be rendered by worker processes.
+    schedule_plot = plot_cyclic_schedule(task_set, hyper_period, iterations, name, dpi)
+    schedule_plot.savefig(file_name, dpi=dpi)
+    schedule_plot.close()
+    return file_name
+
+
+# Unsigned and signed C types by width, the dispatch tables use the narrowest one that fits
+C_UINT_TYPES = ((8, "uint8_t"), (16, "uint16_t"), (32, "uint32_t"), (64, "uint64_t"))
+C_INT_TYPES = ((8, "int8_t"), (16, "int16_t"), (32, "int32_t"), (64, "int64_t"))
+DISPATCH_MODES = ('table', 'delta')
+
+
+def narrowest_uint_ctype(max_value):
+    for bits, ctype in C_UINT_TYPES:
+        if max_value < 2 ** bits:
+            return ctype
+    raise ValueError("%s does not fit in %s" % (max_value, C_UINT_TYPES[-1][1]))
+
+
+def narrowest_ctype(min_value, max_value):
+    # Unsigned unless a value is negative, e.g. a release before 0 of a fixed start PIT with jitter
+    if min_value >= 0:
+        return narrowest_uint_ctype(max_value)
+    for bits, ctype in C_INT_TYPES:
+        if -2 ** (bits - 1) <= min_value and max_value < 2 ** (bits - 1):
+            return ctype
+    raise ValueError("[%s, %s] does not fit in %s" % (min_value, max_value, C_INT_TYPES[-1][1]))
+
+
+def gen_dispatch_table(core_tasks, task_ids, hyper_period, dispatch='table'):
+    # Activations of one core merged into one time sorted list of (time, task id) entries. In 'delta' mode the times
+    # are the distance to the previous entry (the first one to the start of the hyper period) and the wrap is the
+    # distance from the last entry to the first one of the next hyper period.
+    entries = sorted((pit, task_ids[t.name]) for t in core_tasks for pit in t.getStartPIT())
+    times = [pit for pit, _ in entries]
+    if dispatch == 'delta' and entries:
+        wrap = hyper_period - times[-1] + times[0]
+        times = [times[0]] + [b - a for a, b in zip(times, times[1:])]
+        return times, [task_id for _, task_id in entries], wrap
+    return times, [task_id for _, task_id in entries], None
+
+
+def gen_schedule_code(file_name, tasks_file_name, task_set, hyper_period, utilization, isCli=False, dispatch=None):
+    # With dispatch set to 'table' or 'delta' one merged dispatch table per core is emitted after the per task
+    # arrays, see gen_dispatch_table
+    if dispatch is not None and dispatch not in DISPATCH_MODES:
+        raise ValueError("Unknown dispatch table mode %s, expected one of %s" % (dispatch, DISPATCH_MODES))
     wr_buf = StringIO()
 
     time_ctype = "unsigned long long"
@@ -142,7 +316,14 @@ def gen_schedule_code(file_name, tasks_file_name, task_set, hyper_period, utiliz
     srt_task_set = sorted(task_set, key=lambda x: (x.period), reverse=False)
     # srt_task_set = task_set.copy()
 
+    core_count = max([t.coreid + 1 for t in srt_task_set])
+    cores_tasks = [[t for t in srt_task_set if t.coreid == i] for i in range(core_count)]
+    # A CPU ID without tasks has no hyper period
+    cores_hyperperiods = [find_lcm([t.period for t in core_tasks]) if core_tasks else 0 for core_tasks in cores_tasks]
+
     wr_buf.write("#pragma once\n\n")
+    if dispatch is not None:
+        wr_buf.write("#include <stdint.h>\n\n")
     wr_buf.write("/*\n")
     wr_buf.write(
         " * This file was generated using SimpleSMTScheduler (https://github.com/egk696/SimpleSMTScheduler)\n")
@@ -151,7 +332,7 @@ def gen_schedule_code(file_name, tasks_file_name, task_set, hyper_period, utiliz
     wr_buf.write(" */\n\n")
     wr_buf.write("#define NUM_OF_TASKS %s\n" % len(srt_task_set))
     wr_buf.write("#define HYPER_PERIOD %s\n\n" % hyper_period)
-    wr_buf.write("#define MAPPED_CORE_COUNT %s\n\n" % max([t.coreid + 1 for t in srt_task_set]))
+    wr_buf.write("#define MAPPED_CORE_COUNT %s\n\n" % core_count)
 
     for i in range(len(srt_task_set)):
         wr_buf.write("#define %s_ID %s\n" % (srt_task_set[i].name, str(i)))
@@ -168,20 +349,12 @@ def gen_schedule_code(file_name, tasks_file_name, task_set, hyper_period, utiliz
     wr_buf.write("\n")
 
     wr_buf.write("unsigned tasks_per_cores[MAPPED_CORE_COUNT] = {")
-    for i in range(max([t.coreid + 1 for t in srt_task_set])):
-        if i < max([t.coreid + 1 for t in srt_task_set]) - 1:
-            wr_buf.write("%s, " % len([t for t in srt_task_set if t.coreid == i]))
-        else:
-            wr_buf.write("%s" % len([t for t in srt_task_set if t.coreid == i]))
+    wr_buf.write(", ".join(str(len(core_tasks)) for core_tasks in cores_tasks))
     wr_buf.write("};\n")
     wr_buf.write("\n")
 
     wr_buf.write("unsigned cores_hyperperiods[MAPPED_CORE_COUNT] = {")
-    for i in range(max([t.coreid + 1 for t in srt_task_set])):
-        if i < max([t.coreid + 1 for t in srt_task_set]) - 1:
-            wr_buf.write("%s, " % find_lcm([t.period for t in srt_task_set if t.coreid == i]))
-        else:
-            wr_buf.write("%s" % find_lcm([t.period for t in srt_task_set if t.coreid == i]))
+    wr_buf.write(", ".join(str(core_hyperperiod) for core_hyperperiod in cores_hyperperiods))
     wr_buf.write("};\n")
     wr_buf.write("\n")
 
@@ -230,6 +403,28 @@ def gen_schedule_code(file_name, tasks_file_name, task_set, hyper_period, utiliz
             wr_buf.write("%s_sched_insts" % srt_task_set[i].name)
     wr_buf.write("};\n")
 
+    if dispatch is not None:
+        # One time sorted table per core, the next activation is always the next entry
+        task_ids = {t.name: i for i, t in enumerate(srt_task_set)}
+        task_id_ctype = narrowest_uint_ctype(len(srt_task_set) - 1)
+        for i in range(core_count):
+            times, ids, wrap = gen_dispatch_table(cores_tasks[i], task_ids, cores_hyperperiods[i], dispatch)
+            if not times:
+                continue
+            if dispatch == 'delta':
+                dispatch_time_ctype = narrowest_ctype(min(times + [wrap]), max(times + [wrap]))
+            else:
+                dispatch_time_ctype = narrowest_ctype(times[0], max(times[-1], cores_hyperperiods[i]))
+            wr_buf.write("\n")
+            wr_buf.write("#define CORE_%s_DISPATCH_LEN %s\n" % (i, len(times)))
+            if wrap is not None:
+                wr_buf.write("#define CORE_%s_DISPATCH_WRAP %s\n" % (i, wrap))
+            wr_buf.write("typedef %s core_%s_dispatch_time_t;\n" % (dispatch_time_ctype, i))
+            wr_buf.write("const core_%s_dispatch_time_t core_%s_dispatch_%s[CORE_%s_DISPATCH_LEN] = {%s};\n" % (
+                i, i, "deltas" if dispatch == 'delta' else "times", i, ", ".join(str(t) for t in times)))
+            wr_buf.write("const %s core_%s_dispatch_tasks[CORE_%s_DISPATCH_LEN] = {%s};\n" % (
+                task_id_ctype, i, i, ", ".join(str(task_id) for task_id in ids)))
+
     if isCli:
         with open(file_name, 'w') as fd:
             wr_buf.seek(0)
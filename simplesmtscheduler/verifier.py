@@ -0,0 +1,128 @@
+import re
+from collections import namedtuple
+
+from simplesmtscheduler.utilities import find_lcm
+
+# One violated constraint of a schedule: the kind of check, the task and index of the release instance and the PIT
+# the violation occurs at, detail describes it in the units of the task set
+Violation = namedtuple('Violation', ['kind', 'task', 'index', 'time', 'detail'])
+VIOLATION_KINDS = ('count', 'hyper_period', 'offset', 'fixed_pit', 'period', 'deadline', 'overlap', 'wrap')
+
+SCHEDULE_ARRAY = re.compile(r'(\w+)_sched_insts\s*\[[^]]*\]\s*=\s*\{([^}]*)\}')
+NAMES_ARRAY = re.compile(r'tasks_names\s*\[[^]]*\]\s*=\s*\{([^}]*)\}')
+COREIDS_ARRAY = re.compile(r'tasks_coreids\s*\[[^]]*\]\s*=\s*\{([^}]*)\}')
+
+
+def verify_core_activations(core_tasks, activations, wcet_gap, wrap_around=False):
+    # Checks the activation instances of the tasks of one core against every constraint of the cyclic model and
+    # returns all violations ordered by time, an empty list for a valid schedule. The release instances are checked
+    # task by task, the non-overlap of the busy intervals [pit, pit + C + wcet_gap) of different tasks by one sort of
+    # all intervals and a sweep, O(n log n) overall. With wrap_around the first release of the next hyper period must
+    # also follow the last one by the period and jitter, which is the schedule a cyclic executive repeats. Only the
+    # rolling horizon guarantees that, the cyclic model does not constrain it.
+    hyper_period = find_lcm([t.period for t in core_tasks])
+    violations = []
+    intervals = []
+    for task, task_activations in zip(core_tasks, activations):
+        nr_instances = hyper_period // task.period
+        if len(task_activations) != nr_instances:
+            violations.append(Violation('count', task.name, None, 0, "%s has %s release instances instead of %s" % (
+                task.name, len(task_activations), nr_instances)))
+            continue
+        busy = task.execution + wcet_gap
+        fixed_pit = int(task.fixed_pit) if hasattr(task, 'fixed_pit') else None
+        previous = None
+        for nn, pit in enumerate(task_activations):
+            release = nn * task.period
+            if pit + task.execution > hyper_period - wcet_gap:
+                violations.append(Violation('hyper_period', task.name, nn, pit, "%s#%s ends at %s after the hyper "
+                                            "period %s" % (task.name, nn, pit + busy, hyper_period)))
+            if fixed_pit is not None:
+                if abs(pit - (release + fixed_pit)) > task.jitter:
+                    violations.append(Violation('fixed_pit', task.name, nn, pit, "%s#%s starts at %s, fixed at %s "
+                                                "+/- %s" % (task.name, nn, pit, release + fixed_pit, task.jitter)))
+            elif pit < release + task.offset:
+                violations.append(Violation('offset', task.name, nn, pit, "%s#%s starts at %s before its release %s" % (
+                    task.name, nn, pit, release + task.offset)))
+            if previous is not None and abs(pit - previous - task.period) > task.jitter:
+                violations.append(Violation('period', task.name, nn, pit, "%s#%s starts %s after the previous "
+                                            "instance, period %s +/- %s" % (task.name, nn, pit - previous,
+                                                                            task.period, task.jitter)))
+            if pit + busy > release + task.deadline + task.jitter:
+                violations.append(Violation('deadline', task.name, nn, pit, "%s#%s ends at %s after its deadline %s" % (
+                    task.name, nn, pit + busy, release + task.deadline + task.jitter)))
+            intervals.append((pit, pit + busy, task.name, nn))
+            previous = pit
+        if wrap_around and nr_instances > 0:
+            wrap = task_activations[0] + hyper_period - task_activations[-1]
+            if abs(wrap - task.period) > task.jitter:
+                violations.append(Violation('wrap', task.name, 0, hyper_period + task_activations[0],
+                                            "%s#0 of the next hyper period starts %s after the last instance, period "
+                                            "%s +/- %s" % (task.name, wrap, task.period, task.jitter)))
+    # Sweep keeping the busy interval reaching furthest and the one reaching furthest among the other tasks, so the
+    # furthest interval of any task but the current one is known. Instances of one task are not kept apart.
+    intervals.sort()
+    first = second = None
+    for start, end, name, nn in intervals:
+        other = first if first is not None and first[1] != name else second
+        if other is not None and other[0] > start:
+            violations.append(Violation('overlap', name, nn, start, "%s#%s starts at %s while %s#%s runs until %s" % (
+                name, nn, start, other[1], other[2], other[0])))
+        if first is None or end > first[0]:
+            if first is not None and first[1] != name:
+                second = first
+            first = (end, name, nn)
+        elif name != first[1] and (second is None or end > second[0]):
+            second = (end, name, nn)
+    violations.sort(key=lambda v: v.time)
+    return violations
+
+
+def verify_schedule(task_set, wcet_gap=0, wrap_around=False):
+    # Violations of the activation instances of a whole task set by CPU ID
+    violations = dict()
+    for core_id in sorted(set(t.coreid for t in task_set)):
+        core_tasks = [t for t in task_set if t.coreid == core_id]
+        violations[core_id] = verify_core_activations(core_tasks, [t.getStartPIT() for t in core_tasks], wcet_gap,
+                                                      wrap_around)
+    return violations
+
+
+def read_schedule_header(file_name):
+    # Activation instances per task name from a header written by gen_schedule_code, together with the CPU ID of
+    # every task when the header lists them (headers of older versions do not)
+    with open(file_name, 'r') as f:
+        source = f.read()
+    activations = {name: [int(pit) for pit in values.replace(",", " ").split()]
+                   for name, values in SCHEDULE_ARRAY.findall(source)}
+    core_ids = dict()
+    names = NAMES_ARRAY.search(source)
+    coreids = COREIDS_ARRAY.search(source)
+    if names is not None and coreids is not None:
+        core_ids = dict(zip([name.strip().strip('"') for name in names.group(1).split(",")],
+                            [int(core_id) for core_id in coreids.group(1).split(",")]))
+    return activations, core_ids
+
+
+def apply_schedule_header(file_name, task_set):
+    # Attaches the activation instances of a schedule header to the tasks, returns the names missing from the header
+    activations, core_ids = read_schedule_header(file_name)
+    missing = []
+    for task in task_set:
+        if task.name not in activations:
+            missing.append(task.name)
+            continue
+        task.activation_instances = activations[task.name]
+        if task.name in core_ids:
+            task.coreid = core_ids[task.name]
+    return missing
+
+
+def print_violations(core_id, violations):
+    print(f"\nCPU ID {core_id}:")
+    if not violations:
+        print("\t- Schedule is valid")
+        return
+    print("\t- %s violations" % len(violations))
+    for violation in violations:
+        print("\t\t[%s] %s" % (violation.kind, violation.detail))
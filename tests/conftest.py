@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from simplesmtscheduler.taskdefs import TaskTable
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def make_tasks():
+    # Silent task views from rows of TaskTable.append arguments
+    def make(*rows):
+        table = TaskTable()
+        for row in rows:
+            table.append(*row)
+        return table.tasks()
+
+    return make
+
+
+@pytest.fixture
+def run_cli(tmp_path):
+    # Runs the command line tool from the repository root with a throwaway home directory for its cache
+    def run(*args):
+        return subprocess.run([sys.executable, os.path.join(REPO_DIR, "SimpleSMTScheduler.py")] + list(args),
+                              cwd=REPO_DIR, env=dict(os.environ, HOME=str(tmp_path)), capture_output=True, text=True)
+
+    return run
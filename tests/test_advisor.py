@@ -0,0 +1,37 @@
+import math
+
+from simplesmtscheduler.advisor import advise_core, estimate_model_size, harmonize_periods
+from simplesmtscheduler.utilities import find_lcm
+
+ADVISOR_TASKS = [(1000, 100, 1000, 0, 0, 0, None, "A"), (1500, 200, 1500, 0, 0, 0, None, "B"),
+                 (700, 50, 700, 0, 0, 0, None, "C")]
+
+
+def test_hyper_period_is_exact_beyond_double_precision():
+    periods = [2 ** 31 - 1, 2 ** 31 + 11, 10 ** 9 + 7]
+    assert find_lcm(periods) == math.lcm(*periods) > 2 ** 53
+
+
+def test_model_size_is_estimated_without_building_the_model(make_tasks):
+    size = estimate_model_size(make_tasks(*ADVISOR_TASKS), 0)
+    assert size['hyper_period'] == 21000 and size['instances'] == {"A": 21, "B": 14, "C": 30}
+    assert size['variables'] == 65 and size['all_pair_disjunctions'] == 21 * 14 + 21 * 30 + 14 * 30
+    assert 0 < size['disjunctions'] <= size['all_pair_disjunctions']
+
+
+def test_harmonized_periods_stay_within_the_band(make_tasks):
+    tasks = make_tasks(*ADVISOR_TASKS)
+    periods = harmonize_periods(tasks, 0.2)
+    assert periods == {"A": 800, "B": 1200, "C": 600}
+    assert all(0.8 * t.period <= periods[t.name] <= t.period and periods[t.name] % 100 == 0 for t in tasks)
+    assert find_lcm(list(periods.values())) < find_lcm([t.period for t in tasks])
+    # Without tolerance no shorter hyper period exists
+    assert harmonize_periods(tasks, 0.0) is None
+
+
+def test_advice_sizes_the_harmonized_model(make_tasks):
+    tasks = make_tasks(*ADVISOR_TASKS)
+    advice = advise_core(tasks, 0, (0.2, 0.0))
+    assert advice['harmonized']['hyper_period'] == 2400 and advice['harmonized']['variables'] == 9
+    # The advice works on copies, the task set keeps its periods
+    assert [t.period for t in tasks] == [1000, 1500, 700]
@@ -0,0 +1,41 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from conftest import REPO_DIR
+
+
+@pytest.fixture
+def batch_dir(tmp_path):
+    batch_dir = tmp_path / "batch"
+    batch_dir.mkdir()
+    for file_name in ("demo_tasks.csv", "simple_tasks.csv"):
+        shutil.copy(os.path.join(REPO_DIR, "examples", file_name), str(batch_dir / file_name))
+    return str(batch_dir)
+
+
+@pytest.mark.parametrize("form", [["-b", "{}"], ["-b{}"], ["-vb", "{}"], ["--batch={}"], ["--batch", "{}"]])
+def test_batch_stdout_is_json_lines(batch_dir, run_cli, form):
+    completed = run_cli(*[arg.format(batch_dir) for arg in form])
+    assert completed.returncode == 0, completed.stdout
+    results = [json.loads(line) for line in completed.stdout.splitlines()]
+    assert sorted({os.path.basename(r['file']) for r in results}) == ["demo_tasks.csv", "simple_tasks.csv"]
+    assert all(r['status'] == 'sat' for r in results)
+
+
+def test_failing_task_sets_are_reported_and_set_the_exit_status(batch_dir, run_cli):
+    with open(os.path.join(batch_dir, "overloaded.csv"), 'w') as f:
+        f.write("Period,Execution,Deadline,Offset,Jitter,CPU ID,Fixed Start,Name,Function\n"
+                "10,6,10,0,0,0,None,A,&a\n10,6,10,0,0,0,None,B,&b\n")
+    with open(os.path.join(batch_dir, "invalid.csv"), 'w') as f:
+        f.write("Period,Execution,Deadline,Offset,Jitter,CPU ID,Fixed Start,Name,Function\n"
+                "10,12,10,0,0,0,None,A,&a\n")
+    output_file = os.path.join(batch_dir, "results.jsonl")
+    completed = run_cli("-b", batch_dir, "--batch-output", output_file, "-j", "2")
+    assert completed.returncode == 1
+    with open(output_file) as f:
+        statuses = {os.path.basename(r['file']): r['status'] for r in map(json.loads, f)}
+    assert statuses == {"demo_tasks.csv": "sat", "simple_tasks.csv": "sat", "overloaded.csv": "unsat",
+                        "invalid.csv": "invalid"}
@@ -0,0 +1,30 @@
+import os
+
+from simplesmtscheduler.cache import ScheduleCache, taskset_fingerprint
+
+
+def test_fingerprint_covers_solve_options(make_tasks):
+    tasks = make_tasks((10, 2, 10, 0, 1, 0, None, "A"), (20, 4, 20, 0, 0, 0, None, "B"))
+    options = dict(heuristic=False, granularity=None, portfolio=False, rolling=None, budget=60, objective='max')
+    key = taskset_fingerprint(tasks, 0, True, False, options)
+    assert key == taskset_fingerprint(list(reversed(tasks)), 0, True, False, dict(options))
+    for name, value in (('budget', 5), ('objective', 'sum'), ('rolling', 50), ('granularity', 2), ('heuristic', True)):
+        assert key != taskset_fingerprint(tasks, 0, True, False, dict(options, **{name: value}))
+
+
+def test_evict_tolerates_entries_removed_by_another_worker(tmp_path, monkeypatch):
+    cache = ScheduleCache(str(tmp_path), max_bytes=0)
+    for name in ("a", "b"):
+        (tmp_path / (name + ".json")).write_text("{}")
+    listdir = os.listdir
+
+    def listdir_then_remove(path):
+        # Another worker removes an entry right after this one listed the directory
+        names = listdir(path)
+        os.remove(os.path.join(path, "a.json"))
+        return names + ["missing.json"]
+
+    monkeypatch.setattr(os, 'listdir', listdir_then_remove)
+    cache.evict()
+    monkeypatch.undo()
+    assert os.listdir(str(tmp_path)) == []
@@ -0,0 +1,60 @@
+import os
+
+import pytest
+
+from conftest import REPO_DIR
+from simplesmtscheduler.chains import PrecedenceChain, chain_hops, chain_latencies, check_chains, \
+    core_hyper_periods, parse_chains_csv
+from simplesmtscheduler.schedulers import solve_chain_schedule
+
+CHAIN_TASKS = [(20, 2, 20, 0, 0, 0, None, "P"), (10, 1, 10, 0, 0, 1, None, "C"), (10, 4, 10, 0, 0, 1, None, "X"),
+               (20, 5, 20, 0, 0, 0, None, "Y")]
+CHAIN = PrecedenceChain("pc", ("P", "C"), (3,))
+
+
+def test_example_chains_are_parsed_in_hop_order():
+    chains = parse_chains_csv(os.path.join(REPO_DIR, "examples", "chains", "tte_combined_chains.csv"))
+    assert chains == [PrecedenceChain("control", ("SSENSE", "SSEND", "CRECV", "CCALC", "CSEND", "ARECV", "APULSE"),
+                                      (0, 100000, 0, 0, 100000, 0))]
+
+
+def test_broken_chain_is_rejected(tmp_path):
+    csv_file = str(tmp_path / "chains.csv")
+    with open(csv_file, 'w') as f:
+        f.write("Chain,Producer,Consumer,Delay\nc,A,B,0\nc,C,D,0\n")
+    with pytest.raises(ValueError):
+        parse_chains_csv(csv_file)
+
+
+def test_invalid_chains_are_reported(make_tasks):
+    tasks = make_tasks(*CHAIN_TASKS)
+    assert check_chains([CHAIN], tasks) is None
+    assert "unknown tasks ['Z']" in check_chains([PrecedenceChain("z", ("P", "Z"), (0,))], tasks)
+    assert "more than once" in check_chains([PrecedenceChain("r", ("P", "C", "P"), (0, 0))], tasks)
+    assert "negative delay" in check_chains([PrecedenceChain("n", ("P", "C"), (-1,))], tasks)
+
+
+def test_latency_follows_every_consumer_release(make_tasks):
+    tasks = make_tasks(*CHAIN_TASKS)
+    tasks[0].activation_instances = [3]
+    tasks[1].activation_instances = [6]
+    # Both releases of C in the 20 long chain hyper period follow release 0 of P, the second one 10 later
+    assert chain_latencies(CHAIN, tasks) == [6 + 1 - 3, 16 + 1 - 3]
+
+
+@pytest.mark.parametrize("optimize", [False, True])
+def test_chain_schedule_keeps_the_precedence(make_tasks, optimize):
+    tasks = make_tasks(*CHAIN_TASKS)
+    core_results = solve_chain_schedule(tasks, [CHAIN], 0, optimize, budget=30)
+    for core_id, (activations, _, _, _, metrics) in core_results.items():
+        assert activations is not None and metrics.result == 'sat'
+        for task, task_activations in zip([t for t in tasks if t.coreid == core_id], activations):
+            task.activation_instances = task_activations
+    tasks_by_name = {t.name: t for t in tasks}
+    release_instances = {t.name: t.getStartPIT() for t in tasks}
+    for producer_start, consumer_start in chain_hops(CHAIN, tasks_by_name, core_hyper_periods(tasks),
+                                                     release_instances):
+        assert consumer_start >= producer_start + tasks_by_name["P"].execution + 3
+    if optimize:
+        # Release 1 of C starts a period after release 0, which cannot start before the end of P plus the delay
+        assert max(chain_latencies(CHAIN, tasks)) == 16
@@ -0,0 +1,39 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+from conftest import REPO_DIR
+from simplesmtscheduler.benchmark import STARTUP_HEAVY_MODULES
+
+
+def test_parallel_cores_write_the_serial_header(tmp_path, run_cli):
+    tasks_file = str(tmp_path / "tte_combined.csv")
+    shutil.copy(os.path.join(REPO_DIR, "examples", "tte_combined.csv"), tasks_file)
+    header_file = tasks_file.replace(".csv", "_schedule.h")
+    headers = []
+    for jobs in ("1", "3"):
+        assert run_cli("-i", tasks_file, "-c", "--no-cache", "-j", jobs).returncode == 0
+        with open(header_file, 'rb') as f:
+            headers.append(f.read())
+        os.remove(header_file)
+    assert headers[0] == headers[1]
+
+
+def test_cached_schedule_does_not_import_the_heavy_modules(tmp_path, run_cli):
+    tasks_file = str(tmp_path / "demo_tasks.csv")
+    shutil.copy(os.path.join(REPO_DIR, "examples", "demo_tasks.csv"), tasks_file)
+    metrics_file = str(tmp_path / "metrics.json")
+    assert run_cli("-i", tasks_file).returncode == 0
+    # Runs the command line in-process to see which modules the cached path imports
+    argv = ['SimpleSMTScheduler.py', '-i', tasks_file, '-c', '--metrics', metrics_file]
+    probe = ("import runpy, sys\n"
+             "sys.argv = %r\n"
+             "runpy.run_path('SimpleSMTScheduler.py', run_name='__main__')\n"
+             "print(','.join(m for m in %r if m in sys.modules), file=sys.stderr)" % (argv, STARTUP_HEAVY_MODULES))
+    completed = subprocess.run([sys.executable, '-c', probe], cwd=REPO_DIR, env=dict(os.environ, HOME=str(tmp_path)),
+                               capture_output=True, text=True)
+    assert completed.returncode == 0 and completed.stderr.strip() == ""
+    with open(metrics_file) as f:
+        assert [m['scheduler'] for m in json.load(f)] == ['cache']
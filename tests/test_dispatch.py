@@ -0,0 +1,25 @@
+from simplesmtscheduler.utilities import gen_dispatch_table, gen_schedule_code, narrowest_ctype
+
+
+def scheduled_tasks(make_tasks):
+    tasks = make_tasks((6, 2, 2, 0, 1, 0, 0, "A"), (12, 2, 3, 0, 0, 0, None, "B"))
+    tasks[0].activation_instances = [-1, 5]
+    tasks[1].activation_instances = [2]
+    return tasks
+
+
+def test_dispatch_table_entries(make_tasks):
+    tasks = scheduled_tasks(make_tasks)
+    task_ids = {"A": 0, "B": 1}
+    assert gen_dispatch_table(tasks, task_ids, 12, 'table') == ([-1, 2, 5], [0, 1, 0], None)
+    assert gen_dispatch_table(tasks, task_ids, 12, 'delta') == ([-1, 3, 3], [0, 1, 0], 6)
+
+
+def test_negative_activation_gets_a_signed_dispatch_type(make_tasks):
+    tasks = scheduled_tasks(make_tasks)
+    for dispatch in ('table', 'delta'):
+        header = gen_schedule_code("unused.h", "tasks.csv", tasks, 12, 50, False, dispatch).getvalue()
+        assert "typedef int8_t core_0_dispatch_time_t;" in header
+    assert narrowest_ctype(0, 255) == "uint8_t"
+    assert narrowest_ctype(-1, 127) == "int8_t"
+    assert narrowest_ctype(-1, 128) == "int16_t"
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from simplesmtscheduler.export import EXPORT_FORMAT_VERSION, EXPORT_HEADER, EXPORT_MAGIC, load_schedule, \
+    write_schedule
+
+
+@pytest.fixture
+def scheduled_tasks(make_tasks):
+    tasks = make_tasks((10, 4, 10, 0, 1, 0, None, "A"), (20, 4, 20, 0, 0, 0, 8, "B"), (15, 2, 15, 0, 0, 1, None, "C"))
+    for task, activations in zip(tasks, ([0, 11], [4], [-1, 14])):
+        task.activation_instances = activations
+    return tasks
+
+
+@pytest.mark.parametrize("extension", ["bin", "json"])
+def test_export_round_trips(tmp_path, scheduled_tasks, extension):
+    file_name = write_schedule(str(tmp_path / ("schedule." + extension)), scheduled_tasks, 2, "tasks.csv")
+    export = load_schedule(file_name)
+    assert export.wcet_gap == 2 and export.tasks_file == "tasks.csv"
+    assert export.task_names() == ["A", "B", "C"]
+    assert export.task_activations("C").tolist() == [-1, 14]
+    assert {name: pits.tolist() for name, pits in export.core_activations(0).items()} == {"A": [0, 11], "B": [4]}
+    assert [c['hyper_period'] for c in export.metadata['cores']] == [20, 15]
+    loaded = export.tasks()
+    assert [(t.name, t.period, t.execution, t.deadline, t.offset, t.jitter, t.coreid, t.activation_instances)
+            for t in loaded] == \
+        [(t.name, t.period, t.execution, t.deadline, t.offset, t.jitter, t.coreid, t.activation_instances)
+         for t in scheduled_tasks]
+    assert int(loaded[1].fixed_pit) == 8 and not hasattr(loaded[0], 'fixed_pit')
+
+
+def test_binary_activations_are_memory_mapped(tmp_path, scheduled_tasks):
+    export = load_schedule(write_schedule(str(tmp_path / "schedule.bin"), scheduled_tasks))
+    assert isinstance(export.activations, np.memmap) and not export.activations.flags.writeable
+    with pytest.raises(KeyError):
+        export.task_activations("D")
+
+
+def test_newer_format_versions_are_rejected(tmp_path, scheduled_tasks):
+    file_name = write_schedule(str(tmp_path / "schedule.bin"), scheduled_tasks)
+    with open(file_name, 'r+b') as f:
+        magic, _, metadata_length, data_offset = EXPORT_HEADER.unpack(f.read(EXPORT_HEADER.size))
+        f.seek(0)
+        f.write(EXPORT_HEADER.pack(EXPORT_MAGIC, EXPORT_FORMAT_VERSION + 1, metadata_length, data_offset))
+    with pytest.raises(ValueError):
+        load_schedule(file_name)
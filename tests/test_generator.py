@@ -0,0 +1,43 @@
+import random
+
+import pytest
+
+from simplesmtscheduler.benchmark import BENCHMARK_FIELDS, run_benchmark_case
+from simplesmtscheduler.generator import gen_periods, gen_task_set, uunifast, write_csv_taskset
+from simplesmtscheduler.utilities import find_lcm, parse_csv_taskset
+
+
+def test_uunifast_utilizations_sum_to_the_total():
+    utilizations = uunifast(8, 0.6, random.Random(3))
+    assert len(utilizations) == 8 and all(u >= 0 for u in utilizations)
+    assert sum(utilizations) == pytest.approx(0.6)
+
+
+@pytest.mark.parametrize("distribution", ["loguniform", "harmonic"])
+def test_periods_divide_the_hyper_period(distribution):
+    periods = gen_periods(16, 1000, 10, distribution, random.Random(0))
+    assert all(10 <= p <= 1000 and 1000 % p == 0 for p in periods)
+    if distribution == 'harmonic':
+        assert all(max(p, q) % min(p, q) == 0 for p in periods for q in periods)
+
+
+def test_seeded_task_set_is_reproducible_and_round_trips_through_csv(tmp_path):
+    task_set = gen_task_set(6, 0.5, nr_cores=2, hyper_period=1000, jitter_ratio=0.1, offset_ratio=0.5, seed=7)
+    rows = [(t.period, t.execution, t.deadline, t.offset, t.jitter, t.coreid, t.name) for t in task_set]
+    assert rows == [(t.period, t.execution, t.deadline, t.offset, t.jitter, t.coreid, t.name)
+                    for t in gen_task_set(6, 0.5, 2, 1000, jitter_ratio=0.1, offset_ratio=0.5, seed=7)]
+    assert 1000 % find_lcm([t.period for t in task_set]) == 0
+    csv_file = str(tmp_path / "generated.csv")
+    write_csv_taskset(csv_file, task_set)
+    loaded = []
+    parse_csv_taskset(csv_file, loaded, verbose=False)
+    assert [(t.period, t.execution, t.deadline, t.offset, t.jitter, t.coreid, t.name) for t in loaded] == rows
+
+
+@pytest.mark.parametrize("scheduler", ["cyclic", "rm", "mapping"])
+def test_benchmark_case_reports_every_field(scheduler):
+    case = dict(scheduler=scheduler, nr_tasks=4, nr_cores=2, hyper_period=100, utilization=0.3,
+                distribution='harmonic', seed=1)
+    result = run_benchmark_case(case)
+    assert set(BENCHMARK_FIELDS) <= set(result)
+    assert result['result'] == 'sat' and result['instances'] > 0
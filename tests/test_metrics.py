@@ -0,0 +1,42 @@
+import json
+import os
+
+from conftest import REPO_DIR
+from simplesmtscheduler.metrics import SolverMetrics, write_metrics
+from simplesmtscheduler.smtmodels import gen_cyclic_schedule_model
+
+
+def test_cyclic_model_fills_the_metrics(make_tasks):
+    tasks = make_tasks((10, 4, 10, 0, 1, 0, None, "A"), (20, 4, 20, 0, 0, 0, None, "B"))
+    metrics = SolverMetrics()
+    gen_cyclic_schedule_model(tasks, 0, metrics=metrics)
+    assert metrics.scheduler == 'cyclic' and metrics.result == 'sat'
+    assert metrics.hyper_period == 20 and metrics.instances == {"A": 2, "B": 1}
+    assert metrics.variables >= 3 and metrics.assertions > 0 and metrics.statistics
+    assert min(metrics.build_time, metrics.solve_time, metrics.extraction_time) >= 0
+
+
+def test_unsat_model_is_recorded(make_tasks):
+    tasks = make_tasks((10, 6, 10, 0, 0, 0, 0, "A"), (10, 6, 10, 0, 0, 0, 2, "B"))
+    metrics = SolverMetrics()
+    assert gen_cyclic_schedule_model(tasks, 0, metrics=metrics)[0] is None
+    assert metrics.result == 'unsat'
+
+
+def test_metrics_are_written_as_json(tmp_path, make_tasks):
+    metrics = SolverMetrics('heuristic', time_unit=1000)
+    metrics.collect_instances(make_tasks((10, 4, 10, 0, 0, 0, None, "A")), 20)
+    file_name = str(tmp_path / "metrics.json")
+    write_metrics(file_name, [dict(metrics.as_dict(), core_id=0)])
+    with open(file_name) as f:
+        assert json.load(f) == [dict(metrics.as_dict(), core_id=0)]
+
+
+def test_cli_writes_one_metrics_entry_per_core(tmp_path, run_cli):
+    file_name = str(tmp_path / "metrics.json")
+    tasks_file = os.path.join(REPO_DIR, "examples", "tte_combined.csv")
+    assert run_cli("-i", tasks_file, "--no-cache", "--metrics", file_name).returncode == 0
+    with open(file_name) as f:
+        core_metrics = json.load(f)
+    assert [m['core_id'] for m in core_metrics] == [1, 2, 3]
+    assert all(m['result'] == 'sat' and m['tasks_file'] == tasks_file for m in core_metrics)
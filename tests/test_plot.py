@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from simplesmtscheduler.utilities import merge_execution_bars, plot_cyclic_schedule, save_cyclic_schedule_plot
+
+matplotlib = pytest.importorskip("matplotlib")
+matplotlib.use("Agg")
+
+
+def test_bars_closer_than_the_resolution_are_merged():
+    starts = np.array([0, 3, 5, 20, 40, 41])
+    widths = np.array([2, 2, 10, 1, 1, 1])
+    merged_starts, merged_widths = merge_execution_bars(starts, widths, 2)
+    assert merged_starts.tolist() == [0, 20, 40] and merged_widths.tolist() == [15, 1, 2]
+    # Every bar is kept at full resolution
+    assert [a.tolist() for a in merge_execution_bars(starts, widths, 0)] == [starts.tolist(), widths.tolist()]
+
+
+def test_long_hyper_period_plot_is_saved(tmp_path, make_tasks):
+    tasks = make_tasks((10, 3, 10, 0, 0, 0, None, "A"), (100000, 5, 100000, 0, 0, 0, None, "B"))
+    tasks[0].activation_instances = list(range(0, 100000, 10))
+    tasks[1].activation_instances = [3]
+    file_name = save_cyclic_schedule_plot(str(tmp_path / "schedule.png"), tasks, 100000, 2, "long", 50)
+    with open(file_name, 'rb') as f:
+        assert f.read(8) == b"\x89PNG\r\n\x1a\n"
+
+
+def test_plot_merges_dense_rows(make_tasks):
+    tasks = make_tasks((10, 3, 10, 0, 0, 0, None, "A"), (100000, 5, 100000, 0, 0, 0, None, "B"))
+    tasks[0].activation_instances = list(range(0, 100000, 10))
+    tasks[1].activation_instances = [3]
+    schedule_plot = plot_cyclic_schedule(tasks, 100000, 1, "dense", 50)
+    collection, = schedule_plot.gca().collections
+    # Row A collapses into one bar as its gaps are far below one pixel, row B keeps its single release
+    assert len(collection.get_paths()) == 2
+    schedule_plot.close()
@@ -0,0 +1,36 @@
+import os
+
+from conftest import REPO_DIR
+from simplesmtscheduler.batch import schedule_task_set
+from simplesmtscheduler.metrics import SolverMetrics
+from simplesmtscheduler.portfolio import solve_portfolio
+
+INVALID_CONFIG = {'name': 'invalid', 'params': {'no.such.param': 1}}
+VALID_CONFIG = {'name': 'int-arith3', 'params': {'arith.solver': 3}}
+
+
+def test_failing_configuration_is_reported_unknown(make_tasks):
+    tasks = make_tasks((10, 4, 10, 0, 0, 0, None, "A"), (20, 4, 20, 0, 0, 0, None, "B"))
+    activations, _, _, elapsed_time, status = solve_portfolio(tasks, 0, solver_configs=[INVALID_CONFIG], timeout=30,
+                                                              max_workers=2)
+    assert activations is None and status == 'unknown' and elapsed_time < 30
+
+
+def test_failing_configuration_does_not_stop_the_race(make_tasks):
+    tasks = make_tasks((10, 4, 10, 0, 0, 0, None, "A"), (20, 4, 20, 0, 0, 0, None, "B"))
+    activations, _, _, _, status = solve_portfolio(tasks, 0, solver_configs=[INVALID_CONFIG, VALID_CONFIG],
+                                                   timeout=30, max_workers=2)
+    assert status == 'sat' and [len(a) for a in activations] == [2, 1]
+
+
+def test_winner_is_recorded_in_metrics(make_tasks):
+    tasks = make_tasks((10, 4, 10, 0, 0, 0, None, "A"), (20, 4, 20, 0, 0, 0, None, "B"))
+    metrics = SolverMetrics()
+    solve_portfolio(tasks, 0, solver_configs=[INVALID_CONFIG, VALID_CONFIG], timeout=30, max_workers=2,
+                    metrics=metrics)
+    assert metrics.configuration == 'int-arith3'
+
+
+def test_batch_passes_portfolio_through():
+    results = schedule_task_set(os.path.join(REPO_DIR, "examples", "demo_tasks.csv"), portfolio=[VALID_CONFIG])
+    assert [(r['status'], r['scheduler'], r['configuration']) for r in results] == [('sat', 'portfolio', 'int-arith3')]
@@ -0,0 +1,31 @@
+import pytest
+
+from simplesmtscheduler.precheck import check_schedulability
+from simplesmtscheduler.schedulers import solve_core_schedule
+
+
+@pytest.mark.parametrize("rows, wcet_gap, reason", [
+    ([(10, 6, 10, 0, 0, 0, None, "A"), (10, 6, 10, 0, 0, 0, None, "B")], 0,
+     "Utilization including the WCET gap is 120.0 %"),
+    ([(10, 5, 10, 0, 0, 0, 0, "A"), (10, 3, 10, 0, 0, 0, 2, "B")], 0,
+     "Fixed releases A#0 at 0 and B#0 at 2000 collide"),
+    ([(10, 3, 5, 2, 1, 0, None, "A"), (15, 4, 15, 0, 3, 0, None, "B")], 1,
+     "Release B#0 has no feasible start PIT (latest 5000 is before earliest 6000)"),
+    ([(10, 4, 7, 0, 0, 0, None, "A"), (10, 4, 7, 0, 0, 0, None, "B")], 0,
+     "Processor demand of 8000 in [0, 7000] exceeds the interval length 7000"),
+])
+def test_infeasible_task_sets_are_rejected_with_their_reason(make_tasks, rows, wcet_gap, reason):
+    # Reasons are reported in the units of the task set file, here a time base of 1000
+    assert check_schedulability(make_tasks(*rows), wcet_gap, 1000) == (reason, None)
+    _, _, _, _, metrics = solve_core_schedule(make_tasks(*rows), wcet_gap)
+    assert metrics.scheduler == 'precheck' and metrics.result == 'unsat'
+
+
+def test_release_bounds_contain_the_solved_schedule(make_tasks):
+    rows = [(10, 3, 6, 0, 0, 0, None, "A"), (10, 3, 6, 0, 0, 0, None, "B"), (20, 1, 7, 0, 0, 0, None, "C")]
+    reason, release_bounds = check_schedulability(make_tasks(*rows), 0)
+    assert reason is None
+    activations = solve_core_schedule(make_tasks(*rows), 0)[0]
+    for (_, _, _, _, _, _, _, name), task_activations in zip(rows, activations):
+        lo, hi = release_bounds[name]
+        assert all(l <= pit <= h for l, pit, h in zip(lo, task_activations, hi))
@@ -0,0 +1,34 @@
+from simplesmtscheduler.schedulers import gen_heuristic_schedule, map_and_schedule, solve_core_schedule
+from simplesmtscheduler.smtmodels import IncrementalCyclicScheduler
+from simplesmtscheduler.verifier import verify_core_activations
+
+
+def test_mapped_core_keeps_tasks_of_different_csv_cpus_apart(make_tasks):
+    tasks = make_tasks((10, 4, 10, 0, 0, 0, None, "A"), (10, 4, 10, 0, 0, 1, None, "B"))
+    core_results = map_and_schedule(tasks, 1, 0)
+    assert core_results is not None
+    assert [t.coreid for t in tasks] == [0, 0]
+    assert verify_core_activations(tasks, core_results[0][0], 0) == []
+
+
+def test_conflict_is_shrunk_to_the_tasks_that_cannot_share_a_core(make_tasks):
+    tasks = make_tasks((10, 6, 10, 0, 0, 0, 0, "A"), (20, 1, 20, 0, 0, 0, None, "B"), (10, 6, 10, 0, 0, 0, 2, "C"))
+    assert IncrementalCyclicScheduler(tasks).shrink_conflict() == ["A", "C"]
+
+
+def test_complete_heuristic_schedule_verifies(make_tasks):
+    tasks = make_tasks((10, 3, 5, 2, 1, 0, None, "A"), (15, 4, 15, 0, 3, 0, None, "B"), (30, 5, 30, 0, 0, 0, None, "C"))
+    placements, complete, _, hyper_period, _ = gen_heuristic_schedule(tasks, 0)
+    assert complete and hyper_period == 30
+    assert verify_core_activations(tasks, [placements[t.name] for t in tasks], 0) == []
+    activations, _, _, _, metrics = solve_core_schedule(tasks, 0, heuristic=True)
+    assert metrics.scheduler == 'heuristic'
+    assert verify_core_activations(tasks, activations, 0) == []
+
+
+def test_incomplete_heuristic_falls_back_to_the_smt_model(make_tasks):
+    tasks = make_tasks((12, 3, 4, 0, 0, 0, None, "A"), (8, 1, 6, 0, 2, 0, None, "B"), (12, 3, 6, 0, 1, 0, None, "C"))
+    assert not gen_heuristic_schedule(tasks, 0)[1]
+    activations, _, _, _, metrics = solve_core_schedule(tasks, 0, heuristic=True)
+    assert metrics.scheduler == 'cyclic'
+    assert verify_core_activations(tasks, activations, 0) == []
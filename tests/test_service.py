@@ -0,0 +1,64 @@
+import asyncio
+import threading
+from time import time
+
+import pytest
+
+from simplesmtscheduler.cache import taskset_fingerprint
+from simplesmtscheduler.service import SERVICE_OPTIONS, request_key, run_service, service_request
+
+CSV_HEADER = "Period,Execution,Deadline,Offset,Jitter,CPU ID,Fixed Start,Name,Function\n"
+
+
+@pytest.fixture
+def service_address(tmp_path):
+    address = str(tmp_path / "ssmts.sock")
+    started = threading.Event()
+    loop = asyncio.new_event_loop()
+    service = loop.create_task(run_service(address, started=started.set))
+
+    def run():
+        try:
+            loop.run_until_complete(service)
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    assert started.wait(30)
+    yield address
+    loop.call_soon_threadsafe(service.cancel)
+    thread.join(30)
+    loop.close()
+
+
+def final_reply(address, message):
+    return [reply for reply in service_request(address, message)][-1]
+
+
+def test_crafted_cell_does_not_stall_the_service(service_address):
+    start_time = time()
+    csv = CSV_HEADER + "9**9**9**9,4,10,0,0,0,None,A,a\n10,4,10,0,0,0,None,B,b\n"
+    assert 'error' in final_reply(service_address, {"op": "submit", "csv": csv})
+    assert final_reply(service_address, {"op": "stats"})['workers'] == 1
+    assert time() - start_time < 10
+
+
+def test_submit_is_scheduled(service_address):
+    csv = CSV_HEADER + "10,4,10,0,0,0,None,A,a\n20,4,20,0,0,0,None,B,b\n"
+    reply = final_reply(service_address, {"op": "submit", "csv": csv, "options": {"heuristic": True}})
+    assert reply['status'] == 'sat' and len(reply['activations']['A']) == 2
+
+
+def test_request_key_is_the_cache_fingerprint(make_tasks):
+    tasks = make_tasks((10, 4, 10, 0, 0, 0, None, "A"))
+    options = dict(SERVICE_OPTIONS, optimize=True)
+    assert request_key(tasks, 0, options) == taskset_fingerprint(tasks, 0, True, False, options)
+
+
+@pytest.mark.parametrize("message", [[], 1, {"op": "status", "job": [1]}, {"op": "submit", "options": "heuristic"},
+                                     {"op": "submit", "options": [["heuristic", True]]},
+                                     {"op": "submit", "csv": CSV_HEADER + "%s,4,10,0,0,0,None,A,a\n" % 2 ** 70}])
+def test_malformed_requests_get_a_final_error(service_address, message):
+    reply = final_reply(service_address, message)
+    assert reply['final'] and 'error' in reply
@@ -0,0 +1,65 @@
+import pytest
+
+from simplesmtscheduler.schedulers import gen_rate_monotonic_schedule
+from simplesmtscheduler.simulator import deadline_misses, simulate_schedule
+from simplesmtscheduler.utilities import find_lcm
+
+
+def legacy_rate_monotonic_activations(rows, wcet_gap):
+    # The polling loop gen_rate_monotonic_schedule used before the simulator, without its trailing next release.
+    # It only advances by the executions it polls, so its releases drift once the processor would idle.
+    rows = sorted(rows, key=lambda r: r[0])
+    hyper_period = find_lcm([r[0] for r in rows])
+    activations = {r[7]: [] for r in rows}
+    sched_time = 0
+    while sched_time <= hyper_period:
+        for period, execution, _, _, _, _, _, name in rows:
+            pits = activations[name]
+            if pits:
+                act_pit = pits.pop()
+                if sched_time >= act_pit:
+                    pits.extend([sched_time, sched_time + period])
+                else:
+                    pits.append(act_pit)
+            else:
+                pits.extend([sched_time, sched_time + period])
+            sched_time = sched_time + execution + wcet_gap
+    return {name: [pit for pit in pits if pit < hyper_period] for name, pits in activations.items()}
+
+
+@pytest.mark.parametrize("rows", [
+    [(4, 2, 4, 0, 0, 0, None, "A"), (8, 2, 8, 0, 0, 0, None, "B")],
+    [(10, 2, 10, 0, 0, 0, None, "A"), (20, 3, 20, 0, 0, 0, None, "B"), (40, 5, 40, 0, 0, 0, None, "C")],
+    [(5, 1, 5, 0, 0, 0, None, "A"), (10, 2, 10, 0, 0, 0, None, "B"), (10, 2, 10, 0, 0, 0, None, "C")],
+])
+def test_rate_monotonic_schedule_matches_the_legacy_loop(make_tasks, rows):
+    tasks = make_tasks(*rows)
+    gen_rate_monotonic_schedule(tasks, 0)
+    assert {t.name: list(t.activation_instances) for t in tasks} == legacy_rate_monotonic_activations(rows, 0)
+
+
+def test_rate_monotonic_releases_stay_periodic(make_tasks):
+    # The legacy loop started A at 13 here, the simulator releases it every period
+    tasks = make_tasks((10, 2, 10, 0, 0, 0, None, "A"), (20, 3, 20, 0, 0, 0, None, "B"),
+                       (40, 5, 40, 0, 0, 0, None, "C"))
+    gen_rate_monotonic_schedule(tasks, 1)
+    assert [list(t.activation_instances) for t in tasks] == [[0, 13, 20, 30], [3, 23], [7]]
+
+
+def test_preemptive_trace_splits_the_preempted_job(make_tasks):
+    tasks = make_tasks((5, 2, 5, 0, 0, 0, None, "A"), (20, 6, 20, 0, 0, 0, None, "B"))
+    trace, _, hyper_period, _ = simulate_schedule(tasks, policy='rm', preemptive=True)
+    assert hyper_period == 20 and not deadline_misses(trace)
+    job_b = [job for job in trace if job.name == "B"][0]
+    assert (job_b.start, job_b.finish, job_b.preemptions, job_b.segments) == (2, 10, 1, ((2, 5), (7, 10)))
+
+
+def test_edf_meets_deadlines_rate_monotonic_misses(make_tasks):
+    rows = [(4, 2, 4, 0, 0, 0, None, "A"), (6, 3, 6, 0, 0, 0, None, "B")]
+    assert deadline_misses(simulate_schedule(make_tasks(*rows), policy='rm')[0])
+    assert not deadline_misses(simulate_schedule(make_tasks(*rows), policy='edf')[0])
+
+
+def test_unknown_policy_is_rejected(make_tasks):
+    with pytest.raises(ValueError):
+        simulate_schedule(make_tasks((4, 2, 4, 0, 0, 0, None, "A")), policy='fifo')
@@ -0,0 +1,82 @@
+import pytest
+
+from simplesmtscheduler.smtmodels import IncrementalCyclicScheduler, distributed_task_mapping, \
+    gen_anytime_schedule_model, gen_cyclic_schedule_model, gen_rolling_horizon_schedule, gen_schedule_activations
+from simplesmtscheduler.verifier import verify_core_activations
+
+ENCODING_TASK_SETS = [
+    [(10, 4, 10, 0, 0, 0, None, "A"), (20, 4, 20, 0, 0, 0, None, "B")],
+    [(6, 2, 2, 0, 1, 0, 0, "A"), (12, 2, 3, 0, 0, 0, None, "B"), (4, 1, 3, 0, 2, 0, 2, "C")],
+    [(10, 3, 5, 2, 1, 0, None, "A"), (15, 4, 15, 0, 3, 0, None, "B"), (30, 5, 30, 0, 0, 0, None, "C")],
+    [(10, 6, 10, 0, 0, 0, 0, "A"), (20, 1, 20, 0, 0, 0, None, "B"), (10, 6, 10, 0, 0, 0, 2, "C")],
+    [(4, 2, 2, 0, 0, 0, None, "A"), (8, 3, 3, 0, 0, 0, None, "B")],
+]
+
+
+def cyclic_activations(tasks, wcet_gap, legacy_encoding):
+    schedule = gen_cyclic_schedule_model(tasks, wcet_gap, legacy_encoding=legacy_encoding)[0]
+    if schedule is None:
+        return None
+    gen_schedule_activations(schedule, tasks)
+    return [list(t.getStartPIT()) for t in tasks]
+
+
+@pytest.mark.parametrize("rows", ENCODING_TASK_SETS)
+@pytest.mark.parametrize("wcet_gap", [0, 1])
+def test_pruned_encoding_agrees_with_legacy_encoding(make_tasks, rows, wcet_gap):
+    pruned = cyclic_activations(make_tasks(*rows), wcet_gap, False)
+    legacy = cyclic_activations(make_tasks(*rows), wcet_gap, True)
+    assert (pruned is None) == (legacy is None)
+    if pruned is not None:
+        assert verify_core_activations(make_tasks(*rows), pruned, wcet_gap, wrap_around=True) == []
+
+
+def test_incremental_scheduler_leaves_caller_tasks_to_other_models(make_tasks):
+    tasks = make_tasks((10, 4, 10, 0, 0, 0, None, "A"), (20, 4, 20, 0, 0, 0, None, "B"))
+    scheduler = IncrementalCyclicScheduler(tasks)
+    assert scheduler.check()[0] is not None
+    assert gen_cyclic_schedule_model(tasks, 0)[0] is not None
+    # The scheduler keeps solving its own copies after the caller's tasks were used by another model
+    model, _, hyper_period, _ = scheduler.add_task(make_tasks((20, 2, 20, 0, 0, 0, None, "C"))[0])
+    assert model is not None and hyper_period == 20
+    assert len(tasks[0].activation_instances) == 2
+
+
+def test_anytime_model_rejects_unknown_objectives(make_tasks):
+    tasks = make_tasks((10, 4, 10, 0, 1, 0, None, "A"), (20, 4, 20, 0, 0, 0, None, "B"))
+    with pytest.raises(ValueError):
+        gen_anytime_schedule_model(tasks, 0, 5, 'bogus')
+
+
+def test_rolling_horizon_keeps_releases_before_zero_in_the_first_window(make_tasks):
+    tasks = make_tasks((6, 2, 2, 0, 1, 0, 0, "A"), (12, 2, 3, 0, 0, 0, None, "B"), (4, 1, 3, 0, 2, 0, 2, "C"))
+    assert gen_cyclic_schedule_model(tasks, 0)[0] is not None
+    for window_instances in (2, 100):
+        activations = gen_rolling_horizon_schedule(tasks, 0, window_instances)[0]
+        assert activations is not None
+        assert verify_core_activations(tasks, activations, 0, wrap_around=True) == []
+
+
+MAPPING_TASKS = [(10, 3, 10, 0, 0, 0, None, "A"), (20, 8, 20, 0, 0, 0, None, "B"), (10, 2, 10, 0, 0, 0, None, "C"),
+                 (40, 8, 40, 0, 0, 0, None, "D"), (20, 5, 20, 0, 0, 0, None, "E")]
+
+
+@pytest.mark.parametrize("utilization_bound", [0.7, [0.5, 0.9]])
+def test_mapping_places_every_task_within_the_bound(make_tasks, utilization_bound):
+    tasks = make_tasks(*MAPPING_TASKS)
+    assert distributed_task_mapping(tasks, 2, 0, utilization_bound=utilization_bound)[0] is not None
+    core_bounds = utilization_bound if isinstance(utilization_bound, list) else [utilization_bound] * 2
+    for c in range(2):
+        core_tasks = [t for t in tasks if t.mapped_coreid == c]
+        assert core_tasks and sum(t.execution / t.period for t in core_tasks) <= core_bounds[c]
+
+
+def test_mapping_keeps_blocked_groups_apart(make_tasks):
+    tasks = make_tasks(*MAPPING_TASKS)
+    assert distributed_task_mapping(tasks, 2, 0, utilization_bound=0.7, blocked_groups=[["A", "B"]])[0] is not None
+    assert tasks[0].mapped_coreid != tasks[1].mapped_coreid
+
+
+def test_mapping_fails_above_the_aggregated_bound(make_tasks):
+    # The total utilization of 1.35 does not fit two cores of 0.55 each
+    assert distributed_task_mapping(make_tasks(*MAPPING_TASKS), 2, 0, utilization_bound=0.55)[0] is None
@@ -0,0 +1,8 @@
+def test_timing_parameters_accept_floats(make_tasks):
+    # Assigned values are rounded up like the cells of TaskTable.append
+    task = make_tasks((10, 4, 10, 0, 0, 0, None, "A"))[0]
+    task.period = 2.5
+    task.execution = 1.2
+    task.jitter = 0.0
+    task.coreid = 1.0
+    assert (task.period, task.execution, task.jitter, task.coreid) == (3, 2, 0, 1)
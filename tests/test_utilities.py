@@ -0,0 +1,45 @@
+import pytest
+
+from simplesmtscheduler.schedulers import solve_core_schedule
+from simplesmtscheduler.utilities import eval_cell, normalize_time_base
+from simplesmtscheduler.verifier import verify_core_activations
+
+
+def test_cell_expressions():
+    assert eval_cell("16000000+79275") == 16079275
+    assert eval_cell("2**10*1000") == 1024000
+    assert eval_cell(" 5000000 ") == 5000000
+    assert eval_cell("None") is None
+
+
+@pytest.mark.parametrize("cell", ["9**9**8", "9**9**9**9", "(10**30)**10", "2**-200**2", "None+1", "1e308*1e308"])
+def test_oversized_cells_are_rejected(cell):
+    with pytest.raises(ValueError):
+        eval_cell(cell)
+
+
+def test_cells_beyond_the_int64_columns_are_rejected():
+    assert eval_cell(str(2 ** 63 - 1)) == 2 ** 63 - 1
+    for cell in ("2**63", "2**70", str(2 ** 64), "-2**63"):
+        with pytest.raises(ValueError):
+            eval_cell(cell)
+
+
+def test_time_base_normalization_round_trips(make_tasks):
+    tasks = make_tasks((10000, 3000, 5000, 2000, 1000, 0, None, "A"), (15000, 4000, 15000, 0, 3000, 0, 6000, "B"))
+    scaled_tasks, scaled_wcet_gap, time_unit = normalize_time_base(tasks, 2000)
+    assert time_unit == 1000 and scaled_wcet_gap == 2
+    for task, scaled_task in zip(tasks, scaled_tasks):
+        assert [v * time_unit for v in (scaled_task.period, scaled_task.execution, scaled_task.deadline,
+                                        scaled_task.offset, scaled_task.jitter)] == \
+            [task.period, task.execution, task.deadline, task.offset, task.jitter]
+    assert scaled_tasks[1].fixed_pit * time_unit == 6000
+    # The caller's tasks are left unscaled
+    assert tasks[0].period == 10000
+
+
+def test_normalized_schedule_is_in_the_original_units(make_tasks):
+    tasks = make_tasks((10000, 3000, 5000, 2000, 1000, 0, None, "A"), (15000, 4000, 15000, 0, 3000, 0, None, "B"))
+    activations, _, hyper_period, _, metrics = solve_core_schedule(tasks, 0)
+    assert metrics.time_unit == 1000 and hyper_period == 30000
+    assert verify_core_activations(tasks, activations, 0) == []
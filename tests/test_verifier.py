@@ -0,0 +1,14 @@
+import os
+import shutil
+
+from conftest import REPO_DIR
+
+
+def test_generated_header_passes_verify(tmp_path, run_cli):
+    tasks_file = str(tmp_path / "demo_tasks.csv")
+    shutil.copy(os.path.join(REPO_DIR, "examples", "demo_tasks.csv"), tasks_file)
+    assert run_cli("-i", tasks_file, "-c", "--no-cache").returncode == 0
+    header_file = tasks_file.replace(".csv", "_schedule.h")
+    verified = run_cli("-i", tasks_file, "--verify", header_file)
+    assert verified.returncode == 0, verified.stdout
+    assert "Schedule is valid" in verified.stdout